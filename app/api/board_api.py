@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
 from starlette.responses import JSONResponse
 
 from uuid import UUID
+from datetime import datetime
+from typing import Optional
 from app.api.deps import get_uow, get_current_user
+from app.api.websocket_api import get_ws_manager, resume_board
+from app.core.exceptions import (
+    BoardNotFound,
+    InvalidTokenException,
+    PermissionDenied,
+    UserNotAuthenticated,
+    UserNotFoundError
+)
 from app.core.unitOfWork import UnitOfWork
+from app.services.AuthService import AuthService
 from app.services.BoardService import BoardService
 from app.schemas.BoardSchema import (
     BoardCreate,
     BoardUpdate,
     BoardOut,
-    BoardFullOut
+    BoardFullOut,
+    BoardChangesOut
 )
+from app.services.WebSocketManager import WebSocketManager
 
 boardRouter = APIRouter(prefix="/boards", tags=["boards"])
 
@@ -44,6 +58,64 @@ async def get_board(
     return await service.get_board(owner_id=current_user.id, board_id=board_id)
 
 
+@boardRouter.get("/{board_id}/changes", response_model=BoardChangesOut)
+async def get_board_changes(
+        board_id: UUID,
+        since: Optional[datetime] = None,
+        current_user=Depends(get_current_user),
+        uow: UnitOfWork = Depends(get_uow),
+):
+    """
+    Lists and cards created or updated after `since`, plus ids of deleted ones.
+    Poll again with the returned `server_time` as `since`.
+    """
+    service = BoardService(uow)
+    return await service.get_board_changes(user_id=current_user.id, board_id=board_id, since=since)
+
+
+@boardRouter.get("/{board_id}/events")
+async def board_events(
+        request: Request,
+        board_id: UUID,
+        last_seq: Optional[int] = None,
+        last_event_id: Optional[str] = Header(default=None),
+        uow: UnitOfWork = Depends(get_uow),
+        manager: WebSocketManager = Depends(get_ws_manager)
+):
+    """
+    Server-Sent Events stream of the board, the same events the board WebSocket receives.
+    On reconnect the browser sends the last `id` as Last-Event-ID and gets the missed events,
+    or a SNAPSHOT when they are no longer buffered.
+    """
+    token = request.cookies.get("access_token")
+    if not token:
+        raise UserNotAuthenticated("User not authenticated")
+    try:
+        user_id = await AuthService(uow).authorize_board_socket(token, board_id)
+    except PermissionDenied:
+        raise BoardNotFound("Board not found")
+    except (InvalidTokenException, UserNotFoundError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if last_event_id is not None and last_event_id.isdigit():
+        last_seq = int(last_event_id)
+    connection = manager.open_stream(board_id, user_id)
+    if connection is None:
+        raise HTTPException(status_code=503, detail="Too many connections", headers={"Retry-After": "5"})
+    if last_seq is not None:
+        try:
+            await resume_board(connection, board_id, user_id, last_seq, uow, manager)
+        except Exception:
+            manager.disconnect(connection)
+            raise
+    return StreamingResponse(
+        connection.events(),
+        media_type="text/event-stream",
+        # No caching or proxy buffering, or events would arrive in bursts
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @boardRouter.patch("/{board_id}", response_model=BoardOut)
 async def update_board(
         board_id: UUID,
@@ -1,35 +1,74 @@
 from fastapi import APIRouter, Depends
 from starlette.responses import JSONResponse
+from typing import Optional
 from uuid import UUID
 
-from app.api.deps import get_uow, get_current_user
+from app.api.deps import (
+    get_uow,
+    get_current_user,
+    get_client_id,
+    require_board_access,
+    require_card_access,
+    require_list_access
+)
 from app.core.unitOfWork import UnitOfWork
 from app.services.CardService import CardService
 from app.schemas.CardSchema import (
     CardCreate,
     CardUpdate,
-    CardOut
+    CardOut,
+    CardMoveBatch,
+    CardMoveBatchOut,
+    CardBulkCreate,
+    CardBulkCreateOut
 )
 from app.services.WebSocketManager import WebSocketManager
 from app.api.websocket_api import get_ws_manager
 
+# Every route is board-scoped: the board comes from the list or card in the path, and only
+# its owner and accepted members get through
 cardRouter = APIRouter(tags=["cards"])
 
 
-@cardRouter.post("/lists/{list_id}/cards", response_model=CardOut, status_code=201)
+@cardRouter.post(
+    "/lists/{list_id}/cards",
+    response_model=CardOut,
+    status_code=201,
+    dependencies=[Depends(require_list_access)]
+)
 async def create_card(
         list_id: UUID,
         data: CardCreate,
         current_user=Depends(get_current_user),
         uow: UnitOfWork = Depends(get_uow),
-        ws: WebSocketManager = Depends(get_ws_manager)
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
 ):
-    service = CardService(uow, ws)
+    service = CardService(uow, ws, origin=client_id)
     # optionally use current_user.id as author_id
     return await service.create_card(list_id, data, author_id=current_user.id)
 
 
-@cardRouter.get("/lists/{list_id}/cards", response_model=list[CardOut])
+@cardRouter.post("/lists/{list_id}/cards/bulk", response_model=CardBulkCreateOut, status_code=201)
+async def create_cards(
+        list_id: UUID,
+        data: CardBulkCreate,
+        board_id: UUID = Depends(require_list_access),
+        current_user=Depends(get_current_user),
+        uow: UnitOfWork = Depends(get_uow),
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
+):
+    """Create many cards at once, e.g. a pasted checklist or an imported backlog"""
+    service = CardService(uow, ws, origin=client_id)
+    return await service.create_cards(list_id, data, author_id=current_user.id, board_id=board_id)
+
+
+@cardRouter.get(
+    "/lists/{list_id}/cards",
+    response_model=list[CardOut],
+    dependencies=[Depends(require_list_access)]
+)
 async def get_list_cards(
         list_id: UUID,
         uow: UnitOfWork = Depends(get_uow),
@@ -43,20 +82,23 @@ async def get_list_cards(
 async def update_card(
         card_id: UUID,
         data: CardUpdate,
+        board_id: UUID = Depends(require_card_access),
         uow: UnitOfWork = Depends(get_uow),
-        ws: WebSocketManager = Depends(get_ws_manager)
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
 ):
-    service = CardService(uow, ws)
-    return await service.update_card(card_id=card_id, data=data)
+    service = CardService(uow, ws, origin=client_id)
+    return await service.update_card(card_id=card_id, data=data, board_id=board_id)
 
 
-@cardRouter.delete("/cards/{card_id}", status_code=204)
+@cardRouter.delete("/cards/{card_id}", status_code=204, dependencies=[Depends(require_card_access)])
 async def delete_card(
         card_id: UUID,
         uow: UnitOfWork = Depends(get_uow),
-        ws: WebSocketManager = Depends(get_ws_manager)
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
 ):
-    service = CardService(uow, ws)
+    service = CardService(uow, ws, origin=client_id)
     if await service.delete_card(card_id=card_id):
         return JSONResponse(status_code=200, content={"detail": f"Successfully deleted: {card_id}"})
     return JSONResponse(status_code=400, content={"detail": f"Failed to delete: {card_id}"})
@@ -67,8 +109,26 @@ async def move_card(
         card_id: UUID,
         new_list_id: UUID,
         new_position: int,
+        board_id: UUID = Depends(require_card_access),
         uow: UnitOfWork = Depends(get_uow),
-        ws: WebSocketManager = Depends(get_ws_manager)
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
 ):
-    service = CardService(uow, ws)
-    return await service.move_card(card_id=card_id, new_list_id=new_list_id, new_position=new_position)
+    service = CardService(uow, ws, origin=client_id)
+    return await service.move_card(
+        card_id=card_id, new_list_id=new_list_id, new_position=new_position, board_id=board_id
+    )
+
+
+@cardRouter.patch("/boards/{board_id}/cards/move", response_model=CardMoveBatchOut)
+async def move_cards(
+        board_id: UUID,
+        data: CardMoveBatch,
+        current_user=Depends(require_board_access),
+        uow: UnitOfWork = Depends(get_uow),
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
+):
+    """Apply many moves (in order) in one transaction; positions count the earlier moves"""
+    service = CardService(uow, ws, origin=client_id)
+    return await service.move_cards(board_id=board_id, moves=data.moves)
@@ -1,8 +1,13 @@
 import json
+import secrets
+from typing import Optional
+from uuid import UUID
 from app.core.unitOfWork import UnitOfWork
-from fastapi import Depends, Request, HTTPException
+from fastapi import Depends, Request, HTTPException, Header
+from app.config import settings
 from app.services.AuthService import AuthService
-from app.core.exceptions import UserNotAuthenticated
+from app.services.BoardUserService import BoardUserService
+from app.core.exceptions import BoardNotFound, CardNotFound, ListNotFound, UserNotAuthenticated
 
 def get_uow() -> UnitOfWork:
     return UnitOfWork()
@@ -21,3 +26,52 @@ async def get_current_user(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
     return user
+
+
+async def require_board_access(
+        board_id: UUID,
+        current_user=Depends(get_current_user),
+        uow: UnitOfWork = Depends(get_uow)
+):
+    """The current user, if they own board_id or are an accepted member; one indexed query"""
+    if not await BoardUserService(uow).check_board_access(board_id, current_user.id):
+        raise BoardNotFound("Board not found")
+    return current_user
+
+
+async def require_list_access(
+        list_id: UUID,
+        current_user=Depends(get_current_user),
+        uow: UnitOfWork = Depends(get_uow)
+):
+    """The board of list_id, if the current user can access it; see require_board_access"""
+    board_id = await BoardUserService(uow).get_list_board_for_user(list_id, current_user.id)
+    if board_id is None:
+        raise ListNotFound("List not found")
+    return board_id
+
+
+async def require_card_access(
+        card_id: UUID,
+        current_user=Depends(get_current_user),
+        uow: UnitOfWork = Depends(get_uow)
+):
+    """The board of card_id, if the current user can access it; see require_board_access"""
+    board_id = await BoardUserService(uow).get_card_board_for_user(card_id, current_user.id)
+    if board_id is None:
+        raise CardNotFound("Card not found")
+    return board_id
+
+
+def require_metrics_token(authorization: Optional[str] = Header(default=None)):
+    """Scrapers authenticate with the configured METRICS_TOKEN; without one the endpoint does not exist"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+def get_client_id(x_client_id: Optional[str] = Header(default=None)) -> Optional[str]:
+    """WebSocket connection id of the calling client, if it sent one; that socket skips the echo"""
+    return x_client_id
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends
 from starlette.responses import JSONResponse
+from typing import Optional
 from uuid import UUID
 
-from app.api.deps import get_uow
+from app.api.deps import get_uow, get_client_id, require_board_access
 from app.core.unitOfWork import UnitOfWork
 from app.services.ListService import ListService
 from app.schemas.ListSchema import (
@@ -13,7 +14,12 @@ from app.schemas.ListSchema import (
 from app.services.WebSocketManager import WebSocketManager
 from app.api.websocket_api import get_ws_manager
 
-listRouter = APIRouter(prefix="/boards/{board_id}/lists", tags=["lists"])
+# Every route is board-scoped: only the owner and accepted members get through
+listRouter = APIRouter(
+    prefix="/boards/{board_id}/lists",
+    tags=["lists"],
+    dependencies=[Depends(require_board_access)]
+)
 
 
 @listRouter.post("", response_model=ListOut, status_code=201)
@@ -21,9 +27,10 @@ async def create_list(
         board_id: UUID,
         data: ListCreate,
         uow: UnitOfWork = Depends(get_uow),
-        ws: WebSocketManager = Depends(get_ws_manager)
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
 ):
-    service = ListService(uow, ws)
+    service = ListService(uow, ws, origin=client_id)
     return await service.create_list(board_id, data)
 
 
@@ -43,9 +50,10 @@ async def update_list(
         list_id: UUID,
         data: ListUpdate,
         uow: UnitOfWork = Depends(get_uow),
-        ws: WebSocketManager = Depends(get_ws_manager)
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
 ):
-    service = ListService(uow, ws)
+    service = ListService(uow, ws, origin=client_id)
     return await service.update_list(board_id=board_id, list_id=list_id, data=data)
 
 
@@ -54,9 +62,10 @@ async def delete_list(
         board_id: UUID,
         list_id: UUID,
         uow: UnitOfWork = Depends(get_uow),
-        ws: WebSocketManager = Depends(get_ws_manager)
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
 ):
-    service = ListService(uow, ws)
+    service = ListService(uow, ws, origin=client_id)
     if await service.delete_list(board_id=board_id, list_id=list_id):
         return JSONResponse(status_code=200, content={"detail": f"Successfully deleted: {list_id}"})
     return JSONResponse(status_code=400, content={"detail": f"Failed to delete: {list_id}"})
@@ -68,7 +77,8 @@ async def reorder_list(
         list_id: UUID,
         new_position: int,
         uow: UnitOfWork = Depends(get_uow),
-        ws: WebSocketManager = Depends(get_ws_manager)
+        ws: WebSocketManager = Depends(get_ws_manager),
+        client_id: Optional[str] = Depends(get_client_id)
 ):
-    service = ListService(uow, ws)
+    service = ListService(uow, ws, origin=client_id)
     return await service.reorder_list(board_id=board_id, list_id=list_id, new_position=new_position)
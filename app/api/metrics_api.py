@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_metrics_token
+from app.core.security import hash_pool
+from app.core.userCache import user_cache
+
+metricsRouter = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_token)])
+
+
+@metricsRouter.get("")
+async def get_metrics():
+    """Per-process counters of the in-memory components; each worker reports its own"""
+    return {"hash_pool": hash_pool.stats(), "user_cache": user_cache.stats()}
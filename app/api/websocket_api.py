@@ -1,34 +1,62 @@
+from typing import Any, Dict, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, status
+from pydantic import BaseModel, ValidationError
 
 from app.api.deps import get_uow
-from app.core.exceptions import UserNotAuthenticated
+from app.config import settings
+from app.core.exceptions import UserNotAuthenticated, CardNotFound, ListNotFound, BoardNotFound, PermissionDenied
 from app.core.unitOfWork import UnitOfWork
+from app.schemas.CardSchema import CardMoveBatch, CardUpdate
+from app.schemas.WebSocketSchema import MoveCardIn, UpdateCardIn, ReorderListIn, SubscriptionIn, SubscriptionOut
 from app.services.AuthService import AuthService
 from app.services.BoardService import BoardService
+from app.services.BoardUserService import BoardUserService
+from app.services.CardService import CardService
+from app.services.ListService import ListService
+from app.services.EventBackplane import create_backplane
+from app.services.WebSocketConnection import WebSocketConnection
+from app.services.WebSocketFrame import Frame
 from app.services.WebSocketManager import WebSocketManager
 
 websocketRouter = APIRouter(tags=["websockets"])
 
 # Singleton instance or dependency injection?
 # For simplicity, we'll use a global instance here tailored for dependency injection
-manager = WebSocketManager()
+manager = WebSocketManager(
+    create_backplane(settings.WS_BACKPLANE, settings.WS_BACKPLANE_CHANNEL),
+    send_queue_size=settings.WS_SEND_QUEUE_SIZE,
+    overflow_policy=settings.WS_OVERFLOW_POLICY,
+    coalesce_window_ms=settings.WS_COALESCE_WINDOW_MS,
+    replay_buffer_size=settings.WS_REPLAY_BUFFER_SIZE,
+    replay_max_boards=settings.WS_REPLAY_MAX_BOARDS,
+    heartbeat_interval=settings.WS_HEARTBEAT_INTERVAL,
+    idle_timeout=settings.WS_IDLE_TIMEOUT,
+    max_connections_per_user=settings.WS_MAX_CONNECTIONS_PER_USER,
+    max_connections_per_board=settings.WS_MAX_CONNECTIONS_PER_BOARD,
+    presence_interval_ms=settings.WS_PRESENCE_INTERVAL_MS,
+    presence_max_viewers=settings.WS_PRESENCE_MAX_VIEWERS
+)
 
 
 def get_ws_manager():
     return manager
 
 
-async def get_current_user_ws(
-        websocket: WebSocket,
-        uow: UnitOfWork = Depends(get_uow)
-):
+def get_ws_token(websocket: WebSocket) -> Optional[str]:
     token = websocket.cookies.get("access_token")
     if not token:
         # Try query param as fallback
         token = websocket.query_params.get("token")
+    return token
 
+
+async def get_current_user_ws(
+        websocket: WebSocket,
+        uow: UnitOfWork = Depends(get_uow)
+):
+    token = get_ws_token(websocket)
     if not token:
         return None
 
@@ -40,47 +68,161 @@ async def get_current_user_ws(
         return None
 
 
+async def resume_board(
+        connection: WebSocketConnection,
+        board_id: UUID,
+        user_id: UUID,
+        last_seq: int,
+        uow: UnitOfWork,
+        manager: WebSocketManager
+):
+    """Send a reconnecting client the events it missed, or a full snapshot if they are gone"""
+    missed = manager.replay(board_id, last_seq)
+    if missed is None:
+        # Seq first: an event committed while the board loads is then both in the snapshot and
+        # sent live (the client applies it again harmlessly), rather than in neither
+        seq = await manager.current_seq(board_id)
+        board = await BoardService(uow).get_board(owner_id=user_id, board_id=board_id)
+        connection.send(Frame({"type": "SNAPSHOT", "seq": seq, "payload": board.model_dump(mode='json')}))
+    elif missed:
+        connection.send(Frame({"type": "BATCH", "events": missed}))
+
+
+# Messages that write to the board; access is checked again for each, since it may be revoked mid-connection
+MUTATIONS = frozenset({"MOVE_CARD", "MOVE_CARDS", "UPDATE_CARD", "REORDER_LIST"})
+# Domain errors a message can raise, answered with the status and detail their HTTP handlers use
+NACK_ERRORS = {
+    CardNotFound: (404, "Card not found"),
+    ListNotFound: (404, "List not found"),
+    BoardNotFound: (404, "Board not found"),
+    PermissionDenied: (403, "Permission denied"),
+}
+
+
+async def run_board_message(
+        connection: WebSocketConnection,
+        board_id: UUID,
+        message: Dict[str, Any],
+        uow: UnitOfWork,
+        manager: WebSocketManager
+) -> Optional[BaseModel]:
+    """
+    Route a message sent over the board socket to the manager or card/list services; None if the type is unknown.
+    Mutations are not echoed back to the sending socket: the ACK already carries the result.
+    """
+    message_type = message.get("type")
+    payload = message.get("payload") or {}
+    if message_type in ("SUBSCRIBE", "UNSUBSCRIBE"):
+        data = SubscriptionIn.model_validate(payload)
+        list_ids = None if data.list_ids is None else [str(list_id) for list_id in data.list_ids]
+        event_types = None if data.event_types is None else [event_type.upper() for event_type in data.event_types]
+        if message_type == "SUBSCRIBE":
+            manager.subscribe(connection, list_ids, event_types)
+        else:
+            manager.unsubscribe(connection, list_ids, event_types)
+        return SubscriptionOut(
+            list_ids=None if connection.list_ids is None else sorted(connection.list_ids),
+            event_types=None if connection.event_types is None else sorted(connection.event_types)
+        )
+    if message_type == "MOVE_CARD":
+        data = MoveCardIn.model_validate(payload)
+        return await CardService(uow, manager, origin=connection.id).move_card(
+            card_id=data.card_id, new_list_id=data.list_id, new_position=data.position, board_id=board_id
+        )
+    if message_type == "MOVE_CARDS":
+        data = CardMoveBatch.model_validate(payload)
+        return await CardService(uow, manager, origin=connection.id).move_cards(board_id=board_id, moves=data.moves)
+    if message_type == "UPDATE_CARD":
+        data = UpdateCardIn.model_validate(payload)
+        changes = CardUpdate(**data.model_dump(exclude_unset=True, exclude={"card_id"}))
+        return await CardService(uow, manager, origin=connection.id).update_card(card_id=data.card_id, data=changes, board_id=board_id)
+    if message_type == "REORDER_LIST":
+        data = ReorderListIn.model_validate(payload)
+        return await ListService(uow, manager, origin=connection.id).reorder_list(
+            board_id=board_id, list_id=data.list_id, new_position=data.position
+        )
+    return None
+
+
+async def handle_board_message(
+        connection: WebSocketConnection,
+        board_id: UUID,
+        message: Dict[str, Any],
+        uow: UnitOfWork,
+        manager: WebSocketManager
+):
+    """Apply a client message and answer with ACK (carrying the result) or NACK, matched by request_id"""
+    request_id = message.get("request_id")
+    if message.get("type") in MUTATIONS and not await BoardUserService(uow).check_board_access(
+            board_id, connection.user_id
+    ):
+        # No longer the owner or a member: stop serving the socket altogether, events included
+        connection.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        result = await run_board_message(connection, board_id, message, uow, manager)
+        if result is None:
+            reply = {"type": "NACK", "request_id": request_id, "status": 400, "detail": "Unknown message type"}
+        else:
+            reply = {"type": "ACK", "request_id": request_id, "payload": result.model_dump(mode='json')}
+    except ValidationError as e:
+        reply = {"type": "NACK", "request_id": request_id, "status": 422,
+                 "detail": e.errors(include_url=False, include_context=False)}
+    except tuple(NACK_ERRORS) as e:
+        code, detail = NACK_ERRORS[type(e)]
+        reply = {"type": "NACK", "request_id": request_id, "status": code, "detail": detail}
+    except Exception as e:
+        print(f"WebSocket mutation error: {e}")
+        reply = {"type": "NACK", "request_id": request_id, "status": 500, "detail": "Internal server error"}
+    connection.send(Frame(reply))
+
+
 @websocketRouter.websocket("/ws/board/{board_id}")
 async def websocket_endpoint(
         websocket: WebSocket,
         board_id: UUID,
+        last_seq: Optional[int] = None,
         uow: UnitOfWork = Depends(get_uow),
         manager: WebSocketManager = Depends(get_ws_manager)
 ):
-    # Authenticate
-    user = await get_current_user_ws(websocket, uow)
-    if not user:
+    # Authenticate and verify board access (owner or accepted member) in one query,
+    # so reconnect storms cost a single pooled connection checkout per socket
+    token = get_ws_token(websocket)
+    if not token:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
-
-    # Verify Board Access (owner or accepted member)
-    from app.services.BoardUserService import BoardUserService
-    board_user_service = BoardUserService(uow)
-    
     try:
-        # Check if user is owner OR has accepted access to board
-        has_access = await board_user_service.check_board_access(board_id, user.id)
-        if not has_access:
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-            return
+        user_id = await AuthService(uow).authorize_board_socket(token, board_id)
     except Exception:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
-    # Connect
-    await manager.connect(board_id, websocket)
+    # Connect before replaying so nothing published in between is lost
+    connection = await manager.connect(board_id, websocket, user_id)
+    if connection is None:
+        return
     try:
+        if last_seq is not None:
+            await resume_board(connection, board_id, user_id, last_seq, uow, manager)
         while True:
-            # Keep alive and listen for client messages if any (e.g. ping)
-            # We don't necessarily expect messages from client for this implementation,
-            # but we need to keep the loop running.
-            data = await websocket.receive_text()
-            # process data if needed
+            # Every client frame counts as a sign of life; heartbeat replies are handled by the manager.
+            # Mutations run one at a time, so a client's operations apply in the order it sent them
+            message = manager.receive(connection, await connection.receive())
+            if message is None:
+                continue
+            if message.get("type") == "RESUME":
+                # The client saw a gap in the seqs: replay what it missed, or send a snapshot
+                resume_from = message.get("last_seq")
+                await resume_board(
+                    connection, board_id, user_id, resume_from if isinstance(resume_from, int) else -1, uow, manager
+                )
+            else:
+                await handle_board_message(connection, board_id, message, uow, manager)
     except WebSocketDisconnect:
-        manager.disconnect(board_id, websocket)
+        manager.disconnect(connection)
     except Exception as e:
         print(f"WebSocket error: {e}")
-        manager.disconnect(board_id, websocket)
+        manager.disconnect(connection)
 
 
 @websocketRouter.websocket("/ws/user")
@@ -100,15 +242,14 @@ async def user_websocket_endpoint(
         return
 
     # Connect user to their personal notification channel
-    await manager.connect_user(user.id, websocket)
+    connection = await manager.connect_user(user.id, websocket)
+    if connection is None:
+        return
     try:
         while True:
-            # Keep connection alive
-            data = await websocket.receive_text()
-            # Could handle ping/pong here if needed
+            manager.receive(connection, await connection.receive())
     except WebSocketDisconnect:
-        manager.disconnect_user(user.id, websocket)
+        manager.disconnect(connection)
     except Exception as e:
         print(f"User WebSocket error: {e}")
-        manager.disconnect_user(user.id, websocket)
-
+        manager.disconnect(connection)
@@ -14,6 +14,55 @@ class Settings(BaseSettings):
     PASS: str
     JWT_SECRET_KEY: str
     API_URL:str
+    # "memory" keeps WebSocket fan-out inside one process,
+    # "postgres" shares it between workers via LISTEN/NOTIFY
+    WS_BACKPLANE: str = "memory"
+    WS_BACKPLANE_CHANNEL: str = "ws_events"
+    # Per-socket outbound queue; overflow policy is drop_oldest, coalesce or disconnect
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_OVERFLOW_POLICY: str = "drop_oldest"
+    # Merge bursts of board events into one BATCH frame per window; 0 disables
+    WS_COALESCE_WINDOW_MS: int = 0
+    # Sequenced board events kept per board for reconnect replay, and how many boards to keep
+    WS_REPLAY_BUFFER_SIZE: int = 500
+    WS_REPLAY_MAX_BOARDS: int = 1000
+    # Seconds between server PINGs, and silence after which a socket is evicted; 0 disables
+    WS_HEARTBEAT_INTERVAL: float = 20
+    WS_IDLE_TIMEOUT: float = 60
+    # Connection caps; new sockets beyond them are closed with 1013, 0 means unlimited
+    WS_MAX_CONNECTIONS_PER_USER: int = 20
+    WS_MAX_CONNECTIONS_PER_BOARD: int = 2000
+    # *_UPDATED events carry only the changed fields (plus id/version); true restores full entities
+    WS_FULL_UPDATE_PAYLOADS: bool = False
+    # PRESENCE snapshots go out at most once per interval per worker and list at most this many viewers
+    WS_PRESENCE_INTERVAL_MS: int = 1000
+    WS_PRESENCE_MAX_VIEWERS: int = 50
+    # Authenticated users are cached per worker for this long (0 disables the cache)
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_SIZE: int = 10000
+    # Argon2 runs in a "process" (default) or "thread" pool; 0 workers means one per core.
+    # Logins beyond MAX_PENDING queued hashes get 503 instead of waiting
+    PASSWORD_HASH_BACKEND: str = "process"
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Outgoing mail; point MAIL_SERVER/MAIL_PORT at a local stub SMTP server with
+    # MAIL_STARTTLS and MAIL_USE_CREDENTIALS off for development and tests
+    MAIL_SERVER: str = "smtp.gmail.com"
+    MAIL_PORT: int = 587
+    MAIL_STARTTLS: bool = True
+    MAIL_SSL_TLS: bool = False
+    MAIL_USE_CREDENTIALS: bool = True
+    # Mail is queued and sent by background workers, each over one reused SMTP connection
+    MAIL_QUEUE_SIZE: int = 1000
+    MAIL_WORKERS: int = 1
+    MAIL_MAX_RETRIES: int = 3
+    # Bulk card creation switches from multi-row INSERT ... RETURNING to COPY at this many cards
+    CARD_BULK_COPY_THRESHOLD: int = 1000
+    # Deleted lists/cards are remembered this long for GET /boards/{id}/changes; clients
+    # polling with an older `since` are told to reload the board
+    TOMBSTONE_RETENTION_DAYS: int = 30
+    # GET /metrics requires "Authorization: Bearer <METRICS_TOKEN>"; empty disables the endpoint
+    METRICS_TOKEN: str = ""
 
 
 settings = Settings()
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+Event = Tuple[Callable[..., Awaitable[Any]], tuple]
+
+
+class EventDispatcher:
+    """
+    Runs post-commit event handlers (WebSocket broadcasts etc.) in a background task,
+    in the order their transactions committed, so requests don't wait on the fan-out.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def dispatch(self, events: Iterable[Event]):
+        if self._task is None or self._task.done():
+            # A fresh queue binds to the running loop; carry over whatever the dead
+            # worker left undelivered so those events are not lost
+            queue = asyncio.Queue()
+            if self._queue is not None:
+                while not self._queue.empty():
+                    queue.put_nowait(self._queue.get_nowait())
+            self._queue = queue
+            self._task = asyncio.create_task(self._run())
+        for event in events:
+            self._queue.put_nowait(event)
+
+    async def stop(self, timeout: float = 10):
+        """Deliver whatever is still queued within timeout seconds, then stop the worker task"""
+        if self._task is None:
+            return
+        try:
+            # A handler stuck on the network (or a worker that died) must not hold up shutdown
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Event queue not drained, {self._queue.qsize()} events dropped")
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            handler, args = await self._queue.get()
+            try:
+                await handler(*args)
+            except Exception as e:
+                print(f"Error dispatching event: {e}")
+            finally:
+                self._queue.task_done()
+
+
+event_dispatcher = EventDispatcher()
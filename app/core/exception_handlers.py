@@ -10,7 +10,9 @@ from app.core.exceptions import (
     BoardNotFound,
     UserNotAuthenticated,
     ListNotFound,
-    CardNotFound
+    CardNotFound,
+    PasswordHashingBusy,
+    PermissionDenied
 )
 
 
@@ -49,3 +51,12 @@ def register_exception_handlers(app: FastAPI):
     @app.exception_handler(CardNotFound)
     async def card_not_found(_, __):
         return JSONResponse(status_code=404, content={"detail": "Card not found"})
+
+    @app.exception_handler(PermissionDenied)
+    async def permission_denied(_, __):
+        return JSONResponse(status_code=403, content={"detail": "Permission denied"})
+
+    @app.exception_handler(PasswordHashingBusy)
+    async def password_hashing_busy(_, __):
+        return JSONResponse(status_code=503, content={"detail": "Server busy, try again"},
+                            headers={"Retry-After": "1"})
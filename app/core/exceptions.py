@@ -52,3 +52,6 @@ class InvitationNotFound(Exception):
 class InvitationAlreadyResponded(Exception):
     pass
 
+
+class PasswordHashingBusy(Exception):
+    pass
@@ -0,0 +1,98 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from passlib.context import CryptContext
+
+from app.core.exceptions import PasswordHashingBusy
+
+pwd_context = CryptContext(schemes=['argon2'], deprecated='auto')
+
+
+def _timed(func: Callable[..., Any], *args) -> tuple:
+    # Runs in the pool; reports the pure hashing time separately from time spent queued
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+class HashPool:
+    """
+    Runs Argon2 off the event loop, by default in worker processes so hashing never
+    competes with request handling for the GIL. At most max_pending hashes may be
+    queued or running; beyond that calls fail fast with PasswordHashingBusy instead
+    of piling up behind a login burst.
+    """
+
+    def __init__(self, backend: str = "process", workers: int = 0, max_pending: int = 64):
+        if backend not in ("process", "thread"):
+            raise ValueError(f"Unknown password hashing backend: {backend}")
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.backend == "process":
+            # spawn: forking a process that runs an event loop and threads is not safe
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="argon2")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, password, hashed_password)
+
+    async def _run(self, func: Callable[..., Any], *args):
+        if self.max_pending and self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHashingBusy("Too many password hashes in progress")
+        self.start()
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            result, elapsed = await asyncio.get_running_loop().run_in_executor(self._executor, _timed, func, *args)
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        self.hash_seconds += elapsed
+        self.wait_seconds += time.perf_counter() - start - elapsed
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.completed or 1
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_hash_ms": self.hash_seconds / done * 1000,
+            "avg_wait_ms": self.wait_seconds / done * 1000
+        }
@@ -0,0 +1,100 @@
+"""
+Fractional ordering keys for cards and lists.
+
+A rank is a base-62 string compared byte-wise (the columns use COLLATE "C"). A key can
+always be generated between any two others, so moving an item rewrites only that item.
+Keys never end with the lowest digit, which is what guarantees there is room between them.
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+# Keys longer than this trigger a background rebalance of their list/board
+MAX_RANK_LENGTH = 16
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """A key sorting after `before` and before `after`; None means the start/end of the sequence"""
+    before = before or ""
+    if after is None:
+        return _after(before)
+    if before >= after:
+        raise ValueError(f"Rank {before!r} is not below {after!r}")
+    if not before:
+        return _before(after)
+    return _midpoint(before, after)
+
+
+def ranks_between(before: Optional[str], after: Optional[str], count: int) -> List[str]:
+    """
+    count ascending keys between `before` and `after`, found by bisecting the gap so a
+    batch stays short (a chain of rank_between calls would grow with every key)
+    """
+    if count <= 0:
+        return []
+    if count == 1:
+        return [rank_between(before, after)]
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Rank {before!r} is not below {after!r}")
+    mid = _midpoint(before or "", after)
+    half = count // 2
+    return ranks_between(before, mid, half) + [mid] + ranks_between(mid, after, count - half - 1)
+
+
+def _after(a: str) -> str:
+    # Step instead of bisecting towards the end: appending is the common case and
+    # this keeps keys one character longer per ~31 appends instead of per ~6
+    if not a:
+        return DIGITS[BASE // 2]
+    digit = DIGITS.index(a[0])
+    if digit < BASE - 1:
+        return DIGITS[digit + 1]
+    return a[0] + _after(a[1:])
+
+
+def _before(b: str) -> str:
+    digit = DIGITS.index(b[0])
+    if digit > 1:
+        return DIGITS[digit - 1]
+    if digit == 1:
+        return DIGITS[0] + DIGITS[-1]
+    return b[0] + _before(b[1:])
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    if b is not None:
+        # Keep the shared prefix (a is padded with the lowest digit)
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # Consecutive first digits: go one digit deeper
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def spaced_ranks(count: int) -> List[str]:
+    """count ascending keys spread evenly over the key space, as short as possible"""
+    width = 1
+    while BASE ** width <= count + 1:
+        width += 1
+    span = BASE ** width
+    ranks = []
+    for i in range(1, count + 1):
+        value = i * span // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        ranks.append("".join(reversed(digits)).rstrip(DIGITS[0]))
+    return ranks
+
+
+def needs_rebalance(rank: str) -> bool:
+    return len(rank) > MAX_RANK_LENGTH
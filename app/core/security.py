@@ -1,28 +1,30 @@
-import asyncio
 from datetime import timedelta, datetime, UTC
 from typing import Optional
 import jwt
 from jwt import PyJWTError
-from passlib.context import CryptContext
 from app.config import settings
-from concurrent.futures import ThreadPoolExecutor
+from app.core.hashPool import HashPool
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 15
 
-pwd_context = CryptContext(schemes=['argon2'], deprecated='auto')
-executor = ThreadPoolExecutor(max_workers=4)
+hash_pool = HashPool(
+    backend=settings.PASSWORD_HASH_BACKEND,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
 
 
-def hash_password(password: str) -> str:
+async def hash_password(password: str) -> str:
+    """Hashes in the password pool; raises PasswordHashingBusy when too many hashes are already queued"""
     if not password:
         raise ValueError("Password cannot be empty")
-    return pwd_context.hash(password)
+    return await hash_pool.hash(password)
 
 
 async def verify_password(password: str, hashed_password: str) -> bool:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(executor, pwd_context.verify, password, hashed_password)
+    """Raises PasswordHashingBusy when too many hashes are already queued"""
+    return await hash_pool.verify(password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -1,10 +1,12 @@
 from app.database.session import new_session
 from contextlib import asynccontextmanager
+from app.core.eventDispatcher import EventDispatcher, event_dispatcher
 from app.repositories.UserRepo import UserRepository
 from app.repositories.BoardRepo import BoardRepository
 from app.repositories.ListRepo import ListRepository
 from app.repositories.CardRepo import CardRepository
 from app.repositories.BoardUserRepository import BoardUserRepository
+from app.repositories.TombstoneRepo import TombstoneRepository
 
 
 class _UnitOfWork:
@@ -15,12 +17,19 @@ class _UnitOfWork:
         self.list = ListRepository(session)
         self.card = CardRepository(session)
         self.board_user = BoardUserRepository(session)
+        self.tombstone = TombstoneRepository(session)
+        self.events = []
+
+    def add_event(self, handler, *args):
+        """Schedule handler(*args) to run in the background once this transaction commits"""
+        self.events.append((handler, args))
 
 
 
 class UnitOfWork:
-    def __init__(self, session_factory=new_session):
+    def __init__(self, session_factory=new_session, dispatcher: EventDispatcher = event_dispatcher):
         self.session_factory = session_factory
+        self.dispatcher = dispatcher
 
     @asynccontextmanager
     async def __call__(self):
@@ -33,4 +42,7 @@ class UnitOfWork:
             await session.rollback()
             raise
         finally:
-            session.close()
+            await session.close()
+        # Only reached after a successful commit; the connection is already back in the pool
+        if uow.events:
+            self.dispatcher.dispatch(uow.events)
@@ -0,0 +1,17 @@
+import uuid
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.database.session import Base
+
+
+class BoardEventSeq(Base):
+    """Last WebSocket event sequence number handed out for a board"""
+    __tablename__ = "board_event_seqs"
+
+    board_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("boards.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index, UniqueConstraint
 from typing import TYPE_CHECKING
 import uuid
 from app.database.session import Base
@@ -25,6 +25,11 @@ class InvitationStatus(str, enum.Enum):
 class BoardUser(Base):
     """Association table for board members/collaborators"""
     __tablename__ = "board_users"
+    __table_args__ = (
+        UniqueConstraint("board_id", "user_id", name="uq_board_users_board_id_user_id"),
+        # Pending invitations and accepted memberships of a user
+        Index("ix_board_users_user_id_status", "user_id", "status"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -1,18 +1,22 @@
 import uuid
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, DateTime, Integer, ForeignKey
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index
 
 from app.database.session import Base
 
 
 class CardModel(Base):
     __tablename__ = "cards"
+    __table_args__ = (
+        Index("ix_cards_list_id_rank", "list_id", "rank", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(150), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
-    position: Mapped[int] = mapped_column(Integer, default=0)
+    # Fractional ordering key within the list (app.core.lexorank), compared byte-wise
+    rank: Mapped[str] = mapped_column(String(64, collation="C"), nullable=False)
     list_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("lists.id", ondelete="CASCADE"),
         nullable=False
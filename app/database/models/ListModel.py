@@ -1,15 +1,19 @@
 import uuid
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Integer, DateTime
+from sqlalchemy import ForeignKey, String, DateTime, Index
 from app.database.session import Base
 
 
 class ListModel(Base):
     __tablename__ = "lists"
+    __table_args__ = (
+        Index("ix_lists_board_id_rank", "board_id", "rank", "id"),
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(100), nullable=False)
-    position: Mapped[int] = mapped_column(Integer, default=0)
+    # Fractional ordering key within the board (app.core.lexorank), compared byte-wise
+    rank: Mapped[str] = mapped_column(String(64, collation="C"), nullable=False)
     board_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("boards.id", ondelete="CASCADE"),
         nullable=False
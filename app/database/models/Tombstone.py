@@ -0,0 +1,22 @@
+import uuid
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime, ForeignKey, Index
+from app.database.session import Base
+
+
+class Tombstone(Base):
+    """Record of a deleted list or card, so delta sync clients learn about deletions"""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_board_id_deleted_at", "board_id", "deleted_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    board_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("boards.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -2,4 +2,6 @@ from app.database.models.User import UserModel
 from app.database.models.Board import Board
 from app.database.models.CardModel import CardModel
 from app.database.models.ListModel import ListModel
-from app.database.models.BoardUser import BoardUser
\ No newline at end of file
+from app.database.models.BoardUser import BoardUser
+from app.database.models.BoardEventSeq import BoardEventSeq
+from app.database.models.Tombstone import Tombstone
@@ -1,14 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.auth_api import authRouter
 from app.api.board_api import boardRouter
 from app.api.list_api import listRouter
 from app.api.card_api import cardRouter
-from app.api.websocket_api import websocketRouter
+from app.api.websocket_api import websocketRouter, get_ws_manager
 from app.api.board_invite_api import inviteRouter
+from app.api.metrics_api import metricsRouter
 from app.core.exception_handlers import register_exception_handlers
+from app.core.eventDispatcher import event_dispatcher
+from app.core.security import hash_pool
+from app.services.EmailService import email_service
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    ws_manager = get_ws_manager()
+    await ws_manager.start()
+    hash_pool.start()
+    email_service.start()
+    yield
+    await event_dispatcher.stop()
+    await ws_manager.stop()
+    await email_service.stop()
+    hash_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,4 +42,5 @@ app.include_router(router=listRouter)
 app.include_router(router=cardRouter)
 app.include_router(router=inviteRouter)
 app.include_router(router=websocketRouter)
+app.include_router(router=metricsRouter)
 register_exception_handlers(app)
\ No newline at end of file
@@ -1,7 +1,8 @@
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, union
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import UUID
+from typing import Optional
 from app.database.models.Board import Board as BoardModel
 from app.database.models.ListModel import ListModel
 from app.database.models.BoardUser import BoardUser, InvitationStatus
@@ -22,12 +23,12 @@ class BoardRepository(BaseRepository):
             .where(BoardUser.status == InvitationStatus.ACCEPTED)
         )
         
-        # Main query: boards where user is owner OR in the accepted boards list
+        owned_boards_subquery = select(BoardModel.id).where(BoardModel.owner_id == user_id)
+
+        # A UNION of the two lookups lets each use its index; "owner_id = ... OR id IN (...)"
+        # can only be answered by scanning every board
         stmt = select(BoardModel).where(
-            or_(
-                BoardModel.owner_id == user_id,
-                BoardModel.id.in_(accepted_boards_subquery)
-            )
+            BoardModel.id.in_(union(owned_boards_subquery, accepted_boards_subquery))
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
@@ -65,6 +66,12 @@ class BoardRepository(BaseRepository):
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
+    async def get_locked(self, board_id: UUID, exclusive: bool = False) -> Optional[BoardModel]:
+        """The board, row-locked while its lists are ranked; see ListRepository.get_locked"""
+        stmt = select(BoardModel).where(BoardModel.id == board_id).with_for_update(read=not exclusive, key_share=not exclusive)
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
     async def create_board(self, owner_id: UUID, title: str) -> BoardModel:
         try:
             board = BoardModel(title=title, owner_id=owner_id)
@@ -1,14 +1,45 @@
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, bindparam, exists, or_
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import UUID
+from app.database.models.Board import Board
 from app.database.models.BoardUser import BoardUser, InvitationStatus
+from app.database.models.CardModel import CardModel
+from app.database.models.ListModel import ListModel
 from app.database.models.User import UserModel
 from app.repositories.BaseRepo import BaseRepository
 from app.core.exceptions import DataBaseError
 from typing import Optional, List
 
 
+def board_access_clause(board_id, user_id):
+    """
+    SQL condition "the user owns the board or is an accepted member of it", as two EXISTS
+    probes answered from the boards primary key and the board_users (board_id, user_id) index
+    """
+    return or_(
+        exists().where(Board.id == board_id, Board.owner_id == user_id),
+        exists().where(
+            BoardUser.board_id == board_id,
+            BoardUser.user_id == user_id,
+            BoardUser.status == InvitationStatus.ACCEPTED
+        )
+    )
+
+
+# Built once at import: it runs before every board-scoped request
+_HAS_ACCESS_STMT = select(board_access_clause(bindparam("board_id"), bindparam("user_id")))
+# Card and list routes only carry the child's id: resolve its board and check access in the same query
+_LIST_BOARD_STMT = select(ListModel.board_id).where(
+    ListModel.id == bindparam("list_id"),
+    board_access_clause(ListModel.board_id, bindparam("user_id"))
+)
+_CARD_BOARD_STMT = select(ListModel.board_id).join(CardModel, CardModel.list_id == ListModel.id).where(
+    CardModel.id == bindparam("card_id"),
+    board_access_clause(ListModel.board_id, bindparam("user_id"))
+)
+
+
 class BoardUserRepository(BaseRepository):
     def __init__(self, session):
         super().__init__(BoardUser, session)
@@ -111,17 +142,33 @@ class BoardUserRepository(BaseRepository):
         """Returns list of users with 'pending' status for a board"""
         return await self.get_users_by_status(board_id, InvitationStatus.PENDING)
 
-    async def check_user_access(
+    async def has_board_access(
         self,
         board_id: UUID,
         user_id: UUID
     ) -> bool:
-        """Validates if a user has accepted access to a board"""
+        """Whether the user owns the board or is an accepted member, in one round trip"""
         try:
-            board_user = await self.get_by_board_and_user(board_id, user_id)
-            return board_user is not None and board_user.status == InvitationStatus.ACCEPTED
-        except Exception:
-            return False
+            result = await self.session.execute(_HAS_ACCESS_STMT, {"board_id": board_id, "user_id": user_id})
+            return bool(result.scalar())
+        except SQLAlchemyError as e:
+            raise DataBaseError(f"Failed to check board access: {str(e)}")
+
+    async def get_accessible_list_board(self, list_id: UUID, user_id: UUID) -> Optional[UUID]:
+        """Board id of the list if the user can access that board; None if not, or if there is no such list"""
+        try:
+            result = await self.session.execute(_LIST_BOARD_STMT, {"list_id": list_id, "user_id": user_id})
+            return result.scalar()
+        except SQLAlchemyError as e:
+            raise DataBaseError(f"Failed to check list access: {str(e)}")
+
+    async def get_accessible_card_board(self, card_id: UUID, user_id: UUID) -> Optional[UUID]:
+        """Board id of the card if the user can access that board; None if not, or if there is no such card"""
+        try:
+            result = await self.session.execute(_CARD_BOARD_STMT, {"card_id": card_id, "user_id": user_id})
+            return result.scalar()
+        except SQLAlchemyError as e:
+            raise DataBaseError(f"Failed to check card access: {str(e)}")
 
     async def get_pending_invitations_for_user(self, user_id: UUID) -> List[BoardUser]:
         """Get all pending invitations for a specific user"""
@@ -1,7 +1,11 @@
-from sqlalchemy import select, update
+from sqlalchemy import String, Uuid, column, insert, select, update, values
 from sqlalchemy.exc import SQLAlchemyError
+import uuid
 from uuid import UUID
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
 from app.database.models.CardModel import CardModel
+from app.database.models.ListModel import ListModel
 from app.repositories.BaseRepo import BaseRepository
 
 
@@ -10,10 +14,22 @@ class CardRepository(BaseRepository):
         super().__init__(CardModel, session)
 
     async def get_list_cards(self, list_id: UUID):
-        stmt = select(CardModel).where(CardModel.list_id == list_id).order_by(CardModel.position)
+        stmt = select(CardModel).where(CardModel.list_id == list_id).order_by(CardModel.rank, CardModel.id)
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def get_board_cards(self, board_id: UUID, updated_since: Optional[datetime] = None):
+        """Cards of every list on the board, optionally only those changed after updated_since"""
+        stmt = (
+            select(CardModel)
+            .join(ListModel, CardModel.list_id == ListModel.id)
+            .where(ListModel.board_id == board_id)
+        )
+        if updated_since is not None:
+            stmt = stmt.where(CardModel.updated_at > updated_since)
+        result = await self.session.execute(stmt.order_by(CardModel.list_id, CardModel.rank, CardModel.id))
+        return result.scalars().all()
+
     async def create_card(self, list_id: UUID, data: dict, author_id: UUID = None) -> CardModel:
         new_card = CardModel(list_id=list_id, author_id=author_id, **data)
         self.session.add(new_card)
@@ -21,6 +37,37 @@ class CardRepository(BaseRepository):
         await self.session.refresh(new_card)
         return new_card
 
+    async def create_many(
+            self,
+            list_id: UUID,
+            cards: List[dict],
+            author_id: UUID = None,
+            copy_threshold: int = 0
+    ) -> List[CardModel]:
+        """
+        Insert many cards (dicts with title, description and rank) with a multi-row
+        INSERT ... RETURNING, or with COPY once there are copy_threshold or more of them.
+        Ids and timestamps are generated here, so a COPY needs nothing back from the database.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {"id": uuid.uuid4(), "list_id": list_id, "author_id": author_id, "description": None,
+             "created_at": now, "updated_at": now, **card}
+            for card in cards
+        ]
+        connection = await self.session.connection()
+        if copy_threshold and len(rows) >= copy_threshold and connection.dialect.driver == "asyncpg":
+            raw = await connection.get_raw_connection()
+            columns = list(rows[0])
+            await raw.driver_connection.copy_records_to_table(
+                CardModel.__tablename__,
+                columns=columns,
+                records=[tuple(row[name] for name in columns) for row in rows]
+            )
+            return [CardModel(**row) for row in rows]
+        result = await self.session.execute(insert(CardModel).returning(CardModel, sort_by_parameter_order=True), rows)
+        return list(result.scalars().all())
+
     async def update_card(self, card: CardModel, data: dict) -> CardModel:
         for key, value in data.items():
             if hasattr(card, key) and value is not None:
@@ -28,24 +75,79 @@ class CardRepository(BaseRepository):
         await self.session.flush()
         return card
 
-    async def shift_positions(self, list_id: UUID, start_pos: int, end_pos: int, shift: int):
+    async def neighbour_ranks(
+            self,
+            list_id: UUID,
+            index: Optional[int],
+            exclude_id: Optional[UUID] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Ranks of the cards that would surround a card inserted at `index` (the end when None),
+        ignoring exclude_id (the card being moved). None stands for the start/end of the list.
+        """
+        base = select(CardModel.rank).where(CardModel.list_id == list_id)
+        if exclude_id is not None:
+            base = base.where(CardModel.id != exclude_id)
+        if index is not None and index <= 0:
+            result = await self.session.execute(base.order_by(CardModel.rank, CardModel.id).limit(1))
+            return None, result.scalar()
+        if index is not None:
+            result = await self.session.execute(base.order_by(CardModel.rank, CardModel.id).offset(index - 1).limit(2))
+            ranks = result.scalars().all()
+            if ranks:
+                return ranks[0], ranks[1] if len(ranks) > 1 else None
+        # Past the end
+        result = await self.session.execute(base.order_by(CardModel.rank.desc(), CardModel.id.desc()).limit(1))
+        return result.scalar(), None
+
+    async def get_ordered_ids(self, list_id: UUID) -> List[UUID]:
+        stmt = select(CardModel.id).where(CardModel.list_id == list_id).order_by(CardModel.rank, CardModel.id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def set_ranks(self, ranks: Dict[UUID, str]):
+        """Rewrite many cards' ranks in one executemany UPDATE"""
+        if ranks:
+            await self.session.execute(
+                update(CardModel),
+                [{"id": card_id, "rank": rank} for card_id, rank in ranks.items()]
+            )
+
+    async def get_list_ids(self, card_ids: Iterable[UUID], board_id: Optional[UUID] = None) -> Dict[UUID, UUID]:
+        """card id -> its list id, for the cards that exist (and are on board_id, when given)"""
+        stmt = select(CardModel.id, CardModel.list_id).where(CardModel.id.in_(card_ids))
+        if board_id is not None:
+            stmt = stmt.join(ListModel, ListModel.id == CardModel.list_id).where(ListModel.board_id == board_id)
+        result = await self.session.execute(stmt)
+        return dict(result.all())
+
+    async def get_ranked(self, list_ids: Iterable[UUID]) -> List[Tuple[UUID, UUID, str]]:
+        """(id, list_id, rank) of every card in the lists, in order, without loading whole rows"""
         stmt = (
-            update(CardModel)
-            .where(CardModel.list_id == list_id)
-            .where(CardModel.position >= start_pos)
-            .where(CardModel.position <= end_pos)
-            .values(position=CardModel.position + shift)
+            select(CardModel.id, CardModel.list_id, CardModel.rank)
+            .where(CardModel.list_id.in_(list_ids))
+            .order_by(CardModel.list_id, CardModel.rank, CardModel.id)
         )
-        await self.session.execute(stmt)
-        await self.session.flush()
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
 
-    async def shift_positions_from(self, list_id: UUID, start_pos: int, shift: int):
-        """Shifts all cards from start_pos onwards"""
+    async def move_many(self, moves: List[Tuple[UUID, UUID, str]]) -> List[CardModel]:
+        """
+        Set the list and rank of many cards with one UPDATE ... FROM (VALUES ...);
+        moves are (card id, list id, rank). Returns the updated cards.
+        """
+        if not moves:
+            return []
+        data = values(
+            column("id", Uuid), column("list_id", Uuid), column("rank", String),
+            name="moves"
+        ).data(moves)
         stmt = (
             update(CardModel)
-            .where(CardModel.list_id == list_id)
-            .where(CardModel.position >= start_pos)
-            .values(position=CardModel.position + shift)
+            .where(CardModel.id == data.c.id)
+            .values(list_id=data.c.list_id, rank=data.c.rank)
+            .returning(CardModel)
+            .execution_options(synchronize_session=False, populate_existing=True)
         )
-        await self.session.execute(stmt)
-        await self.session.flush()
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
@@ -1,6 +1,8 @@
 from sqlalchemy import select, update
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import UUID
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
 from app.database.models.ListModel import ListModel
 from app.repositories.BaseRepo import BaseRepository
 from app.core.exceptions import DataBaseError
@@ -10,13 +12,16 @@ class ListRepository(BaseRepository):
     def __init__(self, session):
         super().__init__(ListModel, session)
 
-    async def get_board_lists(self, board_id: UUID):
-        stmt = select(ListModel).where(ListModel.board_id == board_id).order_by(ListModel.position)
+    async def get_board_lists(self, board_id: UUID, updated_since: Optional[datetime] = None):
+        stmt = select(ListModel).where(ListModel.board_id == board_id)
+        if updated_since is not None:
+            stmt = stmt.where(ListModel.updated_at > updated_since)
+        stmt = stmt.order_by(ListModel.rank, ListModel.id)
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-    async def create_list(self, board_id: UUID, title: str, position: int = 0) -> ListModel:
-        new_list = ListModel(title=title, board_id=board_id, position=position)
+    async def create_list(self, board_id: UUID, title: str, rank: str) -> ListModel:
+        new_list = ListModel(title=title, board_id=board_id, rank=rank)
         self.session.add(new_list)
         await self.session.flush()
         await self.session.refresh(new_list)
@@ -29,24 +34,57 @@ class ListRepository(BaseRepository):
         await self.session.flush()
         return list_
 
-    async def shift_positions(self, board_id: UUID, start_pos: int, end_pos: int, shift: int):
-        stmt = (
-            update(ListModel)
-            .where(ListModel.board_id == board_id)
-            .where(ListModel.position >= start_pos)
-            .where(ListModel.position <= end_pos)
-            .values(position=ListModel.position + shift)
-        )
-        await self.session.execute(stmt)
-        await self.session.flush()
+    async def get_locked(self, list_id: UUID, exclusive: bool = False) -> Optional[ListModel]:
+        """
+        The list, row-locked while its cards are ranked. Moves and inserts take the weak
+        KEY SHARE lock, so they do not block each other; a rebalance takes the exclusive
+        lock and waits for them (and they for it).
+        """
+        stmt = select(ListModel).where(ListModel.id == list_id).with_for_update(read=not exclusive, key_share=not exclusive)
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
 
-    async def shift_positions_from(self, board_id: UUID, start_pos: int, shift: int):
-        """Shifts all lists from start_pos onwards"""
-        stmt = (
-            update(ListModel)
-            .where(ListModel.board_id == board_id)
-            .where(ListModel.position >= start_pos)
-            .values(position=ListModel.position + shift)
-        )
-        await self.session.execute(stmt)
-        await self.session.flush()
+    async def get_many_locked(self, list_ids: Iterable[UUID], board_id: Optional[UUID] = None) -> List[ListModel]:
+        """
+        Several lists under the same lock as get_locked, taken in id order so batches cannot deadlock.
+        With board_id, lists of other boards are neither returned nor locked.
+        """
+        stmt = select(ListModel).where(ListModel.id.in_(list_ids))
+        if board_id is not None:
+            stmt = stmt.where(ListModel.board_id == board_id)
+        stmt = stmt.order_by(ListModel.id).with_for_update(read=True, key_share=True)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def neighbour_ranks(
+            self,
+            board_id: UUID,
+            index: Optional[int],
+            exclude_id: Optional[UUID] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Ranks around a list inserted at `index` of the board (the end when None); see CardRepository"""
+        base = select(ListModel.rank).where(ListModel.board_id == board_id)
+        if exclude_id is not None:
+            base = base.where(ListModel.id != exclude_id)
+        if index is not None and index <= 0:
+            result = await self.session.execute(base.order_by(ListModel.rank, ListModel.id).limit(1))
+            return None, result.scalar()
+        if index is not None:
+            result = await self.session.execute(base.order_by(ListModel.rank, ListModel.id).offset(index - 1).limit(2))
+            ranks = result.scalars().all()
+            if ranks:
+                return ranks[0], ranks[1] if len(ranks) > 1 else None
+        result = await self.session.execute(base.order_by(ListModel.rank.desc(), ListModel.id.desc()).limit(1))
+        return result.scalar(), None
+
+    async def get_ordered_ids(self, board_id: UUID) -> List[UUID]:
+        stmt = select(ListModel.id).where(ListModel.board_id == board_id).order_by(ListModel.rank, ListModel.id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def set_ranks(self, ranks: Dict[UUID, str]):
+        if ranks:
+            await self.session.execute(
+                update(ListModel),
+                [{"id": list_id, "rank": rank} for list_id, rank in ranks.items()]
+            )
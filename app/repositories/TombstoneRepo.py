@@ -0,0 +1,26 @@
+from sqlalchemy import delete, select
+from uuid import UUID
+from datetime import datetime
+from typing import List, Optional
+from app.database.models.Tombstone import Tombstone
+from app.repositories.BaseRepo import BaseRepository
+
+
+class TombstoneRepository(BaseRepository):
+    def __init__(self, session):
+        super().__init__(Tombstone, session)
+
+    async def add_tombstone(self, board_id: UUID, entity_type: str, entity_id: UUID) -> Tombstone:
+        return await self.add(Tombstone(board_id=board_id, entity_type=entity_type, entity_id=entity_id))
+
+    async def get_board_tombstones(self, board_id: UUID, since: Optional[datetime] = None) -> List[Tombstone]:
+        stmt = select(Tombstone).where(Tombstone.board_id == board_id)
+        if since is not None:
+            stmt = stmt.where(Tombstone.deleted_at > since)
+        result = await self.session.execute(stmt.order_by(Tombstone.deleted_at))
+        return result.scalars().all()
+
+    async def prune_board_tombstones(self, board_id: UUID, before: datetime):
+        await self.session.execute(
+            delete(Tombstone).where(Tombstone.board_id == board_id, Tombstone.deleted_at < before)
+        )
@@ -1,16 +1,35 @@
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.database.models.User import UserModel
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, bindparam
 from uuid import UUID
 from typing import List, Optional
 from datetime import datetime, timedelta
+from app.core.exceptions import UserAlreadyExistError
 from app.repositories.BaseRepo import BaseRepository, DataBaseError
+from app.repositories.BoardUserRepository import board_access_clause
+
+# Built once at import: it runs on every board socket (re)connect, where statement construction shows up
+_BOARD_ACCESS_STMT = select(
+    board_access_clause(bindparam("board_id"), UserModel.id)
+).where(UserModel.id == bindparam("uid"))
 
 
 class UserRepository(BaseRepository):
     def __init__(self, session):
         super().__init__(UserModel, session)
 
+    async def add(self, user: UserModel) -> UserModel:
+        try:
+            self.session.add(user)
+            await self.session.flush()
+            return user
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise UserAlreadyExistError("User already exist") from e
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise DataBaseError(f"Failed to add user: {str(e)}")
+
     async def get_by_email(self, email: str) -> UserModel:
         stmt = select(UserModel).where(UserModel.email == email)
         result = await self.session.execute(stmt)
@@ -37,6 +56,14 @@ class UserRepository(BaseRepository):
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
+    async def get_board_access(self, uid: UUID, board_id: UUID) -> Optional[bool]:
+        """
+        Whether the user owns the board or is an accepted member, in one round trip.
+        Returns None if the user does not exist.
+        """
+        result = await self.session.execute(_BOARD_ACCESS_STMT, {"uid": uid, "board_id": board_id})
+        return result.scalars().first()
+
     async def delete_old_unverified(self, days: int = 2) -> int:
         two_days_ago = datetime.utcnow() - timedelta(days=2)
         stmt = (
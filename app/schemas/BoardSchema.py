@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 import uuid
+from datetime import datetime
 from app.schemas.ListSchema import ListOut
 from app.schemas.CardSchema import CardOut
 
@@ -32,3 +33,21 @@ class BoardFullOut(BoardOut):
 
     class Config:
         from_attributes = True
+
+
+class TombstoneOut(BaseModel):
+    id: uuid.UUID
+    deleted_at: datetime
+
+
+class BoardChangesOut(BaseModel):
+    board_id: uuid.UUID
+    since: datetime | None
+    # Pass back as `since` on the next poll
+    server_time: datetime
+    # `since` was older than the tombstone retention: this is the full board, not a delta
+    resync: bool = False
+    lists: list[ListOut] = []
+    cards: list[CardOut] = []
+    deleted_lists: list[TombstoneOut] = []
+    deleted_cards: list[TombstoneOut] = []
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uuid
 from datetime import datetime
 
@@ -6,7 +6,19 @@ from datetime import datetime
 class CardCreate(BaseModel):
     title: str
     description: str | None = None
-    position: int = 0
+    # Index to insert at; the end of the list when omitted
+    position: int | None = None
+
+
+class CardBulkItem(BaseModel):
+    title: str
+    description: str | None = None
+
+
+class CardBulkCreate(BaseModel):
+    cards: list[CardBulkItem] = Field(min_length=1, max_length=10000)
+    # Index the cards are inserted at, in the given order; the end of the list when omitted
+    position: int | None = None
 
 
 class CardUpdate(BaseModel):
@@ -20,7 +32,7 @@ class CardOut(BaseModel):
     id: uuid.UUID
     title: str
     description: str | None
-    position: int
+    rank: str
     list_id: uuid.UUID
     author_id: uuid.UUID | None
     created_at: datetime
@@ -28,3 +40,23 @@ class CardOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CardMove(BaseModel):
+    card_id: uuid.UUID
+    list_id: uuid.UUID
+    # Index in the target list once the earlier moves of the batch are applied
+    position: int
+
+
+class CardMoveBatch(BaseModel):
+    moves: list[CardMove] = Field(min_length=1, max_length=500)
+
+
+class CardMoveBatchOut(BaseModel):
+    # Every card whose list or rank changed, respaced neighbours included
+    cards: list[CardOut]
+
+
+class CardBulkCreateOut(BaseModel):
+    cards: list[CardOut]
@@ -4,7 +4,8 @@ import uuid
 
 class ListCreate(BaseModel):
     title: str
-    position: int = 0
+    # Index to insert at; the end of the board when omitted
+    position: int | None = None
 
 
 class ListUpdate(BaseModel):
@@ -15,7 +16,7 @@ class ListUpdate(BaseModel):
 class ListOut(BaseModel):
     id: uuid.UUID
     title: str
-    position: int
+    rank: str
     board_id: uuid.UUID
 
     class Config:
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import List
+import uuid
+
+from app.schemas.CardSchema import CardUpdate
+
+
+class MoveCardIn(BaseModel):
+    card_id: uuid.UUID
+    list_id: uuid.UUID
+    position: int
+
+
+class UpdateCardIn(CardUpdate):
+    card_id: uuid.UUID
+
+
+class ReorderListIn(BaseModel):
+    list_id: uuid.UUID
+    position: int
+
+
+class SubscriptionIn(BaseModel):
+    list_ids: List[uuid.UUID] | None = None
+    event_types: List[str] | None = None
+
+
+class SubscriptionOut(BaseModel):
+    list_ids: List[uuid.UUID] | None
+    event_types: List[str] | None
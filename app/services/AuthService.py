@@ -1,6 +1,5 @@
 from uuid import UUID
-import asyncio
-from app.services.EmailService import EmailService
+from app.services.EmailService import email_service
 from app.schemas.UserSchema import (UserCreate,
                                     UserSignIn,
                                     UserReadSchema)
@@ -10,10 +9,12 @@ from app.core.exceptions import (
     UserAlreadyVerifiedException,
     UserAlreadyExistError,
     UserNotVerifiedException,
-    InvalidCredentials
+    InvalidCredentials,
+    PermissionDenied
 
 )
 from app.core.unitOfWork import UnitOfWork
+from app.core.userCache import user_cache
 from app.services.UserService import UserService
 from app.core.security import (
     verify_password,
@@ -27,7 +28,6 @@ class AuthService:
     def __init__(self, uow: UnitOfWork):
         self.uow = uow
         self.user_service = UserService(uow=uow)
-        self.email_service = EmailService()
 
     async def verification_process(self, token: str) -> UserReadSchema:
         payload = decode_token(token, expected_type="access")
@@ -40,25 +40,49 @@ class AuthService:
             if user.is_verified:
                 raise UserAlreadyVerifiedException("User already verified")
             updated_user = await uow.users.update(user, {"is_verified": True})
+        user_cache.invalidate(updated_user.id)
         return UserReadSchema.model_validate(updated_user)
 
     async def get_current_user(self, access_token: str):
+        payload = decode_token(access_token, expected_type="access")
+        if not payload:
+            raise InvalidTokenException("Invalid token")
+        uid = UUID(payload.get('sub'))
+        # The token is verified above on every call; only the user lookup is cached
+        user = user_cache.get(uid)
+        if user is not None:
+            return user
         async with self.uow() as uow:
-            payload = decode_token(access_token, expected_type="access")
-            if not payload:
-                raise InvalidTokenException("Invalid token")
-            uid = UUID(payload.get('sub'))
             user = await uow.users.get_by_id(uid=uid)
             if not user:
                 raise UserNotFoundError("User not found")
-            return UserReadSchema.model_validate(user)
+            user = UserReadSchema.model_validate(user)
+        user_cache.put(user)
+        return user
+
+    async def authorize_board_socket(self, access_token: str, board_id: UUID) -> UUID:
+        """
+        Authenticate a board WebSocket and check board access with a single query.
+        Returns the user id; the token is verified before touching the database.
+        """
+        payload = decode_token(access_token, expected_type="access")
+        if not payload:
+            raise InvalidTokenException("Invalid token")
+        uid = UUID(payload.get('sub'))
+        async with self.uow() as uow:
+            has_access = await uow.users.get_board_access(uid=uid, board_id=board_id)
+        if has_access is None:
+            raise UserNotFoundError("User not found")
+        if not has_access:
+            raise PermissionDenied("User has no access to this board")
+        return uid
 
     async def sign_up(self, user_in: UserCreate):
         try:
             new_user = await self.user_service.add_user(user=user_in)
         except UserAlreadyExistError as e:
             raise e
-        asyncio.create_task(self.email_service.send_verification_email(new_user.email))
+        email_service.send_verification_email(new_user.email)
         return new_user
 
     async def signin(self, user_data: UserSignIn):
@@ -68,13 +92,14 @@ class AuthService:
                 raise UserNotFoundError("User not found")
             if not user.is_verified:
                 raise UserNotVerifiedException("User not verified")
-            if not await verify_password(user_data.password,
-                                         user.password_hash):
-                raise InvalidCredentials("Invalid credentials")
-            access_token = create_access_token({"sub": str(user.id)})
-            refresh_token = create_refresh_token({"sub": str(user.id)})
-            return {"access_token": access_token,
-                    "refresh_token": refresh_token}
+        # Verify after the session is closed so a queued hash does not hold a pooled connection
+        if not await verify_password(user_data.password,
+                                     user.password_hash):
+            raise InvalidCredentials("Invalid credentials")
+        access_token = create_access_token({"sub": str(user.id)})
+        refresh_token = create_refresh_token({"sub": str(user.id)})
+        return {"access_token": access_token,
+                "refresh_token": refresh_token}
 
     async def refresh_token(self, refresh_token: str):
         payload = decode_token(refresh_token, expected_type="refresh")
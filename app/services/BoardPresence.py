@@ -0,0 +1,75 @@
+import math
+from typing import Any, Dict, Optional, Tuple
+
+# user id -> id of the card the user has open (None: just viewing the board)
+Viewers = Dict[str, Optional[str]]
+
+
+class BoardPresence:
+    """
+    Who is looking at one board. This worker's sockets are tracked individually; every
+    worker (this one included) reports its viewers through the backplane and those
+    reports expire unless refreshed, so a worker that dies stops counting.
+    Ids are kept as strings, the form they are sent in.
+    """
+
+    __slots__ = ("local", "workers", "last_sent")
+
+    def __init__(self):
+        # connection id -> (user id, open card id)
+        self.local: Dict[str, Tuple[str, Optional[str]]] = {}
+        # worker id -> (expiry on the monotonic clock, viewers reported by that worker)
+        self.workers: Dict[str, Tuple[float, Viewers]] = {}
+        # Last PRESENCE payload sent to this worker's sockets; unchanged snapshots are not resent
+        self.last_sent: Optional[Dict[str, Any]] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.local or self.workers)
+
+    def join(self, connection_id: str, user_id: str):
+        self.local[connection_id] = (user_id, None)
+
+    def leave(self, connection_id: str) -> bool:
+        return self.local.pop(connection_id, None) is not None
+
+    def focus(self, connection_id: str, card_id: Optional[str]) -> bool:
+        """Record the card a socket has open; False if nothing changed"""
+        entry = self.local.get(connection_id)
+        if entry is None or entry[1] == card_id:
+            return False
+        self.local[connection_id] = (entry[0], card_id)
+        return True
+
+    def local_viewers(self) -> Viewers:
+        viewers: Viewers = {}
+        for user_id, card_id in self.local.values():
+            # A user with several tabs shows the card open in any of them
+            if viewers.get(user_id) is None:
+                viewers[user_id] = card_id
+        return viewers
+
+    def report(self, worker_id: str, viewers: Viewers, expires: float = math.inf):
+        if viewers:
+            self.workers[worker_id] = (expires, viewers)
+        else:
+            self.workers.pop(worker_id, None)
+
+    def expire(self, now: float) -> bool:
+        """Forget reports that were not refreshed in time; True if any were dropped"""
+        stale = [worker_id for worker_id, (expires, _) in self.workers.items() if expires < now]
+        for worker_id in stale:
+            del self.workers[worker_id]
+        return bool(stale)
+
+    def snapshot(self, max_viewers: int) -> Dict[str, Any]:
+        """Viewers across all workers, at most max_viewers of them listed, plus the total count"""
+        viewers: Viewers = {}
+        for _, reported in self.workers.values():
+            for user_id, card_id in reported.items():
+                if viewers.get(user_id) is None:
+                    viewers[user_id] = card_id
+        listed = sorted(viewers)[:max_viewers]
+        return {
+            "count": len(viewers),
+            "viewers": [{"user_id": user_id, "card_id": viewers[user_id]} for user_id in listed]
+        }
@@ -1,9 +1,23 @@
 from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.config import settings
 from app.core.unitOfWork import UnitOfWork
-from app.core.unitOfWork import UnitOfWork
-from app.schemas.BoardSchema import BoardCreate, BoardOut, BoardUpdate, BoardFullOut
+from app.schemas.BoardSchema import (BoardCreate, BoardOut, BoardUpdate, BoardFullOut,
+                                     BoardChangesOut, TombstoneOut)
+from app.schemas.CardSchema import CardOut
+from app.schemas.ListSchema import ListOut
 from app.core.exceptions import BoardNotFound
 
+# Consecutive delta polls overlap by this much so rows committed while a poll
+# was reading are not skipped; clients may see such rows twice
+CHANGES_OVERLAP = timedelta(seconds=5)
+
+
+def tombstone_cutoff() -> datetime:
+    """Tombstones older than this are pruned, so deltas can only be computed from later points"""
+    return datetime.utcnow() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+
 
 class BoardService:
     def __init__(self, uow: UnitOfWork):
@@ -34,13 +48,48 @@ class BoardService:
             
             # Use BoardFullOut to validate, but we might want to ensure sorting first.
             if board.lists:
-                board.lists.sort(key=lambda x: x.position)
+                board.lists.sort(key=lambda x: (x.rank, x.id))
                 for lst in board.lists:
                     if lst.cards:
-                        lst.cards.sort(key=lambda x: x.position)
+                        lst.cards.sort(key=lambda x: (x.rank, x.id))
             
             return BoardFullOut.model_validate(board)
 
+    async def get_board_changes(self, user_id: UUID, board_id: UUID, since: Optional[datetime] = None):
+        """
+        Lists and cards changed after `since`, plus tombstones for deletions. When `since` is
+        older than the tombstone retention window the deletions are unknown: the whole board
+        is returned with resync set, and the client replaces what it holds.
+        """
+        server_time = datetime.utcnow() - CHANGES_OVERLAP
+        if since is not None and since.tzinfo is not None:
+            # Timestamps are stored as naive UTC
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        resync = since is not None and since < tombstone_cutoff()
+        if resync:
+            since = None
+
+        async with self.uow() as uow:
+            if not await uow.board_user.has_board_access(board_id, user_id):
+                raise BoardNotFound("Board not found")
+
+            lists = await uow.list.get_board_lists(board_id, updated_since=since)
+            cards = await uow.card.get_board_cards(board_id, updated_since=since)
+            tombstones = await uow.tombstone.get_board_tombstones(board_id, since=since) if since else []
+
+            return BoardChangesOut(
+                board_id=board_id,
+                since=since,
+                server_time=server_time,
+                resync=resync,
+                lists=[ListOut.model_validate(lst) for lst in lists],
+                cards=[CardOut.model_validate(card) for card in cards],
+                deleted_lists=[TombstoneOut(id=t.entity_id, deleted_at=t.deleted_at)
+                               for t in tombstones if t.entity_type == "list"],
+                deleted_cards=[TombstoneOut(id=t.entity_id, deleted_at=t.deleted_at)
+                               for t in tombstones if t.entity_type == "card"],
+            )
+
     async def update_board(self, owner_id: UUID, board_id: UUID, data: BoardUpdate):
         async with self.uow() as uow:
             board = await uow.board.get_board(board_id, owner_id)
@@ -0,0 +1,108 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from app.services.WebSocketConnection import WebSocketConnection
+
+
+def event_lists(message: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Ids of the lists a board event concerns, or None for events that are not about
+    a particular list (members, presence, ...) and go to every socket of the board.
+    """
+    event_type = message.get("type", "")
+    payload = message.get("payload")
+    if not isinstance(payload, dict):
+        return None
+    if event_type.startswith("CARDS_"):
+        # Bulk card events name their list(s) explicitly
+        if payload.get("list_ids"):
+            return payload["list_ids"]
+        if payload.get("list_id"):
+            return [payload["list_id"]]
+    if event_type.startswith("CARD_"):
+        # A card moved between lists matters to followers of both
+        return [list_id for list_id in (payload.get("list_id"), payload.get("from_list_id")) if list_id]
+    if event_type.startswith("LIST_") and payload.get("id"):
+        return [payload["id"]]
+    return None
+
+
+class BoardSubscribers:
+    """
+    The sockets of one board, indexed by the lists they follow so a list event
+    only visits the sockets interested in it. Sockets that never subscribed follow everything.
+    """
+
+    __slots__ = ("connections", "everyone", "by_list", "filtered")
+
+    def __init__(self):
+        self.connections: Dict[str, WebSocketConnection] = {}
+        # Sockets without a list filter
+        self.everyone: Dict[str, WebSocketConnection] = {}
+        # list id -> sockets following that list
+        self.by_list: Dict[str, Dict[str, WebSocketConnection]] = {}
+        # How many sockets have any filter; 0 keeps broadcasting on the fast path
+        self.filtered = 0
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def add(self, connection: WebSocketConnection):
+        self.connections[connection.id] = connection
+        self._index(connection)
+
+    def remove(self, connection: WebSocketConnection):
+        if self.connections.pop(connection.id, None) is not None:
+            self._unindex(connection)
+
+    def subscribe(
+            self,
+            connection: WebSocketConnection,
+            list_ids: Optional[FrozenSet[str]],
+            event_types: Optional[FrozenSet[str]]
+    ):
+        """Replace the socket's filters; None for a dimension means no filtering on it"""
+        self._unindex(connection)
+        connection.list_ids = list_ids
+        connection.event_types = event_types
+        self._index(connection)
+
+    def recipients(self, message: Dict[str, Any]) -> List[WebSocketConnection]:
+        if not self.filtered:
+            return list(self.connections.values())
+        lists = event_lists(message)
+        if lists is None:
+            candidates: Iterable[WebSocketConnection] = self.connections.values()
+        elif not self.by_list:
+            candidates = self.everyone.values()
+        else:
+            matched = dict(self.everyone)
+            for list_id in lists:
+                matched.update(self.by_list.get(list_id, {}))
+            candidates = matched.values()
+        event_type = message.get("type")
+        return [
+            connection for connection in candidates
+            if connection.event_types is None or event_type in connection.event_types
+        ]
+
+    def _index(self, connection: WebSocketConnection):
+        if connection.list_ids is None:
+            self.everyone[connection.id] = connection
+        else:
+            for list_id in connection.list_ids:
+                self.by_list.setdefault(list_id, {})[connection.id] = connection
+        if connection.list_ids is not None or connection.event_types is not None:
+            self.filtered += 1
+
+    def _unindex(self, connection: WebSocketConnection):
+        if connection.list_ids is None:
+            self.everyone.pop(connection.id, None)
+        else:
+            for list_id in connection.list_ids:
+                followers = self.by_list.get(list_id)
+                if followers is not None:
+                    followers.pop(connection.id, None)
+                    if not followers:
+                        del self.by_list[list_id]
+        if connection.list_ids is not None or connection.event_types is not None:
+            self.filtered -= 1
@@ -55,7 +55,7 @@ class BoardUserService:
             
             # Notify the invited user in real-time
             if self.ws_manager:
-                await self.ws_manager.send_to_user(invited_user.id, {
+                uow.add_event(self.ws_manager.send_to_user, invited_user.id, {
                     "type": "INVITATION_RECEIVED",
                     "payload": {
                         "id": str(board_user.id),
@@ -99,7 +99,7 @@ class BoardUserService:
             
             # Broadcast WebSocket event if accepted
             if status == "accepted" and self.ws_manager:
-                await self.ws_manager.broadcast(board_id, {
+                uow.add_event(self.ws_manager.broadcast, board_id, {
                     "type": "USER_JOINED",
                     "user_id": str(user_id),
                     "board_id": str(board_id)
@@ -117,8 +117,8 @@ class BoardUserService:
         User must be owner or accepted member to view.
         """
         async with self.uow() as uow:
-            # Check if user has access (owner or accepted member)
-            has_access = await self.check_board_access(board_id, user_id)
+            # Check if user has access (owner or accepted member), in this same session
+            has_access = await self.check_board_access(board_id, user_id, uow)
             if not has_access:
                 raise PermissionDenied("You don't have access to this board")
             
@@ -134,7 +134,7 @@ class BoardUserService:
                         user_id=board_user.user_id,
                         username=board_user.user.username,
                         email=board_user.user.email,
-                        status=board_user.status.value,
+                        status=board_user.status,
                         invited_by=board_user.invited_by
                     ))
             
@@ -149,17 +149,25 @@ class BoardUserService:
     async def check_board_access(
         self,
         board_id: UUID,
-        user_id: UUID
+        user_id: UUID,
+        uow=None
     ) -> bool:
         """
         Check if user has access to a board.
         Returns True if user is the owner OR has accepted invitation.
+        Pass the caller's open unit of work to reuse its session instead of checking out another.
         """
+        if uow is not None:
+            return await uow.board_user.has_board_access(board_id, user_id)
         async with self.uow() as uow:
-            # Check if user is the board owner
-            board = await uow.board.get_by_id(board_id)
-            if board and board.owner_id == user_id:
-                return True
-            
-            # Check if user has accepted access
-            return await uow.board_user.check_user_access(board_id, user_id)
+            return await uow.board_user.has_board_access(board_id, user_id)
+
+    async def get_list_board_for_user(self, list_id: UUID, user_id: UUID) -> Optional[UUID]:
+        """Board of the list, if the user can access it (see check_board_access); else None"""
+        async with self.uow() as uow:
+            return await uow.board_user.get_accessible_list_board(list_id, user_id)
+
+    async def get_card_board_for_user(self, card_id: UUID, user_id: UUID) -> Optional[UUID]:
+        """Board of the card, if the user can access it (see check_board_access); else None"""
+        async with self.uow() as uow:
+            return await uow.board_user.get_accessible_card_board(card_id, user_id)
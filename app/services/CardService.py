@@ -1,40 +1,123 @@
+from typing import Dict, List, Optional, Set
 from uuid import UUID
+from app.config import settings
+from app.core.lexorank import needs_rebalance, rank_between, spaced_ranks
 from app.core.unitOfWork import UnitOfWork
-from app.schemas.CardSchema import CardCreate, CardOut, CardUpdate
+from app.schemas.CardSchema import (
+    CardBulkCreate,
+    CardBulkCreateOut,
+    CardCreate,
+    CardMove,
+    CardMoveBatchOut,
+    CardOut,
+    CardUpdate
+)
 from app.core.exceptions import CardNotFound, ListNotFound
 from app.database.models.CardModel import CardModel
+from app.services.BoardService import tombstone_cutoff
+from app.services.EventPayload import update_payload
+from app.services.RankPlacement import ranks_at, respace_ranks
 
 
 from app.services.WebSocketManager import WebSocketManager
 
+
+def _respace_entries(cards: List[list]) -> Set[UUID]:
+    for entry, rank in zip(cards, spaced_ranks(len(cards))):
+        entry[1] = rank
+    return {entry[0] for entry in cards}
+
+
+def _plan_moves(orders: Dict[UUID, List[list]], moves: List[CardMove]) -> Set[UUID]:
+    """
+    Apply moves, in order, to in-memory lists of [card id, rank] (list id -> cards in rank order),
+    giving each moved card a rank between its new neighbours. Returns the ids of the cards whose
+    list or rank changed, including neighbours respaced because keys collided or grew too long.
+    """
+    where = {entry[0]: list_id for list_id, cards in orders.items() for entry in cards}
+    changed = set()
+    for move in moves:
+        source = orders[where[move.card_id]]
+        entry = source.pop(next(i for i, (card_id, _) in enumerate(source) if card_id == move.card_id))
+        target = orders[move.list_id]
+        index = min(max(move.position, 0), len(target))
+        before = target[index - 1][1] if index > 0 else None
+        after = target[index][1] if index < len(target) else None
+        stays = where[move.card_id] == move.list_id
+        if not (stays and (before is None or before < entry[1]) and (after is None or entry[1] < after)):
+            if before is not None and after is not None and before >= after:
+                changed |= _respace_entries(target)
+                before = target[index - 1][1] if index > 0 else None
+                after = target[index][1] if index < len(target) else None
+            entry[1] = rank_between(before, after)
+            changed.add(move.card_id)
+        target.insert(index, entry)
+        where[move.card_id] = move.list_id
+    for cards in orders.values():
+        if any(needs_rebalance(rank) for _, rank in cards):
+            changed |= _respace_entries(cards)
+    return changed
+
+
 class CardService:
-    def __init__(self, uow: UnitOfWork, ws: WebSocketManager):
+    def __init__(self, uow: UnitOfWork, ws: WebSocketManager, origin: Optional[str] = None):
         self.uow = uow
         self.ws = ws
+        # Connection id of the client making the change; its socket is not sent the echo
+        self.origin = origin
 
     async def create_card(self, list_id: UUID, data: CardCreate, author_id: UUID = None):
         async with self.uow() as uow:
             # Check if list exists
-            list_item = await uow.list.get_by_id(list_id)
+            list_item = await uow.list.get_locked(list_id)
             if not list_item:
                 raise ListNotFound("List not found")
 
             # Create card
             card = await uow.card.create_card(
                 list_id=list_id,
-                data=data.model_dump(),
+                data={**data.model_dump(exclude={"position"}),
+                      "rank": await self._rank_at(uow, list_item, data.position)},
                 author_id=author_id
             )
             card_out = CardOut.model_validate(card)
             
             # Need board_id to broadcast. List has board_id.
             # Assuming we have list_item from check above.
-            await self.ws.broadcast(list_item.board_id, {
+            uow.add_event(self.ws.broadcast, list_item.board_id, {
                 "type": "CARD_CREATED",
                 "payload": card_out.model_dump(mode='json')
-            })
+            }, self.origin)
             return card_out
 
+    async def create_cards(
+            self, list_id: UUID, data: CardBulkCreate, author_id: UUID = None, board_id: UUID = None
+    ) -> CardBulkCreateOut:
+        """
+        Create many cards with one INSERT (or COPY for large batches), ranked in the given
+        order at data.position, and announce them with a single CARDS_CREATED event.
+        board_id, when given, restricts the list to that board.
+        """
+        async with self.uow() as uow:
+            list_item = await uow.list.get_locked(list_id)
+            if not list_item or (board_id is not None and list_item.board_id != board_id):
+                raise ListNotFound("List not found")
+
+            ranks = await self._ranks_at(uow, list_item, data.position, len(data.cards))
+            cards = await uow.card.create_many(
+                list_id=list_id,
+                cards=[{**item.model_dump(), "rank": rank} for item, rank in zip(data.cards, ranks)],
+                author_id=author_id,
+                copy_threshold=settings.CARD_BULK_COPY_THRESHOLD
+            )
+            created = [CardOut.model_validate(card) for card in cards]
+
+            uow.add_event(self.ws.broadcast, list_item.board_id, {
+                "type": "CARDS_CREATED",
+                "payload": {"list_id": str(list_id), "cards": [card.model_dump(mode='json') for card in created]}
+            }, self.origin)
+            return CardBulkCreateOut(cards=created)
+
     async def get_list_cards(self, list_id: UUID):
         async with self.uow() as uow:
             # Check if list exists? optional, but good for error reporting.
@@ -48,28 +131,43 @@ class CardService:
             cards = await uow.card.get_list_cards(list_id)
             return [CardOut.model_validate(card) for card in cards]
 
-    async def update_card(self, card_id: UUID, data: CardUpdate):
+    async def update_card(self, card_id: UUID, data: CardUpdate, board_id: UUID = None):
+        """board_id, when given, restricts the card and any target list to that board"""
         async with self.uow() as uow:
             card = await uow.card.get_by_id(card_id)
             if not card:
                 raise CardNotFound("Card not found")
+            if board_id is not None:
+                current_list = await uow.list.get_by_id(card.list_id)
+                if not current_list or current_list.board_id != board_id:
+                    raise CardNotFound("Card not found in this board")
 
-            # If moving to another list, check if that list exists
-            if data.list_id:
-                target_list = await uow.list.get_by_id(data.list_id)
+            old_list_id = card.list_id
+            changes = data.model_dump(exclude_unset=True)
+            position = changes.pop("position", None)
+            if data.list_id or position is not None:
+                # A new list or index is a move: rank the card there (the end of the list by default)
+                target_list = await uow.list.get_locked(data.list_id or card.list_id)
                 if not target_list:
                     raise ListNotFound("Target list not found")
-
-            updated_card_model = await uow.card.update_card(card, data.model_dump(exclude_unset=True))
+                if board_id is not None and target_list.board_id != board_id:
+                    raise ListNotFound("Target list not found in this board")
+                changes["rank"] = await self._rank_at(uow, target_list, position, card.id)
+            updated_card_model = await uow.card.update_card(card, changes)
             updated_card = CardOut.model_validate(updated_card_model)
             
             # Use board_id from list
             list_item = await uow.list.get_by_id(card.list_id)
             if list_item:
-                 await self.ws.broadcast(list_item.board_id, {
+                # list_id routes the event to list subscribers, updated_at versions the delta
+                payload = update_payload(updated_card, changes, keep=("list_id", "updated_at", "rank"))
+                if updated_card.list_id != old_list_id:
+                    # Lets sockets following only the old list see the card leave it
+                    payload["from_list_id"] = str(old_list_id)
+                uow.add_event(self.ws.broadcast, list_item.board_id, {
                     "type": "CARD_UPDATED",
-                    "payload": updated_card.model_dump(mode='json')
-                })
+                    "payload": payload
+                }, self.origin)
             
             return updated_card
 
@@ -84,62 +182,127 @@ class CardService:
             await uow.card.delete(card)
             
             if board_id:
-                await self.ws.broadcast(board_id, {
+                await uow.tombstone.add_tombstone(board_id, "card", card_id)
+                await uow.tombstone.prune_board_tombstones(board_id, tombstone_cutoff())
+                uow.add_event(self.ws.broadcast, board_id, {
                     "type": "CARD_DELETED",
-                    "payload": {"id": str(card_id)}
-                })
+                    "payload": {"id": str(card_id), "list_id": str(card.list_id)}
+                }, self.origin)
             return True
 
-    async def move_card(self, card_id: UUID, new_list_id: UUID, new_position: int):
+    async def move_card(self, card_id: UUID, new_list_id: UUID, new_position: int, board_id: UUID = None):
+        """
+        Place the card at index new_position of new_list_id. Only the card's row is written:
+        it gets a rank between its new neighbours. board_id, when given, restricts the card
+        and the target list to that board.
+        """
         async with self.uow() as uow:
             card = await uow.card.get_by_id(card_id)
             if not card:
                 raise CardNotFound("Card not found")
-            
+
             old_list_id = card.list_id
-            old_position = card.position
 
             # Get board_id for broadcasting
             current_list = await uow.list.get_by_id(old_list_id)
             if not current_list:
                 raise ListNotFound("Current list not found")
+            scoped = board_id is not None
+            if scoped and current_list.board_id != board_id:
+                raise CardNotFound("Card not found in this board")
             board_id = current_list.board_id
 
-            # Case 1: Reordering within the same list
+            target_list = await uow.list.get_locked(new_list_id)
+            if not target_list:
+                raise ListNotFound("Target list not found")
+            if scoped and target_list.board_id != board_id:
+                raise ListNotFound("Target list not found in this board")
+
             if old_list_id == new_list_id:
-                if old_position == new_position:
+                before, after = await uow.card.neighbour_ranks(new_list_id, new_position, exclude_id=card.id)
+                if (before is None or before < card.rank) and (after is None or card.rank < after):
+                    # Already there
                     return CardOut.model_validate(card)
-                
-                if new_position > old_position:
-                    await uow.card.shift_positions(old_list_id, old_position + 1, new_position, -1)
-                else:
-                    await uow.card.shift_positions(old_list_id, new_position, old_position - 1, 1)
-                
-                card.position = new_position
-            
-            # Case 2: Moving to a different list
-            else:
-                target_list = await uow.list.get_by_id(new_list_id)
-                if not target_list:
-                    raise ListNotFound("Target list not found")
-                
-                # Check if moving between boards? (Optional, assume lists are on same board or allowed)
-                # If strict: if target_list.board_id != board_id: raise ...
-                
-                # Shift cards in OLD list (close gap)
-                await uow.card.shift_positions_from(old_list_id, old_position + 1, -1)
-                
-                # Shift cards in NEW list (make space)
-                await uow.card.shift_positions_from(new_list_id, new_position, 1)
-                
-                card.list_id = new_list_id
-                card.position = new_position
-
-            updated_card_model = await uow.card.update_card(card, {"list_id": new_list_id, "position": new_position})
+
+            rank = await self._rank_at(uow, target_list, new_position, card.id)
+            updated_card_model = await uow.card.update_card(card, {"list_id": new_list_id, "rank": rank})
             updated_card = CardOut.model_validate(updated_card_model)
 
-            await self.ws.broadcast(board_id, {
+            uow.add_event(self.ws.broadcast, board_id, {
                 "type": "CARD_MOVED",
-                "payload": updated_card.model_dump(mode='json')
-            })
+                "payload": {**updated_card.model_dump(mode='json'), "from_list_id": str(old_list_id)}
+            }, self.origin)
             return updated_card
+
+    async def move_cards(self, board_id: UUID, moves: List[CardMove]) -> CardMoveBatchOut:
+        """
+        Apply many moves, in order, in one transaction. The affected lists are read once,
+        the new ranks are planned in memory and written with a single UPDATE, and one
+        CARDS_MOVED event carries every changed card.
+        """
+        async with self.uow() as uow:
+            # Every card and target list must be on board_id: the caller's access was checked for that board only
+            card_ids = {move.card_id for move in moves}
+            sources = await uow.card.get_list_ids(card_ids, board_id=board_id)
+            if len(sources) < len(card_ids):
+                raise CardNotFound("Card not found in this board")
+            target_ids = {move.list_id for move in moves}
+            lists = {list_item.id: list_item for list_item in await uow.list.get_many_locked(
+                set(sources.values()) | target_ids, board_id=board_id
+            )}
+            if not target_ids <= lists.keys():
+                raise ListNotFound("Target list not found in this board")
+            if not set(sources.values()) <= lists.keys():
+                # A source list moved to another board or was deleted since the cards were read
+                raise CardNotFound("Card not found in this board")
+
+            orders = {list_id: [] for list_id in lists}
+            for card_id, list_id, rank in await uow.card.get_ranked(lists):
+                orders[list_id].append([card_id, rank])
+            changed = _plan_moves(orders, moves)
+            updates = [
+                (card_id, list_id, rank)
+                for list_id, cards in orders.items() for card_id, rank in cards if card_id in changed
+            ]
+            cards = [CardOut.model_validate(card) for card in await uow.card.move_many(updates)]
+
+            if cards:
+                list_ids = {str(sources[card.id]) for card in cards if card.id in sources}
+                list_ids.update(str(card.list_id) for card in cards)
+                uow.add_event(self.ws.broadcast, board_id, {
+                    "type": "CARDS_MOVED",
+                    "payload": {"list_ids": sorted(list_ids), "cards": [card.model_dump(mode='json') for card in cards]}
+                }, self.origin)
+            return CardMoveBatchOut(cards=cards)
+
+    async def rebalance_list(self, list_id: UUID):
+        """Respace the ranks of a list's cards once they have grown long; the order is unchanged"""
+        async with self.uow() as uow:
+            list_item = await uow.list.get_locked(list_id, exclusive=True)
+            if list_item:
+                await self._respace(uow, list_item)
+
+    async def _rank_at(self, uow, list_item, index: Optional[int], card_id: Optional[UUID] = None) -> str:
+        """Rank for a card placed at `index` of the (locked) list; None places it last"""
+        return (await self._ranks_at(uow, list_item, index, 1, card_id))[0]
+
+    async def _ranks_at(
+            self, uow, list_item, index: Optional[int], count: int, card_id: Optional[UUID] = None
+    ) -> List[str]:
+        """Ranks for `count` consecutive cards placed at `index` of the (locked) list"""
+        ranks, respaced = await ranks_at(uow.card, list_item.id, index, count, exclude_id=card_id)
+        if respaced is not None:
+            self._announce_ranks(uow, list_item, respaced)
+        if any(needs_rebalance(rank) for rank in ranks):
+            uow.add_event(self.rebalance_list, list_item.id)
+        return ranks
+
+    async def _respace(self, uow, list_item):
+        self._announce_ranks(uow, list_item, await respace_ranks(uow.card, list_item.id))
+
+    def _announce_ranks(self, uow, list_item, ranks):
+        # Everyone, the client that caused it included, must take the new keys
+        uow.add_event(self.ws.broadcast, list_item.board_id, {
+            "type": "CARDS_RERANKED",
+            "payload": {"list_id": str(list_item.id), "ranks": {str(card_id): rank for card_id, rank in ranks.items()}}
+        })
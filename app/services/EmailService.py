@@ -1,24 +1,81 @@
+import asyncio
 from datetime import timedelta
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+from email.message import EmailMessage
+from typing import List, Optional
+
+import aiosmtplib
+
 from app.config import settings
 from app.core.security import create_access_token
 
 
 class EmailService:
-    def __init__(self):
-        self.conf = ConnectionConfig(
-            MAIL_USERNAME=settings.EMAIL,
-            MAIL_PASSWORD=settings.PASS,
-            MAIL_FROM=settings.EMAIL,
-            MAIL_PORT=587,
-            MAIL_SERVER="smtp.gmail.com",
-            MAIL_STARTTLS=True,
-            MAIL_SSL_TLS=False,
-            USE_CREDENTIALS=True,
-        )
-        self.fm = FastMail(self.conf)
+    """
+    Sends mail in the background. Messages go into a bounded queue drained by worker
+    tasks, each holding one SMTP connection that is opened on first use and reused
+    for later messages. Failed sends are retried with exponential backoff.
+    Use the module-level email_service; start()/stop() run with the app lifespan.
+    """
+
+    def __init__(
+        self,
+        hostname: str = settings.MAIL_SERVER,
+        port: int = settings.MAIL_PORT,
+        username: Optional[str] = settings.EMAIL,
+        password: Optional[str] = settings.PASS,
+        sender: str = settings.EMAIL,
+        start_tls: bool = settings.MAIL_STARTTLS,
+        use_tls: bool = settings.MAIL_SSL_TLS,
+        use_credentials: bool = settings.MAIL_USE_CREDENTIALS,
+        queue_size: int = settings.MAIL_QUEUE_SIZE,
+        workers: int = settings.MAIL_WORKERS,
+        max_retries: int = settings.MAIL_MAX_RETRIES,
+        retry_backoff: float = 1.0
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username if use_credentials else None
+        self.password = password if use_credentials else None
+        self.sender = sender
+        self.start_tls = start_tls
+        self.use_tls = use_tls
+        self.queue_size = queue_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10):
+        """Give queued mail a chance to go out, then stop the workers"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Email queue not drained, {self._queue.qsize()} messages dropped")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
 
-    async def send_verification_email(self, email: str):
+    def send(self, message: EmailMessage) -> bool:
+        """Queue a message; False if the queue is full and it was dropped"""
+        self.start()
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            print(f"Email queue full, dropping mail to {message['To']}")
+            return False
+
+    def send_verification_email(self, email: str) -> bool:
         token = create_access_token(
             data={"email": email},
             expires_delta=timedelta(hours=24)
@@ -26,18 +83,52 @@ class EmailService:
         verify_url = f"{settings.API_URL}/auth/verify/?token={token}"
         template = self._build_verification_template(verify_url)
 
-        message = MessageSchema(
-            subject="Coffee Shop Account Verification Email",
-            recipients=[email],
-            body=template,
-            subtype="html"
+        message = EmailMessage()
+        message["Subject"] = "Coffee Shop Account Verification Email"
+        message["From"] = self.sender
+        message["To"] = email
+        message.set_content(template, subtype="html")
+        return self.send(message)
+
+    def _client(self) -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=30
         )
 
+    async def _run(self):
+        client = self._client()
         try:
-            await self.fm.send_message(message)
-        except Exception as e:
-            print(f"Error sending verification email: {e}")
-            raise
+            while True:
+                message = await self._queue.get()
+                try:
+                    await self._deliver(client, message)
+                finally:
+                    self._queue.task_done()
+        finally:
+            if client.is_connected:
+                client.close()
+
+    async def _deliver(self, client: aiosmtplib.SMTP, message: EmailMessage):
+        for attempt in range(self.max_retries + 1):
+            try:
+                if not client.is_connected:
+                    await client.connect()
+                await client.send_message(message)
+                return
+            except (aiosmtplib.SMTPException, OSError) as e:
+                # Drop the connection so the next attempt starts from a clean session
+                if client.is_connected:
+                    client.close()
+                if attempt == self.max_retries:
+                    print(f"Error sending email to {message['To']}: {e}")
+                    return
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
 
     @staticmethod
     def _build_verification_template(verify_url: str) -> str:
@@ -72,3 +163,6 @@ class EmailService:
           </body>
         </html>
         """
+
+
+email_service = EmailService()
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+Envelope = Dict[str, Any]
+Handler = Callable[[Envelope], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+
+class EventBackplane(ABC):
+    """
+    Pub/sub channel between uvicorn workers.
+    Every published envelope is handed to the subscribed handler of every worker,
+    including the one that published it. Board envelopes are stamped with a
+    per-board "seq" that increases by one with every event.
+    """
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    def subscribe(self, handler: Handler):
+        self._handler = handler
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, envelope: Envelope):
+        ...
+
+    async def current_seq(self, board_id: str) -> Optional[int]:
+        """Last seq handed out for the board (0 before its first event); None when unknown"""
+        return None
+
+    async def _dispatch(self, envelope: Envelope):
+        if self._handler:
+            await self._handler(envelope)
+
+
+class InMemoryBackplane(EventBackplane):
+    """Process-local backplane for tests and single-worker deployments"""
+
+    def __init__(self):
+        super().__init__()
+        self._seqs: Dict[str, int] = defaultdict(int)
+
+    async def publish(self, envelope: Envelope):
+        if envelope["scope"] == "board":
+            self._seqs[envelope["target"]] += 1
+            envelope["seq"] = self._seqs[envelope["target"]]
+        await self._dispatch(envelope)
+
+    async def current_seq(self, board_id: str) -> Optional[int]:
+        return self._seqs.get(board_id, 0)
+
+
+class PostgresBackplane(EventBackplane):
+    """
+    LISTEN/NOTIFY backplane. Holds one connection checked out of the app engine
+    for the lifetime of the worker to listen on; each publish runs its own short
+    transaction on a pooled connection, so boards do not wait on each other.
+    """
+
+    # Postgres rejects NOTIFY payloads of 8000 bytes or more
+    MAX_PAYLOAD_BYTES = 7900
+    CHUNK_PREFIX = "#"
+    # Envelopes needing more NOTIFYs than this (about 500 KB) are not sent, and at most this
+    # many partly received envelopes are kept while waiting for their remaining chunks
+    MAX_CHUNKS = 64
+    MAX_PENDING_ENVELOPES = 64
+    RECONNECT_DELAY = 2
+    # The row lock on board_event_seqs is held until NOTIFY commits, so a board's
+    # events reach listeners in sequence order whichever worker published them
+    NEXT_SEQ_SQL = text("""
+        INSERT INTO board_event_seqs (board_id, seq) VALUES (:board_id, 1)
+        ON CONFLICT (board_id) DO UPDATE SET seq = board_event_seqs.seq + 1
+        RETURNING seq
+    """)
+    NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+    CURRENT_SEQ_SQL = text("SELECT seq FROM board_event_seqs WHERE board_id = :board_id")
+
+    def __init__(self, channel: str = "ws_events", db_engine=None):
+        super().__init__()
+        if db_engine is None:
+            from app.database.session import engine as db_engine
+        self.channel = channel
+        self.engine = db_engine
+        self._conn = None
+        self._driver = None
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._pump_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._chunks: Dict[str, Dict[int, str]] = {}
+        self._stopping = False
+        # Set while publishing falls back to local delivery, so the outage is logged once
+        self._local_only = False
+
+    async def start(self):
+        self._stopping = False
+        self._pump_task = asyncio.create_task(self._pump())
+        await self._connect()
+
+    async def stop(self):
+        self._stopping = True
+        for task in (self._reconnect_task, self._pump_task):
+            if task:
+                task.cancel()
+        await self._close()
+
+    async def publish(self, envelope: Envelope):
+        if self._driver is None:
+            # Not listening (startup, reconnect): keep at least local clients up to date
+            if not self._local_only:
+                self._local_only = True
+                logger.warning("Backplane not connected, delivering events locally only")
+            await self._dispatch(envelope)
+            return
+        async with self.engine.begin() as conn:
+            if envelope["scope"] == "board":
+                result = await conn.execute(self.NEXT_SEQ_SQL, {"board_id": uuid.UUID(envelope["target"])})
+                envelope["seq"] = result.scalar()
+            parts = self._split(json.dumps(envelope, separators=(",", ":")))
+            if parts is None:
+                logger.error(
+                    "Backplane envelope for %s %s exceeds %d chunks, not sent to other workers",
+                    envelope["scope"], envelope["target"], self.MAX_CHUNKS
+                )
+                if envelope["scope"] != "board":
+                    # Nothing to keep in sequence: still reach this worker's clients
+                    await self._dispatch(envelope)
+                    return
+                # Keep the seq so no worker sees a gap; clients refetch the board instead
+                envelope["message"] = {"type": "RESYNC"}
+                parts = self._split(json.dumps(envelope, separators=(",", ":")))
+            for part in parts:
+                await conn.execute(self.NOTIFY_SQL, {"channel": self.channel, "payload": part})
+
+    async def current_seq(self, board_id: str) -> Optional[int]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(self.CURRENT_SEQ_SQL, {"board_id": uuid.UUID(board_id)})
+            return result.scalar() or 0
+
+    async def _connect(self):
+        self._conn = await self.engine.connect()
+        raw = await self._conn.get_raw_connection()
+        self._driver = raw.driver_connection
+        await self._driver.add_listener(self.channel, self._on_notify)
+        self._driver.add_termination_listener(self._on_terminated)
+        if self._local_only:
+            self._local_only = False
+            logger.info("Backplane connected again")
+
+    async def _close(self):
+        driver, conn = self._driver, self._conn
+        self._driver = self._conn = None
+        if driver is not None and not driver.is_closed():
+            try:
+                await driver.remove_listener(self.channel, self._on_notify)
+            except Exception:
+                pass
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    def _on_terminated(self, _connection):
+        self._driver = None
+        if not self._stopping:
+            logger.warning("Backplane listener connection lost, reconnecting")
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        failures = 0
+        while not self._stopping:
+            await asyncio.sleep(self.RECONNECT_DELAY)
+            try:
+                await self._close()
+                await self._connect()
+                return
+            except Exception:
+                # Retries run every few seconds; only the first failure of an outage is worth a traceback
+                failures += 1
+                if failures == 1:
+                    logger.exception("Backplane reconnect failed, retrying every %ss", self.RECONNECT_DELAY)
+                else:
+                    logger.debug("Backplane reconnect attempt %d failed", failures)
+
+    def _on_notify(self, _connection, _pid, _channel, payload: str):
+        self._inbox.put_nowait(payload)
+
+    async def _pump(self):
+        # Single consumer keeps delivery in NOTIFY order
+        while True:
+            payload = await self._inbox.get()
+            try:
+                envelope = self._assemble(payload)
+                if envelope is not None:
+                    await self._dispatch(envelope)
+            except Exception:
+                logger.exception("Backplane delivery error")
+
+    def _split(self, payload: str) -> Optional[List[str]]:
+        """The NOTIFY payloads carrying `payload`, or None if it needs more than MAX_CHUNKS"""
+        # json.dumps escapes non-ASCII, so one character is one byte here
+        if len(payload) <= self.MAX_PAYLOAD_BYTES:
+            return [payload]
+        msg_id = uuid.uuid4().hex
+        size = self.MAX_PAYLOAD_BYTES - 64
+        if -(-len(payload) // size) > self.MAX_CHUNKS:
+            return None
+        parts = [payload[i:i + size] for i in range(0, len(payload), size)]
+        return [f"{self.CHUNK_PREFIX}{msg_id}:{i}:{len(parts)}:{part}" for i, part in enumerate(parts)]
+
+    def _assemble(self, payload: str) -> Optional[Envelope]:
+        if not payload.startswith(self.CHUNK_PREFIX):
+            return json.loads(payload)
+        msg_id, index, total, part = payload[1:].split(":", 3)
+        total = int(total)
+        if total > self.MAX_CHUNKS:
+            raise ValueError(f"Envelope {msg_id} has {total} chunks, more than {self.MAX_CHUNKS}")
+        if msg_id not in self._chunks and len(self._chunks) >= self.MAX_PENDING_ENVELOPES:
+            # A chunk went missing (a worker died mid-publish); forget the oldest incomplete envelope
+            stale = next(iter(self._chunks))
+            del self._chunks[stale]
+            logger.warning("Backplane dropped incomplete envelope %s", stale)
+        parts = self._chunks.setdefault(msg_id, {})
+        parts[int(index)] = part
+        if len(parts) < total:
+            return None
+        del self._chunks[msg_id]
+        return json.loads("".join(parts[i] for i in range(total)))
+
+
+def create_backplane(kind: str, channel: str = "ws_events") -> EventBackplane:
+    if kind == "postgres":
+        return PostgresBackplane(channel=channel)
+    if kind == "memory":
+        return InMemoryBackplane()
+    raise ValueError(f"Unknown WebSocket backplane: {kind}")
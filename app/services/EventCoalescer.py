@@ -0,0 +1,74 @@
+from itertools import count
+from typing import Any, Dict, List, Optional, Tuple
+
+# Within a window the strongest event type for an entity wins, payloads are merged newest-last
+_PRECEDENCE = {
+    "CARD_CREATED": 3, "LIST_CREATED": 3,
+    "CARD_MOVED": 2, "LIST_REORDERED": 2,
+    "CARD_UPDATED": 1, "LIST_UPDATED": 1,
+}
+_DELETED = {"CARD_DELETED", "LIST_DELETED"}
+_CREATED = {"CARD_CREATED", "LIST_CREATED"}
+
+
+class EventCoalescer:
+    """Collects one board's events during a coalescing window and merges superseded ones"""
+
+    def __init__(self):
+        self._events: Dict[Any, Dict[str, Any]] = {}
+        # Connection that caused each pending event; a merge of changes from different clients has none
+        self._origins: Dict[Any, Optional[str]] = {}
+        self._unkeyed = count()
+        # First and last seq that went into the window, merged away or not
+        self.first_seq: Optional[int] = None
+        self.last_seq: Optional[int] = None
+
+    def add(self, message: Dict[str, Any], origin: Optional[str] = None):
+        seq = message.get("seq")
+        if seq is not None:
+            if self.first_seq is None:
+                self.first_seq = seq
+            self.last_seq = seq
+        key = self._key(message)
+        previous = self._events.pop(key, None)
+        if previous is not None:
+            if self._origins.pop(key) != origin:
+                origin = None
+            message = self._merge(previous, message)
+            if message is None:
+                return
+        # Re-inserting moves the entity to the position of its latest change
+        self._events[key] = message
+        self._origins[key] = origin
+
+    def drain(self) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        """The merged events in order, each with its originating connection id (or None)"""
+        events = [(message, self._origins[key]) for key, message in self._events.items()]
+        self._events.clear()
+        self._origins.clear()
+        return events
+
+    def _key(self, message: Dict[str, Any]):
+        event_type = message.get("type", "")
+        payload = message.get("payload")
+        if event_type[:5] in ("CARD_", "LIST_") and isinstance(payload, dict) and "id" in payload:
+            return event_type[:4], payload["id"]
+        return next(self._unkeyed)
+
+    @staticmethod
+    def _merge(previous: Dict[str, Any], current: Dict[str, Any]):
+        if current["type"] in _DELETED:
+            # Clients never saw an entity created and deleted inside the same window
+            return None if previous["type"] in _CREATED else current
+        if previous["type"] in _DELETED:
+            return current
+        event_type = max(previous["type"], current["type"], key=lambda t: _PRECEDENCE.get(t, 0))
+        return {**current, "type": event_type, "payload": merge_payloads(previous["payload"], current["payload"])}
+
+
+def merge_payloads(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a later payload over an earlier one; the result is a delta only if both were"""
+    merged = {**previous, **current}
+    if not (previous.get("partial") and current.get("partial")):
+        merged.pop("partial", None)
+    return merged
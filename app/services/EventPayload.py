@@ -0,0 +1,30 @@
+from typing import Any, Dict, Iterable
+
+from pydantic import BaseModel
+
+from app.config import settings
+
+
+def update_payload(
+        entity: BaseModel,
+        changes: Dict[str, Any],
+        keep: Iterable[str] = (),
+        **extra: Any
+) -> Dict[str, Any]:
+    """
+    Payload of a *_UPDATED event: the entity's id, the fields that were written
+    (non-None values of the service's exclude_unset dict) and the `keep` fields used
+    for routing and versioning, flagged partial. WS_FULL_UPDATE_PAYLOADS sends the
+    whole entity instead, for clients that cannot merge.
+    """
+    full = entity.model_dump(mode='json')
+    if settings.WS_FULL_UPDATE_PAYLOADS:
+        return {**full, **extra}
+    payload = {"id": full["id"], "partial": True}
+    for key in keep:
+        payload[key] = full[key]
+    for key, value in changes.items():
+        if value is not None and key in full:
+            payload[key] = full[key]
+    payload.update(extra)
+    return payload
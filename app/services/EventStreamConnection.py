@@ -0,0 +1,66 @@
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from fastapi import status
+
+from app.services.WebSocketConnection import WebSocketConnection
+from app.services.WebSocketFrame import Frame
+
+# How long (ms) an EventSource waits before reconnecting after the stream drops
+RETRY_MS = 3000
+
+
+def format_event(frame: Frame) -> str:
+    """
+    A frame as a Server-Sent Events record. `id` is the board sequence number, so the
+    browser's automatic reconnect sends it back as Last-Event-ID. Heartbeat pings become comments.
+    """
+    message = frame.message
+    if message.get("type") == "PING":
+        return ": ping\n\n"
+    seq = message.get("seq")
+    if message.get("type") == "BATCH" and seq is None:
+        seqs = [event["seq"] for event in message.get("events", ()) if event.get("seq") is not None]
+        seq = max(seqs) if seqs else None
+    if seq is None:
+        return f"data: {frame.text}\n\n"
+    return f"id: {seq}\ndata: {frame.text}\n\n"
+
+
+class EventStreamConnection(WebSocketConnection):
+    """
+    A board subscriber fed over Server-Sent Events instead of a socket.
+    It is registered with the manager like any board socket (fan-out, filters, heartbeat, caps),
+    but its queue is drained by the streaming response through events() rather than a writer task.
+    Every chunk the client accepts counts as a sign of life, so a stalled stream is reaped by the heartbeat.
+    """
+    __slots__ = ()
+
+    def __init__(self, user_id: Optional[UUID] = None, board_id: Optional[UUID] = None, **kwargs):
+        super().__init__(None, user_id=user_id, board_id=board_id, **kwargs)
+
+    def start(self):
+        # The response body iterates events(); there is no writer task
+        pass
+
+    def close(self, code: int = status.WS_1000_NORMAL_CLOSURE):
+        super().close(code)
+        # Let events() notice and end the response
+        self._wakeup.set()
+
+    async def events(self) -> AsyncIterator[str]:
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                while not self.queue and not self.closed:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                if self.closed:
+                    return
+                yield format_event(self.queue.popleft())
+                self.touch()
+        finally:
+            self.close()
+
+    async def _close_socket(self, code: int):
+        pass
@@ -1,32 +1,40 @@
+from typing import Optional
 from uuid import UUID
+from app.core.lexorank import needs_rebalance
 from app.core.unitOfWork import UnitOfWork
 from app.schemas.ListSchema import ListCreate, ListOut, ListUpdate
-from app.core.exceptions import ListNotFound
+from app.core.exceptions import BoardNotFound, ListNotFound
 from app.database.models.ListModel import ListModel
+from app.services.BoardService import tombstone_cutoff
+from app.services.EventPayload import update_payload
+from app.services.RankPlacement import ranks_at, respace_ranks
 
 
 from app.services.WebSocketManager import WebSocketManager
 
 class ListService:
-    def __init__(self, uow: UnitOfWork, ws: WebSocketManager):
+    def __init__(self, uow: UnitOfWork, ws: WebSocketManager, origin: Optional[str] = None):
         self.uow = uow
         self.ws = ws
+        # Connection id of the client making the change; its socket is not sent the echo
+        self.origin = origin
 
     async def create_list(self, board_id: UUID, data: ListCreate):
         async with self.uow() as uow:
-            # We pass position if present, else default from model/repo logic might handle it.
-            # However, repo takes position as int = 0.
-            # Schema has position default 0.
+            # position is the index to insert at (the end when omitted)
+            board = await uow.board.get_locked(board_id)
+            if not board:
+                raise BoardNotFound("Board not found")
             list_item = await uow.list.create_list(
                 board_id=board_id,
                 title=data.title,
-                position=data.position
+                rank=await self._rank_at(uow, board, data.position)
             )
             created_list = ListOut.model_validate(list_item)
-            await self.ws.broadcast(board_id, {
+            uow.add_event(self.ws.broadcast, board_id, {
                 "type": "LIST_CREATED",
                 "payload": created_list.model_dump(mode='json')
-            })
+            }, self.origin)
             return created_list
 
     async def get_board_lists(self, board_id: UUID):
@@ -53,13 +61,20 @@ class ListService:
             if list_item.board_id != board_id:
                  raise ListNotFound("List not found in this board")
 
-            updated_list_model = await uow.list.update_list(list_item, data.model_dump(exclude_unset=True))
+            changes = data.model_dump(exclude_unset=True)
+            position = changes.pop("position", None)
+            if position is not None:
+                board = await uow.board.get_locked(board_id)
+                changes["rank"] = await self._rank_at(uow, board, position, list_item.id)
+            updated_list_model = await uow.list.update_list(list_item, changes)
             updated_list = ListOut.model_validate(updated_list_model)
             
-            await self.ws.broadcast(board_id, {
+            uow.add_event(self.ws.broadcast, board_id, {
                 "type": "LIST_UPDATED",
-                "payload": updated_list.model_dump(mode='json')
-            })
+                "payload": update_payload(
+                    updated_list, changes, updated_at=updated_list_model.updated_at.isoformat()
+                )
+            }, self.origin)
             return updated_list
 
     async def delete_list(self, board_id: UUID, list_id: UUID):
@@ -72,34 +87,58 @@ class ListService:
                  raise ListNotFound("List not found in this board")
 
             await uow.list.delete(list_item)
-            await self.ws.broadcast(board_id, {
+            # Cards go with the list; delta clients drop them along with it
+            await uow.tombstone.add_tombstone(board_id, "list", list_id)
+            await uow.tombstone.prune_board_tombstones(board_id, tombstone_cutoff())
+            uow.add_event(self.ws.broadcast, board_id, {
                 "type": "LIST_DELETED",
                 "payload": {"id": str(list_id)}
-            })
+            }, self.origin)
             return True
 
     async def reorder_list(self, board_id: UUID, list_id: UUID, new_position: int):
+        """Move the list to index new_position; only its own row is written"""
         async with self.uow() as uow:
             list_item = await uow.list.get_by_id(list_id)
             if not list_item or list_item.board_id != board_id:
                 raise ListNotFound("List not found")
 
-            old_position = list_item.position
-            if old_position == new_position:
+            board = await uow.board.get_locked(board_id)
+            before, after = await uow.list.neighbour_ranks(board_id, new_position, exclude_id=list_id)
+            if (before is None or before < list_item.rank) and (after is None or list_item.rank < after):
                 return ListOut.model_validate(list_item)
 
-            if new_position > old_position:
-                # Shift items between old+1 and new DOWN
-                await uow.list.shift_positions(board_id, old_position + 1, new_position, -1)
-            else:
-                # Shift items between new and old-1 UP
-                await uow.list.shift_positions(board_id, new_position, old_position - 1, 1)
-
-            updated_list_model = await uow.list.update_list(list_item, {"position": new_position})
+            rank = await self._rank_at(uow, board, new_position, list_id)
+            updated_list_model = await uow.list.update_list(list_item, {"rank": rank})
             updated_list = ListOut.model_validate(updated_list_model)
             
-            await self.ws.broadcast(board_id, {
+            uow.add_event(self.ws.broadcast, board_id, {
                 "type": "LIST_REORDERED",
                 "payload": updated_list.model_dump(mode='json')
-            })
+            }, self.origin)
             return updated_list
+
+    async def rebalance_board(self, board_id: UUID):
+        """Respace the ranks of a board's lists once they have grown long; the order is unchanged"""
+        async with self.uow() as uow:
+            board = await uow.board.get_locked(board_id, exclusive=True)
+            if board:
+                await self._respace(uow, board)
+
+    async def _rank_at(self, uow, board, index: Optional[int], list_id: Optional[UUID] = None) -> str:
+        """Rank for a list placed at `index` of the (locked) board; None places it last"""
+        (rank,), respaced = await ranks_at(uow.list, board.id, index, exclude_id=list_id)
+        if respaced is not None:
+            self._announce_ranks(uow, board, respaced)
+        if needs_rebalance(rank):
+            uow.add_event(self.rebalance_board, board.id)
+        return rank
+
+    async def _respace(self, uow, board):
+        self._announce_ranks(uow, board, await respace_ranks(uow.list, board.id))
+
+    def _announce_ranks(self, uow, board, ranks):
+        uow.add_event(self.ws.broadcast, board.id, {
+            "type": "LISTS_RERANKED",
+            "payload": {"ranks": {str(list_id): rank for list_id, rank in ranks.items()}}
+        })
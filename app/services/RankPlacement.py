@@ -0,0 +1,38 @@
+"""
+Rank placement shared by cards within a list and lists within a board. `repo` is the
+children's repository (CardRepository or ListRepository) and `parent_id` the list or board;
+the caller holds the parent's row lock.
+"""
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.lexorank import ranks_between, spaced_ranks
+
+
+async def respace_ranks(repo, parent_id: UUID) -> Dict[UUID, str]:
+    """Give the parent's children evenly spaced ranks in their current order; returns id -> new rank"""
+    child_ids = await repo.get_ordered_ids(parent_id)
+    ranks = dict(zip(child_ids, spaced_ranks(len(child_ids))))
+    await repo.set_ranks(ranks)
+    return ranks
+
+
+async def ranks_at(
+        repo,
+        parent_id: UUID,
+        index: Optional[int],
+        count: int = 1,
+        exclude_id: Optional[UUID] = None
+) -> Tuple[List[str], Optional[Dict[UUID, str]]]:
+    """
+    Ranks for `count` consecutive children placed at `index` of the parent (the end when None),
+    ignoring exclude_id (a child being moved). Also returns the new ranks of every child when
+    they had to be respaced first, else None, so the caller can announce them.
+    """
+    respaced = None
+    before, after = await repo.neighbour_ranks(parent_id, index, exclude_id=exclude_id)
+    if before is not None and after is not None and before >= after:
+        # Two concurrent inserts into the same gap can produce equal keys; spread them out first
+        respaced = await respace_ranks(repo, parent_id)
+        before, after = await repo.neighbour_ranks(parent_id, index, exclude_id=exclude_id)
+    return ranks_between(before, after, count), respaced
@@ -18,15 +18,19 @@ class UserService:
             return UserReadSchema.model_validate(user)
 
     async def add_user(self, user: UserCreate) -> UserReadSchema:
+        # Cheap duplicate check first, in its own short transaction: the expensive
+        # hash runs off the event loop without holding a pooled connection
         async with self.uow() as uow:
             existing_user = await uow.users.get_by_email(email=user.email)
             if existing_user:
                 raise UserAlreadyExistError("User already exist")
-            try:
-                hashed_pass = hash_password(user.password)
-            except ValueError as e:
-                raise ValueError(f"Password error {str(e)}")
+        try:
+            hashed_pass = await hash_password(user.password)
+        except ValueError as e:
+            raise ValueError(f"Password error {str(e)}")
 
+        async with self.uow() as uow:
+            # A concurrent signup with the same email is caught by the unique index
             new_user = UserModel(
                 email=user.email,
                 username=user.username,
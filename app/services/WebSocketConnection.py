@@ -0,0 +1,154 @@
+import asyncio
+import enum
+import time
+from collections import deque
+from functools import reduce
+from typing import Callable, Deque, FrozenSet, Optional, Union
+from uuid import UUID, uuid4
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from app.services.EventCoalescer import merge_payloads
+from app.services.WebSocketFrame import Frame
+
+
+class OverflowPolicy(str, enum.Enum):
+    """What to do when a client's outbound queue is full"""
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class WebSocketConnection:
+    """
+    A socket with its own bounded outbound queue drained by a dedicated writer task.
+    Producers only enqueue, so a slow client never blocks whoever is broadcasting.
+    """
+    __slots__ = (
+        "id", "websocket", "user_id", "board_id", "binary", "list_ids", "event_types", "max_queue", "overflow", "queue", "closed",
+        "dropped", "last_seen", "rtt", "_on_close", "_wakeup", "_writer"
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: Optional[UUID] = None,
+        board_id: Optional[UUID] = None,
+        binary: bool = False,
+        max_queue: int = 256,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        on_close: Optional[Callable[["WebSocketConnection"], None]] = None
+    ):
+        self.id = uuid4().hex
+        self.websocket = websocket
+        # board_id is None for the personal notification channel
+        self.user_id = user_id
+        self.board_id = board_id
+        # MessagePack binary frames instead of JSON text, negotiated via subprotocol
+        self.binary = binary
+        # Board subscription filters; None means everything (see BoardSubscribers)
+        self.list_ids: Optional[FrozenSet[str]] = None
+        self.event_types: Optional[FrozenSet[str]] = None
+        self.max_queue = max_queue
+        self.overflow = OverflowPolicy(overflow)
+        self.queue: Deque[Frame] = deque()
+        self.closed = False
+        self.dropped = 0
+        # Monotonic time of the last frame received from the client; drives idle reaping
+        self.last_seen = time.monotonic()
+        # Round-trip time of the latest heartbeat in seconds, None until the first PONG
+        self.rtt: Optional[float] = None
+        self._on_close = on_close
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._run())
+
+    def send(self, frame: Frame) -> bool:
+        """Queue a frame without waiting for the network. Returns False if it was not queued."""
+        if self.closed:
+            return False
+        if len(self.queue) >= self.max_queue:
+            if self.overflow == OverflowPolicy.DISCONNECT:
+                self.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return False
+            self.dropped += 1
+            if self.overflow == OverflowPolicy.COALESCE and self._coalesce(frame):
+                return True
+            self.queue.popleft()
+        self.queue.append(frame)
+        self._wakeup.set()
+        return True
+
+    async def receive(self) -> Union[str, bytes]:
+        """Wait for the next client frame, text or binary"""
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+        if message.get("text") is not None:
+            return message["text"]
+        return message.get("bytes") or b""
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def close(self, code: int = status.WS_1000_NORMAL_CLOSURE):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if self._on_close:
+            self._on_close(self)
+        asyncio.create_task(self._close_socket(code))
+
+    def _coalesce(self, frame: Frame) -> bool:
+        """Drop queued frames superseded by this one (same type and entity) and queue it last"""
+        key = self._coalesce_key(frame)
+        if key is None:
+            return False
+        kept: Deque[Frame] = deque()
+        superseded = []
+        for queued in self.queue:
+            (superseded if self._coalesce_key(queued) == key else kept).append(queued)
+        if not superseded:
+            return False
+        if frame.message["payload"].get("partial"):
+            # A delta only replaces the fields it carries, so fold the dropped ones into it
+            payloads = [queued.message["payload"] for queued in superseded] + [frame.message["payload"]]
+            frame = Frame({**frame.message, "payload": reduce(merge_payloads, payloads)})
+        kept.append(frame)
+        self.queue = kept
+        return True
+
+    @staticmethod
+    def _coalesce_key(frame: Frame):
+        payload = frame.message.get("payload")
+        if not isinstance(payload, dict) or "id" not in payload:
+            return None
+        return frame.message.get("type"), payload["id"]
+
+    async def _run(self):
+        try:
+            while True:
+                while not self.queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                frame = self.queue.popleft()
+                if self.binary:
+                    await self.websocket.send_bytes(frame.packed)
+                else:
+                    await self.websocket.send_text(frame.text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Client went away or the transport broke; stop accepting messages for it
+            self.close()
+
+    async def _close_socket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
@@ -0,0 +1,125 @@
+import json
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Union
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements, json is the fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - without msgpack clients are only offered JSON
+    msgpack = None
+
+# Subprotocols a client may offer in Sec-WebSocket-Protocol; no subprotocol means JSON
+JSON_SUBPROTOCOL = "trello.json"
+MSGPACK_SUBPROTOCOL = "trello.msgpack"
+# Client-chosen values echoed back in replies exactly as they were sent, whatever they look like
+OPAQUE_KEYS = frozenset({"request_id"})
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(message).decode()
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def pack_message(message: Dict[str, Any]) -> bytes:
+    return msgpack.packb(_compact(message), default=str)
+
+
+def decode_message(data: Union[str, bytes]) -> Any:
+    """Decode a client frame: text frames are JSON, binary frames MessagePack"""
+    if isinstance(data, bytes):
+        if msgpack is None:
+            raise ValueError("Binary frames are not supported")
+        return _expand(msgpack.unpackb(data, timestamp=3))
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _compact(value: Any, key: Optional[str] = None) -> Any:
+    """
+    MessagePack form of a JSON-mode message: ids (id, *_id, *_ids) travel as 16-byte bin
+    and *_at timestamps as the Timestamp extension, which is most of a card's size in JSON.
+    OPAQUE_KEYS are left as they are.
+    """
+    if isinstance(value, dict):
+        return {k: v if k in OPAQUE_KEYS else _compact(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_compact(v, key) for v in value]
+    if isinstance(value, UUID):
+        return value.bytes
+    if isinstance(value, datetime):
+        return _timestamp(value)
+    if isinstance(value, str) and key is not None:
+        if len(value) == 36 and (key == "id" or key.endswith(("_id", "_ids"))):
+            try:
+                # Same bytes as UUID(value).bytes at a fraction of the cost
+                return bytes.fromhex(value.replace("-", ""))
+            except ValueError:
+                return value
+        if key.endswith("_at"):
+            try:
+                return _timestamp(datetime.fromisoformat(value))
+            except ValueError:
+                return value
+    return value
+
+
+def _timestamp(value: datetime):
+    # Naive datetimes in this app are UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return msgpack.Timestamp(math.floor(value.timestamp()), value.microsecond * 1000)
+
+
+def _expand(value: Any) -> Any:
+    """Inverse of _compact for client frames, so services see the same shapes as with JSON"""
+    if isinstance(value, dict):
+        return {k: v if k in OPAQUE_KEYS else _expand(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    if isinstance(value, bytes) and len(value) == 16:
+        return str(UUID(bytes=value))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def negotiate_subprotocol(offered: Iterable[str]) -> Optional[str]:
+    """The first subprotocol offered by the client that the server speaks, in the client's order"""
+    for protocol in offered:
+        if protocol == JSON_SUBPROTOCOL or (protocol == MSGPACK_SUBPROTOCOL and msgpack is not None):
+            return protocol
+    return None
+
+
+class Frame:
+    """
+    An outbound event encoded at most once per wire format, however many sockets it is sent to.
+    The original message is kept for routing and coalescing decisions.
+    """
+
+    __slots__ = ("message", "_text", "_packed")
+
+    def __init__(self, message: Dict[str, Any]):
+        self.message = message
+        self._text: Optional[str] = None
+        self._packed: Optional[bytes] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = encode_message(self.message)
+        return self._text
+
+    @property
+    def packed(self) -> bytes:
+        if self._packed is None:
+            self._packed = pack_message(self.message)
+        return self._packed
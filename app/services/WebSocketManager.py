@@ -1,61 +1,498 @@
-from collections import defaultdict
-from typing import List, Dict, Any
-from uuid import UUID
+import asyncio
+import math
+import time
+from collections import Counter, deque, OrderedDict
+from typing import List, Dict, Any, Iterable, Optional, Deque, Set, Union
+from uuid import UUID, uuid4
 
-from fastapi import WebSocket
+from fastapi import WebSocket, status
+
+from app.services.BoardPresence import BoardPresence
+from app.services.BoardSubscribers import BoardSubscribers
+from app.services.EventBackplane import EventBackplane, InMemoryBackplane
+from app.services.EventCoalescer import EventCoalescer
+from app.services.EventStreamConnection import EventStreamConnection
+from app.services.WebSocketConnection import WebSocketConnection, OverflowPolicy
+from app.services.WebSocketFrame import Frame, MSGPACK_SUBPROTOCOL, decode_message, negotiate_subprotocol
 
 
 class WebSocketManager:
-    def __init__(self):
-        # Maps board_id -> List of active WebSockets (for board-level events)
-        self.active_connections: Dict[UUID, List[WebSocket]] = defaultdict(list)
-        # Maps user_id -> List of active WebSockets (for user-level notifications)
-        self.user_connections: Dict[UUID, List[WebSocket]] = defaultdict(list)
+    def __init__(
+        self,
+        backplane: Optional[EventBackplane] = None,
+        send_queue_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        coalesce_window_ms: int = 0,
+        replay_buffer_size: int = 500,
+        replay_max_boards: int = 1000,
+        heartbeat_interval: float = 20,
+        idle_timeout: float = 60,
+        max_connections_per_user: int = 20,
+        max_connections_per_board: int = 2000,
+        presence_interval_ms: int = 1000,
+        presence_max_viewers: int = 50
+    ):
+        # Maps connection id -> connection; every registry below is a dict so joins and leaves are O(1)
+        self.connections: Dict[str, WebSocketConnection] = {}
+        # Maps board_id -> that board's connections, indexed by subscription (for board-level events)
+        self.active_connections: Dict[UUID, BoardSubscribers] = {}
+        # Maps user_id -> {connection id: connection} (for user-level notifications)
+        self.user_connections: Dict[UUID, Dict[str, WebSocketConnection]] = {}
+        # Open sockets per user across boards and the notification channel, for the per-user cap
+        self._user_counts: Counter = Counter()
+        self.max_connections_per_user = max_connections_per_user
+        self.max_connections_per_board = max_connections_per_board
+        # Every interval each socket is pinged; sockets silent for idle_timeout are evicted (0 disables)
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.send_queue_size = send_queue_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        # Board events arriving within the window are merged and sent as one frame (0 disables)
+        self.coalesce_window = coalesce_window_ms / 1000
+        self._pending: Dict[UUID, EventCoalescer] = {}
+        # Recent sequenced events per board so reconnecting clients can catch up (LRU over boards).
+        # Only boards with sockets on this worker are recorded, so memory follows local, not cluster, traffic
+        self.replay_buffer_size = replay_buffer_size
+        self.replay_max_boards = replay_max_boards
+        self._history: "OrderedDict[UUID, Deque[Dict[str, Any]]]" = OrderedDict()
+        # Who is viewing each board (and which card), sent as throttled PRESENCE snapshots.
+        # Each worker reports its own viewers at most once per interval and on every heartbeat
+        self.worker_id = uuid4().hex
+        self.presence: Dict[UUID, BoardPresence] = {}
+        self.presence_interval = presence_interval_ms / 1000
+        self.presence_max_viewers = presence_max_viewers
+        self._presence_dirty: Set[UUID] = set()
+        self._presence_sync: Set[UUID] = set()
+        # Events go through the backplane so every worker delivers them to its own sockets
+        self.backplane = backplane or InMemoryBackplane()
+        self.backplane.subscribe(self._deliver)
+
+    async def start(self):
+        await self.backplane.start()
+        if self.heartbeat_interval > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        await self.backplane.stop()
+
+    async def _open(
+            self,
+            websocket: WebSocket,
+            user_id: Optional[UUID],
+            board_id: Optional[UUID]
+    ) -> Optional[WebSocketConnection]:
+        subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", ()))
+        await websocket.accept(subprotocol=subprotocol)
+        if self._over_capacity(user_id, board_id):
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return None
+        connection = WebSocketConnection(
+            websocket,
+            user_id=user_id,
+            board_id=board_id,
+            binary=subprotocol == MSGPACK_SUBPROTOCOL,
+            max_queue=self.send_queue_size,
+            overflow=self.overflow_policy,
+            on_close=self._unregister
+        )
+        self._register(connection)
+        return connection
+
+    def _register(self, connection: WebSocketConnection):
+        user_id, board_id = connection.user_id, connection.board_id
+        self.connections[connection.id] = connection
+        if board_id is not None:
+            subscribers = self.active_connections.get(board_id)
+            if subscribers is None:
+                subscribers = self.active_connections[board_id] = BoardSubscribers()
+            subscribers.add(connection)
+            if user_id is not None:
+                presence = self.presence.get(board_id)
+                if presence is None:
+                    presence = self.presence[board_id] = BoardPresence()
+                    # First viewer here: ask the other workers for their viewers too
+                    self._presence_sync.add(board_id)
+                presence.join(connection.id, str(user_id))
+                self._mark_presence(board_id)
+        else:
+            self.user_connections.setdefault(user_id, {})[connection.id] = connection
+        if user_id is not None:
+            self._user_counts[user_id] += 1
+        connection.start()
+        # Clients quote this id (X-Client-Id) on their own writes so they are not sent the echo
+        connection.send(Frame({"type": "CONNECTED", "payload": {"connection_id": connection.id}}))
+
+    def _over_capacity(self, user_id: Optional[UUID], board_id: Optional[UUID]) -> bool:
+        if (board_id is not None and self.max_connections_per_board
+                and len(self.active_connections.get(board_id, ())) >= self.max_connections_per_board):
+            return True
+        if (user_id is not None and self.max_connections_per_user
+                and self._user_counts[user_id] >= self.max_connections_per_user):
+            return True
+        return False
+
+    def _unregister(self, connection: WebSocketConnection):
+        if self.connections.pop(connection.id, None) is None:
+            return
+        if connection.board_id is not None:
+            subscribers = self.active_connections.get(connection.board_id)
+            if subscribers is not None:
+                subscribers.remove(connection)
+                if not subscribers:
+                    del self.active_connections[connection.board_id]
+                    # Nobody left here to show presence to; the next report still says we have no viewers
+                    self.presence.pop(connection.board_id, None)
+            presence = self.presence.get(connection.board_id)
+            if connection.user_id is not None and (presence is None or presence.leave(connection.id)):
+                self._mark_presence(connection.board_id)
+        else:
+            members = self.user_connections.get(connection.user_id)
+            if members is not None:
+                members.pop(connection.id, None)
+                if not members:
+                    del self.user_connections[connection.user_id]
+        if connection.user_id is not None:
+            self._user_counts[connection.user_id] -= 1
+            if self._user_counts[connection.user_id] <= 0:
+                del self._user_counts[connection.user_id]
+
+    def disconnect(self, connection: WebSocketConnection):
+        connection.close()
+
+    # Heartbeat
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"WebSocket heartbeat error: {e}")
+
+    def sweep(self):
+        """
+        Evict sockets that have been silent longer than the idle timeout and ping the rest.
+        Also refreshes this worker's presence reports and drops those other workers stopped refreshing.
+        """
+        now = time.monotonic()
+        ping = Frame({"type": "PING", "ts": now})
+        for connection in list(self.connections.values()):
+            if self.idle_timeout and now - connection.last_seen > self.idle_timeout:
+                # Half-open or abandoned: the client stopped answering pings
+                connection.close(code=status.WS_1001_GOING_AWAY)
+            else:
+                connection.send(ping)
+        for board_id, presence in list(self.presence.items()):
+            if presence.expire(now):
+                self._send_presence(board_id, presence)
+            if presence.local:
+                self._mark_presence(board_id)
+
+    def receive(self, connection: WebSocketConnection, data: Union[str, bytes]) -> Optional[Dict[str, Any]]:
+        """
+        Record activity on a socket and answer heartbeat traffic.
+        Returns the decoded message when it is meant for the caller, otherwise None.
+        """
+        connection.touch()
+        try:
+            message = decode_message(data)
+        except ValueError:
+            return None
+        if not isinstance(message, dict):
+            return None
+        if message.get("type") == "PONG":
+            ts = message.get("ts")
+            if isinstance(ts, (int, float)) and 0 <= connection.last_seen - ts < self.idle_timeout:
+                connection.rtt = connection.last_seen - ts
+            return None
+        if message.get("type") == "PING":
+            connection.send(Frame({"type": "PONG", "ts": message.get("ts")}))
+            return None
+        if message.get("type") == "PRESENCE":
+            payload = message.get("payload")
+            self.focus(connection, payload.get("card_id") if isinstance(payload, dict) else None)
+            return None
+        return message
 
     # Board-level connections
-    async def connect(self, board_id: UUID, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections[board_id].append(websocket)
-
-    def disconnect(self, board_id: UUID, websocket: WebSocket):
-        if board_id in self.active_connections:
-            if websocket in self.active_connections[board_id]:
-                self.active_connections[board_id].remove(websocket)
-            if not self.active_connections[board_id]:
-                del self.active_connections[board_id]
-
-    async def broadcast(self, board_id: UUID, message: Dict[str, Any]):
-        if board_id in self.active_connections:
-            for connection in list(self.active_connections[board_id]):
-                try:
-                    await connection.send_json(message)
-                except RuntimeError:
-                    self.disconnect(board_id, connection)
-                except Exception as e:
-                    print(f"Error broadcasting to client: {e}")
-                    self.disconnect(board_id, connection)
+    async def connect(
+            self,
+            board_id: UUID,
+            websocket: WebSocket,
+            user_id: Optional[UUID] = None
+    ) -> Optional[WebSocketConnection]:
+        """Accept a board socket; returns None (socket closed with 1013) when a connection cap is hit"""
+        return await self._open(websocket, user_id, board_id)
 
-    # User-level connections for personal notifications (invitations, etc.)
-    async def connect_user(self, user_id: UUID, websocket: WebSocket):
-        await websocket.accept()
-        self.user_connections[user_id].append(websocket)
+    def open_stream(self, board_id: UUID, user_id: UUID) -> Optional[EventStreamConnection]:
+        """Register a Server-Sent Events subscriber of a board; None when a connection cap is hit"""
+        if self._over_capacity(user_id, board_id):
+            return None
+        connection = EventStreamConnection(
+            user_id=user_id,
+            board_id=board_id,
+            max_queue=self.send_queue_size,
+            overflow=self.overflow_policy,
+            on_close=self._unregister
+        )
+        self._register(connection)
+        return connection
+
+    # Presence
+    def focus(self, connection: WebSocketConnection, card_id: Optional[str]):
+        """Record the card a board socket has open (None: none); shown to others with the next snapshot"""
+        presence = self.presence.get(connection.board_id)
+        if presence is None:
+            return
+        if card_id is not None:
+            try:
+                card_id = str(UUID(str(card_id)))
+            except ValueError:
+                return
+        if presence.focus(connection.id, card_id):
+            self._mark_presence(connection.board_id)
+
+    def _mark_presence(self, board_id: UUID):
+        # Changes are collected and reported once per interval, however often viewers come and go
+        if not self._presence_dirty:
+            asyncio.get_running_loop().call_later(self.presence_interval, self._flush_presence)
+        self._presence_dirty.add(board_id)
+
+    def _flush_presence(self):
+        board_ids, self._presence_dirty = self._presence_dirty, set()
+        asyncio.create_task(self._report_presence(board_ids))
+
+    async def _report_presence(self, board_ids: Iterable[UUID]):
+        for board_id in board_ids:
+            presence = self.presence.get(board_id)
+            envelope = {
+                "scope": "presence",
+                "target": str(board_id),
+                "worker": self.worker_id,
+                "viewers": presence.local_viewers() if presence is not None else {}
+            }
+            if board_id in self._presence_sync:
+                self._presence_sync.discard(board_id)
+                envelope["sync"] = True
+            try:
+                await self.backplane.publish(envelope)
+            except Exception as e:
+                print(f"Presence report error: {e}")
 
-    def disconnect_user(self, user_id: UUID, websocket: WebSocket):
-        if user_id in self.user_connections:
-            if websocket in self.user_connections[user_id]:
-                self.user_connections[user_id].remove(websocket)
-            if not self.user_connections[user_id]:
-                del self.user_connections[user_id]
+    def _apply_presence(self, board_id: UUID, envelope: Dict[str, Any]):
+        presence = self.presence.get(board_id)
+        if presence is None:
+            return
+        # A report lives for a few heartbeats; live workers refresh theirs on every heartbeat
+        ttl = self.heartbeat_interval * 3 if self.heartbeat_interval > 0 else math.inf
+        presence.report(envelope["worker"], envelope["viewers"], time.monotonic() + ttl)
+        if envelope.get("sync") and envelope["worker"] != self.worker_id and presence.local:
+            self._mark_presence(board_id)
+        self._send_presence(board_id, presence)
+
+    def _send_presence(self, board_id: UUID, presence: BoardPresence):
+        snapshot = presence.snapshot(self.presence_max_viewers)
+        if snapshot != presence.last_sent:
+            presence.last_sent = snapshot
+            self._send_to_board(board_id, {"type": "PRESENCE", "payload": snapshot})
+
+    def subscribe(
+            self,
+            connection: WebSocketConnection,
+            list_ids: Optional[Iterable[str]] = None,
+            event_types: Optional[Iterable[str]] = None
+    ):
+        """
+        Narrow a board socket to events of the given lists and/or types, adding to what it
+        already follows. The first subscription on a dimension switches it from "everything".
+        """
+        subscribers = self.active_connections.get(connection.board_id)
+        if subscribers is None:
+            return
+        if list_ids is not None:
+            list_ids = (connection.list_ids or frozenset()) | frozenset(list_ids)
+        if event_types is not None:
+            event_types = (connection.event_types or frozenset()) | frozenset(event_types)
+        subscribers.subscribe(
+            connection,
+            connection.list_ids if list_ids is None else list_ids,
+            connection.event_types if event_types is None else event_types
+        )
+
+    def unsubscribe(
+            self,
+            connection: WebSocketConnection,
+            list_ids: Optional[Iterable[str]] = None,
+            event_types: Optional[Iterable[str]] = None
+    ):
+        """Stop following the given lists/types; with neither given, go back to receiving everything"""
+        subscribers = self.active_connections.get(connection.board_id)
+        if subscribers is None:
+            return
+        if list_ids is None and event_types is None:
+            subscribers.subscribe(connection, None, None)
+            return
+        current_lists, current_types = connection.list_ids, connection.event_types
+        if list_ids is not None and current_lists is not None:
+            current_lists = current_lists - frozenset(list_ids)
+        if event_types is not None and current_types is not None:
+            current_types = current_types - frozenset(event_types)
+        subscribers.subscribe(connection, current_lists, current_types)
+
+    async def broadcast(self, board_id: UUID, message: Dict[str, Any], origin: Optional[str] = None):
+        """Publish a board event; origin is the connection id of the client that caused it, which is skipped"""
+        envelope = {"scope": "board", "target": str(board_id), "message": message}
+        if origin:
+            envelope["origin"] = origin
+        await self.backplane.publish(envelope)
+
+    def broadcast_local(self, board_id: UUID, message: Dict[str, Any], origin: Optional[str] = None):
+        """Queue a message on every socket of the board held by this worker; never waits on clients"""
+        if board_id not in self.active_connections:
+            return
+        if self.coalesce_window <= 0:
+            self._send_to_board(board_id, message, origin)
+            return
+        pending = self._pending.get(board_id)
+        if pending is None:
+            pending = self._pending[board_id] = EventCoalescer()
+            asyncio.get_running_loop().call_later(self.coalesce_window, self._flush_board, board_id)
+        pending.add(message, origin)
+
+    def _flush_board(self, board_id: UUID):
+        pending = self._pending.pop(board_id)
+        span = None if pending.first_seq is None else (pending.first_seq, pending.last_seq)
+        events = pending.drain()
+        subscribers = self.active_connections.get(board_id)
+        if subscribers is None:
+            return
+        if events and not subscribers.filtered and not any(origin for _, origin in events):
+            frame = Frame(self._window_message([message for message, _ in events], span))
+            self._send_frame(list(subscribers.connections.values()), frame)
+            return
+        # Each socket gets the events matching its filters, minus its own changes;
+        # sockets with the same selection share one encoded frame
+        selected: Dict[str, tuple] = {}
+        for index, (message, origin) in enumerate(events):
+            for connection in subscribers.recipients(message):
+                if connection.id != origin:
+                    selected.setdefault(connection.id, (connection, []))[1].append(index)
+        frames: Dict[tuple, Frame] = {}
+        for connection, indexes in selected.values():
+            key = tuple(indexes)
+            frame = frames.get(key)
+            if frame is None:
+                frame = frames[key] = Frame(self._window_message([events[i][0] for i in indexes], span))
+            connection.send(frame)
+        if span is not None:
+            # Sockets following everything that were sent none of the window (it was all their own
+            # changes, or merged away) still learn how far the board has got, so they see no gap
+            marker = Frame({"type": "SEQ", "seq": span[1]})
+            self._send_frame([
+                connection for connection in subscribers.everyone.values()
+                if connection.event_types is None and connection.id not in selected
+            ], marker)
+
+    @staticmethod
+    def _window_message(batch: List[Dict[str, Any]], span: Optional[tuple]) -> Dict[str, Any]:
+        """
+        One frame for a coalescing window's events. A BATCH names the seqs it covers
+        (from_seq..seq), since merged-away and filtered-out events leave holes in its events' seqs.
+        """
+        if len(batch) == 1 and (span is None or span[0] == span[1]):
+            return batch[0]
+        message: Dict[str, Any] = {"type": "BATCH", "events": batch}
+        if span is not None:
+            message["from_seq"], message["seq"] = span
+        return message
+
+    def _send_to_board(self, board_id: UUID, message: Dict[str, Any], origin: Optional[str] = None):
+        subscribers = self.active_connections.get(board_id)
+        if subscribers is None:
+            return
+        recipients = subscribers.recipients(message)
+        if origin:
+            echo = [connection for connection in recipients if connection.id == origin]
+            if echo:
+                recipients = [connection for connection in recipients if connection.id != origin]
+                if message.get("seq") is not None:
+                    # The client has the result from its ACK; it only needs to know the seq moved on
+                    self._send_frame(echo, Frame({"type": "SEQ", "seq": message["seq"]}))
+        self._send_frame(recipients, Frame(message))
+
+    @staticmethod
+    def _send_frame(connections: List[WebSocketConnection], frame: Frame):
+        # A list rather than a live view: a send can close a socket and unregister it mid-loop
+        for connection in connections:
+            connection.send(frame)
+
+    # User-level connections for personal notifications (invitations, etc.)
+    async def connect_user(self, user_id: UUID, websocket: WebSocket) -> Optional[WebSocketConnection]:
+        return await self._open(websocket, user_id, None)
 
     async def send_to_user(self, user_id: UUID, message: Dict[str, Any]):
         """Send a notification to a specific user across all their connections"""
-        if user_id in self.user_connections:
-            for connection in list(self.user_connections[user_id]):
-                try:
-                    await connection.send_json(message)
-                except RuntimeError:
-                    self.disconnect_user(user_id, connection)
-                except Exception as e:
-                    print(f"Error sending to user {user_id}: {e}")
-                    self.disconnect_user(user_id, connection)
+        await self.backplane.publish({"scope": "user", "target": str(user_id), "message": message})
+
+    def send_to_user_local(self, user_id: UUID, message: Dict[str, Any]):
+        frame = Frame(message)
+        for connection in list(self.user_connections.get(user_id, {}).values()):
+            connection.send(frame)
+
+    # Replay for reconnecting board clients
+    def replay(self, board_id: UUID, last_seq: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Events of the board after last_seq, oldest first.
+        Returns None when this worker cannot vouch that nothing is missing
+        and the client needs a full snapshot instead.
+        """
+        history = self._history.get(board_id)
+        if not history or last_seq < history[0]["seq"] - 1 or last_seq > history[-1]["seq"]:
+            return None
+        return [message for message in history if message["seq"] > last_seq]
+
+    async def current_seq(self, board_id: UUID) -> Optional[int]:
+        """
+        Last seq handed out for the board, from the backplane (or this worker's history).
+        Read it before loading a snapshot: events after it are then sent live, and none
+        can fall between the two.
+        """
+        seq = await self.backplane.current_seq(str(board_id))
+        if seq is None:
+            history = self._history.get(board_id)
+            seq = history[-1]["seq"] if history else None
+        return seq
+
+    def _remember(self, board_id: UUID, message: Dict[str, Any]):
+        history = self._history.get(board_id)
+        if history is None:
+            history = self._history[board_id] = deque(maxlen=self.replay_buffer_size)
+            if len(self._history) > self.replay_max_boards:
+                self._history.popitem(last=False)
+        else:
+            self._history.move_to_end(board_id)
+            if history and message["seq"] != history[-1]["seq"] + 1:
+                # A gap (e.g. an event delivered without the backplane) breaks replay guarantees
+                history.clear()
+        history.append(message)
 
+    async def _deliver(self, envelope: Dict[str, Any]):
+        """Backplane handler: fan an event out to the sockets held by this worker"""
+        target = UUID(envelope["target"])
+        if envelope["scope"] == "board":
+            message = envelope["message"]
+            if envelope.get("seq") is not None:
+                message = {**message, "seq": envelope["seq"]}
+                if target in self.active_connections:
+                    self._remember(target, message)
+                else:
+                    # Nobody here to send it to; a history without it can no longer vouch for a replay
+                    self._history.pop(target, None)
+            self.broadcast_local(target, message, envelope.get("origin"))
+        elif envelope["scope"] == "user":
+            self.send_to_user_local(target, envelope["message"])
+        elif envelope["scope"] == "presence":
+            self._apply_presence(target, envelope)
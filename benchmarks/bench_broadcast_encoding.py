@@ -0,0 +1,89 @@
+"""
+Per-event CPU cost of a board broadcast against fan-out size.
+
+Compares the old path (Starlette's send_json runs json.dumps once per recipient)
+with encode-once frames, both pushed through the real WebSocketManager.
+
+    python -m benchmarks.bench_broadcast_encoding
+"""
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+
+from app.core.lexorank import rank_between
+from app.schemas.CardSchema import CardOut
+from app.services.WebSocketManager import WebSocketManager
+
+FANOUTS = (1, 10, 50, 200, 1000)
+EVENTS = 200
+
+
+class EncodeOnceSocket:
+    """Sends the frame text it is handed, as the manager does now"""
+    scope: dict = {}
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+class PerRecipientEncodingSocket(EncodeOnceSocket):
+    """Re-serializes the event for every socket, as Starlette's send_json used to"""
+    message: dict = {}
+
+    async def send_text(self, data: str):
+        json.dumps(self.message, separators=(",", ":"), ensure_ascii=False)
+
+
+def card_event() -> dict:
+    card = CardOut(
+        id=uuid.uuid4(),
+        title="Investigate p99 latency regression on board fan-out",
+        description="Steps to reproduce:\n" + "- open the board in many tabs\n" * 12,
+        rank=rank_between(None, None),
+        list_id=uuid.uuid4(),
+        author_id=uuid.uuid4(),
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+    return {"type": "CARD_UPDATED", "payload": card.model_dump(mode="json")}
+
+
+async def run(socket_cls, fanout: int, message: dict) -> float:
+    manager = WebSocketManager(send_queue_size=EVENTS + 1)
+    board_id = uuid.uuid4()
+    connections = [await manager.connect(board_id, socket_cls()) for _ in range(fanout)]
+
+    start = time.process_time()
+    for _ in range(EVENTS):
+        await manager.broadcast(board_id, message)
+    while any(conn.queue for conn in connections):
+        await asyncio.sleep(0)
+    elapsed = time.process_time() - start
+
+    for conn in connections:
+        conn.close()
+    await asyncio.sleep(0)
+    return elapsed / EVENTS
+
+
+async def main():
+    message = card_event()
+    PerRecipientEncodingSocket.message = message
+    print(f"{'fan-out':>8} {'per-recipient us/event':>24} {'encode-once us/event':>22} {'speedup':>8}")
+    for fanout in FANOUTS:
+        per_recipient = await run(PerRecipientEncodingSocket, fanout, message)
+        encode_once = await run(EncodeOnceSocket, fanout, message)
+        print(f"{fanout:>8} {per_recipient * 1e6:>24.1f} {encode_once * 1e6:>22.1f} "
+              f"{per_recipient / encode_once:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+Importing a batch of cards into one list.
+
+Compares one CardService.create_card call per card (what a client looping over
+POST /lists/{list_id}/cards does, minus HTTP) with CardService.create_cards, once
+forced onto the multi-row INSERT ... RETURNING path and once onto COPY.
+Creates a throwaway user and board against the configured database and deletes them afterwards.
+
+    python -m benchmarks.bench_bulk_cards [cards]
+"""
+import asyncio
+import sys
+import time
+import uuid
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.core.unitOfWork import UnitOfWork
+from app.database.models import Board, UserModel
+from app.database.session import engine, new_session
+from app.schemas.CardSchema import CardBulkCreate, CardCreate
+from app.schemas.ListSchema import ListCreate
+from app.services.CardService import CardService
+from app.services.ListService import ListService
+from app.services.WebSocketManager import WebSocketManager
+
+CARDS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+
+async def one_by_one(service: CardService, list_id: uuid.UUID, titles):
+    for title in titles:
+        await service.create_card(list_id, CardCreate(title=title))
+
+
+async def bulk_insert(service: CardService, list_id: uuid.UUID, titles):
+    settings.CARD_BULK_COPY_THRESHOLD = 0
+    await service.create_cards(list_id, CardBulkCreate(cards=[{"title": title} for title in titles]))
+
+
+async def bulk_copy(service: CardService, list_id: uuid.UUID, titles):
+    settings.CARD_BULK_COPY_THRESHOLD = 1
+    await service.create_cards(list_id, CardBulkCreate(cards=[{"title": title} for title in titles]))
+
+
+async def run(name: str, create, board_id: uuid.UUID, manager: WebSocketManager):
+    list_out = await ListService(UnitOfWork(), manager).create_list(board_id, ListCreate(title=name))
+    service = CardService(UnitOfWork(), manager)
+    queries = 0
+
+    def count(*_):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    await create(service, list_out.id, [f"{name} {i}" for i in range(CARDS)])
+    wall = time.perf_counter() - start
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    print(f"{name:>12} {wall:>8.2f} {queries:>8} {CARDS / wall:>10.0f}")
+
+
+async def main():
+    engine.echo = False
+    threshold = settings.CARD_BULK_COPY_THRESHOLD
+    manager = WebSocketManager()
+    user = UserModel(email=f"bench-{uuid.uuid4().hex}@example.com", username="bench", password_hash="x",
+                     is_verified=True)
+    async with new_session() as session:
+        session.add(user)
+        await session.flush()
+        board = Board(title="bulk card benchmark", owner_id=user.id)
+        session.add(board)
+        await session.commit()
+    try:
+        print(f"{CARDS} cards into one list")
+        print(f"{'variant':>12} {'wall s':>8} {'queries':>8} {'cards/s':>10}")
+        await run("one-by-one", one_by_one, board.id, manager)
+        await run("insert", bulk_insert, board.id, manager)
+        await run("copy", bulk_copy, board.id, manager)
+    finally:
+        settings.CARD_BULK_COPY_THRESHOLD = threshold
+        async with new_session() as session:
+            await session.delete(await session.get(UserModel, user.id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
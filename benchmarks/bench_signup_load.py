@@ -0,0 +1,97 @@
+"""
+What a signup burst does to everything else on the worker.
+
+Runs a burst of concurrent signups while a probe keeps issuing a cheap request
+(one pooled query, like a CRUD endpoint) and measures how late a 10 ms timer fires
+(event-loop lag). Compares the old signup path, which hashed on the event loop
+inside the transaction, with UserService.add_user, which checks for duplicates in
+a short transaction and hashes in the password pool. Creates throwaway users
+against the configured database and deletes them afterwards.
+
+    python -m benchmarks.bench_signup_load [signups]
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import delete, text
+
+from app.core.hashPool import pwd_context
+from app.core.security import hash_pool
+from app.core.unitOfWork import UnitOfWork
+from app.database.models import UserModel
+from app.database.session import engine, new_session
+from app.schemas.UserSchema import UserCreate
+from app.services.UserService import UserService
+
+SIGNUPS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+PREFIX = f"bench-signup-{uuid.uuid4().hex[:8]}"
+
+
+async def old_signup(user: UserCreate):
+    async with UnitOfWork()() as uow:
+        if await uow.users.get_by_email(email=user.email):
+            raise ValueError("exists")
+        hashed = pwd_context.hash(user.password)
+        await uow.users.add(UserModel(email=user.email, username=user.username, password_hash=hashed))
+
+
+async def new_signup(user: UserCreate):
+    await UserService(UnitOfWork()).add_user(user)
+
+
+async def probe(stop: asyncio.Event, lags: list, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+        start = time.perf_counter()
+        async with new_session() as session:
+            await session.execute(text("SELECT 1"))
+        latencies.append(time.perf_counter() - start)
+
+
+async def burst(name: str, signup):
+    users = [
+        UserCreate(email=f"{PREFIX}-{name}-{i}@example.com", username="bench", password="password123")
+        for i in range(SIGNUPS)
+    ]
+    stop = asyncio.Event()
+    lags, latencies = [], []
+    probe_task = asyncio.create_task(probe(stop, lags, latencies))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(signup(user) for user in users), return_exceptions=True)
+    wall = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    failed = sum(isinstance(result, Exception) for result in results)
+    lags.sort()
+    latencies.sort()
+    print(f"{name:>8} {wall:>8.2f} {failed:>7} {statistics.median(lags) * 1e3:>9.1f} {lags[-1] * 1e3:>9.1f} "
+          f"{statistics.median(latencies) * 1e3:>9.1f} {latencies[-1] * 1e3:>9.1f}")
+
+
+async def main():
+    engine.echo = False
+    hash_pool.start()
+    # Spawn the pool's workers before timing anything
+    await hash_pool.hash("warmup")
+    try:
+        print(f"{SIGNUPS} concurrent signups, pool size {engine.pool.size()}, "
+              f"hashing: {hash_pool.backend} x{hash_pool.workers}")
+        print(f"{'path':>8} {'wall s':>8} {'failed':>7} {'lag p50':>9} {'lag max':>9} {'req p50':>9} {'req max':>9}  (ms)")
+        await burst("old", old_signup)
+        await burst("pooled", new_signup)
+        print(hash_pool.stats())
+    finally:
+        async with new_session() as session:
+            await session.execute(delete(UserModel).where(UserModel.email.like(f"{PREFIX}-%")))
+            await session.commit()
+        await engine.dispose()
+        hash_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Bytes on the wire and encode cost per board event: JSON vs MessagePack subprotocol,
+each raw and with permessage-deflate (RFC 7692) with and without context takeover.
+
+Events are realistic CardOut payloads of a large board; the snapshot row is the full
+board a reconnecting client receives.
+
+    python -m benchmarks.bench_ws_encoding
+"""
+import random
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+
+from app.core.lexorank import rank_between, spaced_ranks
+from app.schemas.CardSchema import CardOut
+from app.services.WebSocketFrame import encode_message, pack_message
+
+LISTS = 20
+CARDS_PER_LIST = 50
+EVENTS = 2000
+WORDS = ("fix", "board", "latency", "review", "deploy", "card", "design", "sync", "api", "mobile",
+         "invite", "search", "onboarding", "billing", "export", "cache", "spike", "bug", "docs", "test")
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def make_board(rng: random.Random):
+    authors = [uuid.uuid4() for _ in range(8)]
+    start = datetime(2024, 1, 1)
+    lists = []
+    for list_rank in spaced_ranks(LISTS):
+        list_id = uuid.uuid4()
+        cards = [
+            CardOut(
+                id=uuid.uuid4(),
+                title=sentence(rng, rng.randint(3, 8)),
+                description=sentence(rng, rng.randint(0, 40)) or None,
+                rank=card_rank,
+                list_id=list_id,
+                author_id=rng.choice(authors),
+                created_at=start + timedelta(minutes=rng.randint(0, 500_000)),
+                updated_at=start + timedelta(minutes=rng.randint(0, 500_000)),
+            ).model_dump(mode="json")
+            for card_rank in spaced_ranks(CARDS_PER_LIST)
+        ]
+        lists.append({"id": str(list_id), "title": sentence(rng, 2), "rank": list_rank, "cards": cards})
+    return {"id": str(uuid.uuid4()), "title": "Roadmap", "lists": lists}
+
+
+def make_events(rng: random.Random, board: dict):
+    cards = [card for board_list in board["lists"] for card in board_list["cards"]]
+    events = []
+    for seq in range(1, EVENTS + 1):
+        card = dict(rng.choice(cards))
+        event_type = rng.choice(("CARD_UPDATED", "CARD_MOVED", "CARD_CREATED"))
+        if event_type == "CARD_MOVED":
+            target = rng.choice(board["lists"])
+            index = rng.randint(0, CARDS_PER_LIST)
+            ranks = [None] + [other["rank"] for other in target["cards"]] + [None]
+            card["list_id"] = target["id"]
+            card["rank"] = rank_between(ranks[index], ranks[index + 1])
+        elif event_type == "CARD_CREATED":
+            card["id"] = str(uuid.uuid4())
+            card["title"] = sentence(rng, 5)
+        card["updated_at"] = datetime.utcnow().isoformat()
+        events.append({"type": event_type, "payload": card, "seq": seq})
+    return events
+
+
+def deflate_size(payloads, context_takeover: bool) -> int:
+    """Compressed size as sent with permessage-deflate (trailing 00 00 ff ff stripped)"""
+    total = 0
+    compressor = zlib.compressobj(wbits=-15)
+    for payload in payloads:
+        if not context_takeover:
+            compressor = zlib.compressobj(wbits=-15)
+        data = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        total += len(data) - 4
+    return total
+
+
+def measure(name: str, encode, messages):
+    start = time.process_time()
+    payloads = [encode(message) for message in messages]
+    encode_us = (time.process_time() - start) / len(messages) * 1e6
+    payloads = [p.encode() if isinstance(p, str) else p for p in payloads]
+    raw = sum(map(len, payloads)) / len(payloads)
+    isolated = deflate_size(payloads, context_takeover=False) / len(payloads)
+    shared = deflate_size(payloads, context_takeover=True) / len(payloads)
+    print(f"{name:>8} {encode_us:>10.1f} {raw:>10.0f} {isolated:>14.0f} {shared:>14.0f}")
+
+
+def main():
+    rng = random.Random(7)
+    board = make_board(rng)
+    events = make_events(rng, board)
+    snapshot = [{"type": "SNAPSHOT", "seq": EVENTS, "payload": board}]
+
+    header = f"{'format':>8} {'encode us':>10} {'raw B':>10} {'deflate B':>14} {'deflate+ctx B':>14}"
+    print(f"Per card event (avg of {EVENTS})")
+    print(header)
+    measure("json", encode_message, events)
+    measure("msgpack", pack_message, events)
+    print(f"\nBoard snapshot ({LISTS} lists x {CARDS_PER_LIST} cards)")
+    print(header)
+    measure("json", encode_message, snapshot)
+    measure("msgpack", pack_message, snapshot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Cost of a burst of board WebSocket handshakes, e.g. every client reconnecting after a deploy.
+
+Compares the old handshake (get_current_user, then check_board_access, each in its own
+unit of work) with AuthService.authorize_board_socket against the configured database.
+Half of the sockets belong to the board owner and half to an accepted member.
+Creates a throwaway owner, member and board and deletes them afterwards.
+
+    python -m benchmarks.bench_ws_handshake [reconnects]
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import event
+
+from app.core.security import create_access_token
+from app.core.unitOfWork import UnitOfWork
+from app.database.models import Board, BoardUser, UserModel
+from app.database.models.BoardUser import InvitationStatus
+from app.database.session import engine, new_session
+from app.services.AuthService import AuthService
+from app.services.BoardUserService import BoardUserService
+
+RECONNECTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+
+async def old_handshake(token: str, board_id: uuid.UUID):
+    uow = UnitOfWork()
+    user = await AuthService(uow).get_current_user(access_token=token)
+    assert await BoardUserService(uow).check_board_access(board_id, user.id)
+
+
+async def new_handshake(token: str, board_id: uuid.UUID):
+    await AuthService(UnitOfWork()).authorize_board_socket(token, board_id)
+
+
+async def timed(handshake, token: str, board_id: uuid.UUID) -> float:
+    start = time.perf_counter()
+    await handshake(token, board_id)
+    return time.perf_counter() - start
+
+
+async def storm(handshake, tokens, board_id: uuid.UUID):
+    queries = 0
+
+    def count(*_):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(handshake, tokens[i % 2], board_id) for i in range(RECONNECTS)))
+    wall = time.perf_counter() - start
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    latencies = sorted(latencies)
+    return wall, queries, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def setup():
+    owner = UserModel(email=f"bench-{uuid.uuid4().hex}@example.com", username="bench", password_hash="x",
+                      is_verified=True)
+    member = UserModel(email=f"bench-{uuid.uuid4().hex}@example.com", username="bench", password_hash="x",
+                       is_verified=True)
+    async with new_session() as session:
+        session.add_all([owner, member])
+        await session.flush()
+        board = Board(title="handshake benchmark", owner_id=owner.id)
+        session.add(board)
+        await session.flush()
+        session.add(BoardUser(board_id=board.id, user_id=member.id, invited_by=owner.id,
+                              status=InvitationStatus.ACCEPTED.value))
+        await session.commit()
+    return owner, member, board
+
+
+async def teardown(*users):
+    async with new_session() as session:
+        for user in users:
+            await session.delete(await session.get(UserModel, user.id))
+        await session.commit()
+
+
+async def main():
+    engine.echo = False
+    owner, member, board = await setup()
+    tokens = [create_access_token({"sub": str(owner.id)}), create_access_token({"sub": str(member.id)})]
+    try:
+        # Warm the pool and the statement caches so both variants start equal
+        await storm(old_handshake, tokens, board.id)
+        await storm(new_handshake, tokens, board.id)
+
+        print(f"{RECONNECTS} simultaneous handshakes, pool size {engine.pool.size()}")
+        print(f"{'variant':>10} {'wall s':>8} {'queries':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for name, handshake in (("old", old_handshake), ("combined", new_handshake)):
+            wall, queries, p50, p99 = await storm(handshake, tokens, board.id)
+            print(f"{name:>10} {wall:>8.2f} {queries:>8} {p50 * 1e3:>8.1f} {p99 * 1e3:>8.1f}")
+    finally:
+        await teardown(owner, member)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+"""
+EXPLAIN check for the repository queries on the hot paths.
+
+Creates the tables from the models in a scratch schema, fills them with synthetic data
+(users, boards with five lists each, ten cards per list, three memberships per board),
+runs each repository method while recording the SQL it sends, and EXPLAINs every
+statement with its real parameters. Fails with exit code 1 if a query does not use the
+index it is expected to, or scans one of the big tables sequentially. Everything runs in
+one transaction that is rolled back, so the configured database is left as it was.
+Below a few hundred thousand cards the planner rightly prefers sequential scans of the
+smaller tables, so run it at the default size or larger.
+
+    python -m benchmarks.check_query_plans [cards]
+"""
+import asyncio
+import sys
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import Base, engine
+from app.repositories.BoardRepo import BoardRepository
+from app.repositories.BoardUserRepository import BoardUserRepository
+from app.repositories.CardRepo import CardRepository
+from app.repositories.ListRepo import ListRepository
+
+CARDS = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+SCHEMA = "query_plan_check"
+# A sequential scan of any of these is a failure whatever the query
+BIG_TABLES = {"cards", "lists", "boards", "board_users"}
+
+SEED = [
+    """
+    INSERT INTO users (id, email, password_hash, is_verified, username, is_active, role,
+                       is_first_login, created_at, updated_at)
+    SELECT gen_random_uuid(), 'user' || g || '@example.com', 'x', true, 'user' || g, true, 'user',
+           false, now(), now()
+    FROM generate_series(1, :users) AS g
+    """,
+    # Two boards per user
+    """
+    INSERT INTO boards (id, title, owner_id)
+    SELECT gen_random_uuid(), 'board', users.id FROM users, generate_series(1, 2)
+    """,
+    """
+    INSERT INTO lists (id, title, rank, board_id, created_at, updated_at)
+    SELECT gen_random_uuid(), 'list', g::text, boards.id, now(), now()
+    FROM boards, generate_series(1, 5) AS g
+    """,
+    """
+    INSERT INTO cards (id, title, rank, list_id, created_at, updated_at)
+    SELECT gen_random_uuid(), 'card', lpad(g::text, 2, '0'), lists.id, now(), now()
+    FROM lists, generate_series(1, 10) AS g
+    """,
+    # Three members per board, spread over the users, in every status
+    """
+    WITH numbered_users AS (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM users),
+         numbered_boards AS (SELECT id, owner_id, row_number() OVER (ORDER BY id) AS n FROM boards)
+    INSERT INTO board_users (id, board_id, user_id, status, invited_by)
+    SELECT gen_random_uuid(), b.id, u.id, (ARRAY['pending', 'accepted', 'rejected'])[1 + (b.n + g) % 3], b.owner_id
+    FROM numbered_boards AS b
+    CROSS JOIN generate_series(1, 3) AS g
+    JOIN numbered_users AS u ON u.n = (b.n * 7 + g) % :users
+    """,
+]
+
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def check(connection, session: AsyncSession, name: str, run, expected: Dict[str, str]) -> bool:
+    """Run one repository call, EXPLAIN what it sent and compare with the expected {table: index}"""
+    statements: List[tuple] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await run()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    session.expunge_all()
+
+    used: Dict[str, set] = {}
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        for node in plan_nodes(result.scalar()[0]["Plan"]):
+            if "Relation Name" in node or "Index Name" in node:
+                table = node.get("Relation Name")
+                used.setdefault(table, set()).add(node.get("Index Name") or node["Node Type"])
+    # Bitmap index scans name the index but not the table; the heap scan above them names the table
+    indexes = set().union(*used.values()) if used else set()
+    missing = {table: index for table, index in expected.items() if index not in indexes}
+    seq_scans = sorted(table for table, nodes in used.items() if table in BIG_TABLES and "Seq Scan" in nodes)
+    ok = not missing and not seq_scans
+    detail = "" if ok else f"  missing {missing} seq scans {seq_scans}"
+    print(f"{'ok' if ok else 'FAIL':>4}  {name:<52} {', '.join(sorted(expected.values()))}{detail}")
+    return ok
+
+
+async def main():
+    engine.echo = False
+    users = max(CARDS // 100, 10)
+    async with engine.connect() as connection:
+        await connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await connection.execute(text(f"SET LOCAL search_path TO {SCHEMA}"))
+        await connection.run_sync(Base.metadata.create_all)
+        for statement in SEED:
+            await connection.execute(text(statement), {"users": users})
+        for table in ("users", "boards", "lists", "cards", "board_users"):
+            await connection.execute(text(f"ANALYZE {table}"))
+
+        row = (await connection.execute(text(
+            "SELECT board_users.user_id, board_users.board_id, lists.id FROM board_users "
+            "JOIN lists ON lists.board_id = board_users.board_id WHERE board_users.status = 'accepted' LIMIT 1"
+        ))).one()
+        user_id, board_id, list_id = row
+        card_id = (await connection.execute(text("SELECT id FROM cards WHERE list_id = :list_id LIMIT 1"),
+                                            {"list_id": list_id})).scalar()
+        print(f"{users} users, {users * 2} boards, {users * 10} lists, {users * 100} cards")
+
+        session = AsyncSession(bind=connection)
+        cards, lists = CardRepository(session), ListRepository(session)
+        boards, members = BoardRepository(session), BoardUserRepository(session)
+        checks = [
+            ("CardRepository.get_list_cards", lambda: cards.get_list_cards(list_id),
+             {"cards": "ix_cards_list_id_rank"}),
+            ("CardRepository.neighbour_ranks", lambda: cards.neighbour_ranks(list_id, 3),
+             {"cards": "ix_cards_list_id_rank"}),
+            ("CardRepository.get_ordered_ids", lambda: cards.get_ordered_ids(list_id),
+             {"cards": "ix_cards_list_id_rank"}),
+            ("ListRepository.get_board_lists", lambda: lists.get_board_lists(board_id),
+             {"lists": "ix_lists_board_id_rank"}),
+            ("ListRepository.neighbour_ranks", lambda: lists.neighbour_ranks(board_id, 2),
+             {"lists": "ix_lists_board_id_rank"}),
+            ("BoardRepository.get_user_boards", lambda: boards.get_user_boards(user_id),
+             {"boards": "ix_boards_owner_id", "board_users": "ix_board_users_user_id_status"}),
+            ("BoardUserRepository.has_board_access", lambda: members.has_board_access(board_id, user_id),
+             {"boards": "boards_pkey", "board_users": "uq_board_users_board_id_user_id"}),
+            ("BoardUserRepository.get_accessible_list_board",
+             lambda: members.get_accessible_list_board(list_id, user_id),
+             {"lists": "lists_pkey"}),
+            ("BoardUserRepository.get_accessible_card_board",
+             lambda: members.get_accessible_card_board(card_id, user_id),
+             {"cards": "cards_pkey", "lists": "lists_pkey"}),
+            ("BoardRepository.get_board_with_details", lambda: boards.get_board_with_details(board_id, user_id),
+             {"lists": "ix_lists_board_id_rank", "cards": "ix_cards_list_id_rank"}),
+            ("BoardUserRepository.get_by_board_and_user", lambda: members.get_by_board_and_user(board_id, user_id),
+             {"board_users": "uq_board_users_board_id_user_id"}),
+            ("BoardUserRepository.get_accepted_users", lambda: members.get_accepted_users(board_id),
+             {"board_users": "uq_board_users_board_id_user_id"}),
+            ("BoardUserRepository.get_pending_invitations_for_user",
+             lambda: members.get_pending_invitations_for_user(user_id),
+             {"board_users": "ix_board_users_user_id_status"}),
+        ]
+        results = [await check(connection, session, *entry) for entry in checks]
+        await connection.rollback()
+    await engine.dispose()
+    failed = results.count(False)
+    print(f"{len(results) - failed}/{len(results)} queries use their indexes")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
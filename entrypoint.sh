@@ -75,4 +75,6 @@ exec uvicorn app.main:app \
     --workers "${UVICORN_WORKERS:-1}" \
     --loop uvloop \
     --http httptools \
+    --ws websockets \
+    --ws-per-message-deflate true \
     --no-access-log
@@ -26,16 +26,38 @@ export default function Board() {
     const [showCardMenu, setShowCardMenu] = useState(null); // card id
     const [showListMenu, setShowListMenu] = useState(null); // list id
     const [deleteConfirm, setDeleteConfirm] = useState(null); // {type: 'card'|'list', id, title}
+    // Who else has the board open: {count, viewers: [{user_id, card_id}]}
+    const [presence, setPresence] = useState({ count: 0, viewers: [] });
 
     const ws = useRef(null);
+    // Highest board event sequence applied, sent back on reconnect to replay missed events
+    const lastSeq = useRef(null);
+    // When we last asked the server to fill a gap in the sequence (0: not waiting)
+    const resyncAt = useRef(0);
+    // Mutations sent over the socket awaiting ACK/NACK, by request id
+    const pending = useRef(new Map());
+    const nextRequestId = useRef(0);
+    // Id the server gave our socket; our own writes carry it so their echo is skipped
+    const connectionId = useRef(null);
 
+    // Tell the others which card we have open
     useEffect(() => {
+        const socket = ws.current;
+        if (socket && socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ type: 'PRESENCE', payload: { card_id: editingCard?.id ?? null } }));
+        }
+    }, [editingCard?.id]);
+
+    useEffect(() => {
+        lastSeq.current = null;
         fetchCurrentUser();
         fetchBoard();
         fetchMembers();
         connectWS();
         return () => {
-            if (ws.current) ws.current.close();
+            const socket = ws.current;
+            ws.current = null;
+            if (socket) socket.close();
         };
     }, [id]);
 
@@ -51,17 +73,28 @@ export default function Board() {
     const fetchBoard = async () => {
         try {
             const res = await axios.get(`/boards/${id}`);
-            setBoard(res.data);
-            const sortedLists = (res.data.lists || []).sort((a, b) => a.position - b.position);
-            sortedLists.forEach(l => {
-                l.cards = (l.cards || []).sort((a, b) => a.position - b.position);
-            });
-            setLists(sortedLists);
+            applyBoard(res.data);
         } catch (err) {
             if (err.response?.status === 401) navigate('/');
         }
     };
 
+    // Ranks are base-62 keys ordered byte-wise, so compare them as plain strings;
+    // equal ranks fall back to the id, as the server orders them
+    const byRank = (a, b) => {
+        if (a.rank !== b.rank) return a.rank < b.rank ? -1 : 1;
+        return a.id < b.id ? -1 : a.id > b.id ? 1 : 0;
+    };
+
+    const applyBoard = (data) => {
+        setBoard(data);
+        const sortedLists = (data.lists || []).sort(byRank);
+        sortedLists.forEach(l => {
+            l.cards = (l.cards || []).sort(byRank);
+        });
+        setLists(sortedLists);
+    };
+
     const fetchMembers = async () => {
         try {
             const res = await axios.get(`/boards/${id}/members`);
@@ -72,62 +105,198 @@ export default function Board() {
     };
 
     const connectWS = () => {
-        const wsUrl = `ws://${window.location.host}/ws/board/${id}`;
-        ws.current = new WebSocket(wsUrl);
-        ws.current.onmessage = (event) => handleWSMessage(JSON.parse(event.data));
+        const resume = lastSeq.current !== null ? `?last_seq=${lastSeq.current}` : '';
+        const wsUrl = `ws://${window.location.host}/ws/board/${id}${resume}`;
+        const socket = new WebSocket(wsUrl);
+        socket.onmessage = (event) => handleWSMessage(JSON.parse(event.data));
+        socket.onclose = () => {
+            // Only reconnect sockets that were not closed on purpose
+            if (ws.current !== socket) return;
+            setTimeout(() => {
+                if (ws.current !== socket) return;
+                // Without a sequence to resume from the server cannot replay, so refetch instead
+                if (lastSeq.current === null) fetchBoard();
+                connectWS();
+            }, 3000);
+        };
+        ws.current = socket;
+    };
+
+    // Ask for the events after fromSeq (or a snapshot; -1 always gets one); at most every few
+    // seconds while the answer is on its way
+    const requestResync = (fromSeq = lastSeq.current) => {
+        const socket = ws.current;
+        if (!socket || socket.readyState !== WebSocket.OPEN || Date.now() - resyncAt.current < 5000) return;
+        resyncAt.current = Date.now();
+        socket.send(JSON.stringify({ type: 'RESUME', last_seq: fromSeq }));
+    };
+
+    // The events of a frame not applied yet. A frame covers seqs first..last (a BATCH may name
+    // them as from_seq..seq, a SEQ marker covers its seq with no events); older ones were already
+    // applied or are in the snapshot, and a frame starting past lastSeq + 1 means some were missed
+    const freshEvents = (msg) => {
+        const events = msg.type === 'BATCH' ? msg.events : msg.type === 'SEQ' ? [] : [msg];
+        const seqs = events.map(e => e.seq).filter(seq => seq != null);
+        const first = msg.from_seq ?? (seqs.length ? Math.min(...seqs) : msg.seq);
+        const last = msg.type === 'BATCH' ? (msg.seq ?? (seqs.length ? Math.max(...seqs) : null)) : msg.seq;
+        if (last == null) return events;
+        if (lastSeq.current === null) {
+            lastSeq.current = last;
+            return events;
+        }
+        if (first > lastSeq.current + 1) {
+            requestResync();
+            return [];
+        }
+        const fresh = events.filter(e => e.seq == null || e.seq > lastSeq.current);
+        lastSeq.current = Math.max(lastSeq.current, last);
+        resyncAt.current = 0;
+        return fresh;
     };
 
     const handleWSMessage = (msg) => {
+        if (msg.type === 'PING') {
+            // Server heartbeat: echo the timestamp so it can measure latency and keep us alive
+            ws.current?.send(JSON.stringify({ type: 'PONG', ts: msg.ts }));
+            return;
+        }
+        if (msg.type === 'CONNECTED') {
+            connectionId.current = msg.payload.connection_id;
+            return;
+        }
+        if (msg.type === 'ACK' || msg.type === 'NACK') {
+            const request = pending.current.get(msg.request_id);
+            if (!request) return;
+            pending.current.delete(msg.request_id);
+            if (msg.type === 'ACK') request.resolve(msg.payload);
+            else request.reject(new Error(typeof msg.detail === 'string' ? msg.detail : 'Invalid request'));
+            return;
+        }
+        if (msg.type === 'PRESENCE') {
+            setPresence(msg.payload);
+            return;
+        }
+        if (msg.type === 'SNAPSHOT') {
+            // Missed too much while disconnected: the server sent the whole board
+            applyBoard(msg.payload);
+            lastSeq.current = msg.seq ?? null;
+            resyncAt.current = 0;
+            return;
+        }
+        // Bursts and replays arrive as a single BATCH frame
+        const events = freshEvents(msg);
+        // RESYNC stands in for an event too large to relay between server workers
+        if (events.some(e => e.type === 'RESYNC')) {
+            requestResync(-1);
+            return;
+        }
+        if (events.length) setLists(prevLists => events.reduce(applyWSEvent, prevLists));
+    };
+
+    // Update events may be deltas (partial) carrying only changed fields; skip ones
+    // older than the version we already hold
+    const mergeEntity = (entity, payload) => {
+        const { partial, ...fields } = payload;
+        if (partial && entity.updated_at && fields.updated_at && fields.updated_at < entity.updated_at) return entity;
+        return { ...entity, ...fields };
+    };
+
+    const applyWSEvent = (prevLists, msg) => {
         const { type, payload } = msg;
-        setLists(prevLists => {
-            let newLists = [...prevLists];
-            switch (type) {
-                case 'LIST_CREATED':
-                    newLists.push({ ...payload, cards: [] });
-                    break;
-                case 'LIST_UPDATED':
-                    newLists = newLists.map(l => l.id === payload.id ? { ...l, ...payload } : l);
-                    break;
-                case 'LIST_DELETED':
-                    newLists = newLists.filter(l => l.id !== payload.id);
-                    break;
-                case 'CARD_CREATED':
-                    newLists = newLists.map(l => {
-                        if (l.id === payload.list_id) {
-                            return { ...l, cards: [...l.cards, payload].sort((a, b) => a.position - b.position) };
-                        }
-                        return l;
-                    });
-                    break;
-                case 'CARD_UPDATED':
-                    newLists = newLists.map(l => ({
-                        ...l,
-                        cards: l.cards.map(c => c.id === payload.id ? { ...c, ...payload } : c)
-                    }));
-                    break;
-                case 'CARD_DELETED':
-                    newLists = newLists.map(l => ({
-                        ...l,
-                        cards: l.cards.filter(c => c.id !== payload.id)
-                    }));
-                    break;
-                case 'CARD_MOVED':
-                    const card = payload;
-                    newLists = newLists.map(l => ({ ...l, cards: l.cards.filter(c => c.id !== card.id) }));
-                    newLists = newLists.map(l => {
-                        if (l.id === card.list_id) {
-                            return { ...l, cards: [...l.cards, card].sort((a, b) => a.position - b.position) };
-                        }
-                        return l;
-                    });
-                    break;
-                case 'USER_JOINED':
-                    // Refresh members list when someone joins
-                    fetchMembers();
-                    break;
-                default: break;
+        let newLists = [...prevLists];
+        switch (type) {
+            case 'LIST_CREATED':
+                // A snapshot may already hold it
+                if (!newLists.some(l => l.id === payload.id)) newLists.push({ ...payload, cards: [] });
+                break;
+            case 'LIST_UPDATED':
+            case 'LIST_REORDERED':
+                newLists = newLists.map(l => l.id === payload.id ? mergeEntity(l, payload) : l);
+                break;
+            case 'LIST_DELETED':
+                newLists = newLists.filter(l => l.id !== payload.id);
+                break;
+            case 'CARD_CREATED':
+                newLists = newLists.map(l => {
+                    if (l.id === payload.list_id) {
+                        return { ...l, cards: [...l.cards.filter(c => c.id !== payload.id), payload].sort(byRank) };
+                    }
+                    return l;
+                });
+                break;
+            case 'CARD_UPDATED':
+                newLists = newLists.map(l => ({
+                    ...l,
+                    cards: l.cards.map(c => c.id === payload.id ? mergeEntity(c, payload) : c).sort(byRank)
+                }));
+                break;
+            case 'CARD_DELETED':
+                newLists = newLists.map(l => ({
+                    ...l,
+                    cards: l.cards.filter(c => c.id !== payload.id)
+                }));
+                break;
+            case 'CARD_MOVED':
+                const card = payload;
+                newLists = newLists.map(l => ({ ...l, cards: l.cards.filter(c => c.id !== card.id) }));
+                newLists = newLists.map(l => {
+                    if (l.id === card.list_id) {
+                        return { ...l, cards: [...l.cards, card].sort(byRank) };
+                    }
+                    return l;
+                });
+                break;
+            case 'CARDS_RERANKED':
+                newLists = newLists.map(l => l.id === payload.list_id
+                    ? { ...l, cards: l.cards.map(c => ({ ...c, rank: payload.ranks[c.id] ?? c.rank })).sort(byRank) }
+                    : l);
+                break;
+            case 'CARDS_CREATED': {
+                const created = new Set(payload.cards.map(c => c.id));
+                newLists = newLists.map(l => l.id === payload.list_id
+                    ? { ...l, cards: [...l.cards.filter(c => !created.has(c.id)), ...payload.cards].sort(byRank) }
+                    : l);
+                break;
+            }
+            case 'CARDS_MOVED': {
+                const moved = new Map(payload.cards.map(c => [c.id, c]));
+                newLists = newLists.map(l => {
+                    const kept = l.cards.filter(c => !moved.has(c.id));
+                    const arrived = payload.cards.filter(c => c.list_id === l.id);
+                    return arrived.length || kept.length !== l.cards.length
+                        ? { ...l, cards: [...kept, ...arrived].sort(byRank) }
+                        : l;
+                });
+                break;
             }
-            return newLists.sort((a, b) => a.position - b.position);
+            case 'LISTS_RERANKED':
+                newLists = newLists.map(l => ({ ...l, rank: payload.ranks[l.id] ?? l.rank }));
+                break;
+            case 'USER_JOINED':
+                // Refresh members list when someone joins
+                fetchMembers();
+                break;
+            default: break;
+        }
+        return newLists.sort(byRank);
+    };
+
+    // Send a mutation over the board socket (no per-request auth or HTTP overhead),
+    // falling back to the HTTP call while the socket is not open. Resolves with the
+    // updated entity; the server does not echo our own change back, so callers apply it.
+    const mutate = (type, payload, fallback) => {
+        const socket = ws.current;
+        if (!socket || socket.readyState !== WebSocket.OPEN) {
+            const headers = connectionId.current ? { 'X-Client-Id': connectionId.current } : {};
+            return fallback({ headers }).then(res => res.data);
+        }
+        const requestId = ++nextRequestId.current;
+        return new Promise((resolve, reject) => {
+            pending.current.set(requestId, { resolve, reject });
+            socket.send(JSON.stringify({ type, request_id: requestId, payload }));
+            setTimeout(() => {
+                if (pending.current.delete(requestId)) reject(new Error('Request timed out'));
+            }, 10000);
         });
     };
 
@@ -148,7 +317,12 @@ export default function Board() {
         setLists(newLists);
 
         try {
-            await axios.patch(`/cards/${draggableId}/move?new_list_id=${destination.droppableId}&new_position=${destination.index}`, {});
+            const moved = await mutate(
+                'MOVE_CARD',
+                { card_id: draggableId, list_id: destination.droppableId, position: destination.index },
+                (config) => axios.patch(`/cards/${draggableId}/move?new_list_id=${destination.droppableId}&new_position=${destination.index}`, {}, config)
+            );
+            setLists(prevLists => applyWSEvent(prevLists, { type: 'CARD_MOVED', payload: moved }));
         } catch (err) {
             fetchBoard();
         }
@@ -158,8 +332,8 @@ export default function Board() {
         e.preventDefault();
         if (!newListTitle.trim()) return;
         try {
-            const position = lists.length;
-            await axios.post(`/boards/${id}/lists`, { title: newListTitle, position });
+            // No position: the server appends it after the last list
+            await axios.post(`/boards/${id}/lists`, { title: newListTitle });
             setNewListTitle('');
             setIsAddingList(false);
         } catch (err) { console.error(err); }
@@ -170,10 +344,13 @@ export default function Board() {
         const title = newCardTitles[listId];
         if (!title?.trim()) return;
         try {
-            const list = lists.find(l => l.id === listId);
-            await axios.post(`/lists/${listId}/cards`, {
-                title, position: list.cards.length, list_id: listId
-            });
+            // A pasted checklist becomes one card per line, created in a single request
+            const lines = title.split('\n').map(line => line.trim()).filter(Boolean);
+            if (lines.length > 1) {
+                await axios.post(`/lists/${listId}/cards/bulk`, { cards: lines.map(line => ({ title: line })) });
+            } else {
+                await axios.post(`/lists/${listId}/cards`, { title, list_id: listId });
+            }
             setNewCardTitles(prev => ({ ...prev, [listId]: '' }));
             setIsAddingCard(prev => ({ ...prev, [listId]: false }));
         } catch (err) { console.error(err); }
@@ -199,7 +376,12 @@ export default function Board() {
     const updateCard = async (cardId, newTitle) => {
         if (!newTitle.trim()) return;
         try {
-            await axios.patch(`/cards/${cardId}`, { title: newTitle });
+            const updated = await mutate(
+                'UPDATE_CARD',
+                { card_id: cardId, title: newTitle },
+                (config) => axios.patch(`/cards/${cardId}`, { title: newTitle }, config)
+            );
+            setLists(prevLists => applyWSEvent(prevLists, { type: 'CARD_UPDATED', payload: updated }));
             setEditingCard(null);
         } catch (err) {
             console.error('Failed to update card:', err);
@@ -305,7 +487,9 @@ export default function Board() {
                     {members.length > 0 && (
                         <div style={{ display: 'flex', alignItems: 'center', gap: '0.25rem', marginRight: '0.5rem' }}>
                             <Users size={18} style={{ color: 'rgba(255, 255, 255, 0.9)', marginRight: '0.25rem' }} />
-                            {members.slice(0, 3).map(member => (
+                            {members.slice(0, 3).map(member => {
+                                const viewer = presence.viewers.find(v => v.user_id === member.user_id);
+                                return (
                                 <div key={member.user_id} style={{
                                     width: '32px',
                                     height: '32px',
@@ -317,11 +501,12 @@ export default function Board() {
                                     color: 'white',
                                     fontSize: '0.75rem',
                                     fontWeight: 600,
-                                    border: '2px solid rgba(255, 255, 255, 0.3)'
-                                }} title={`${member.username} (${member.email})`}>
+                                    border: viewer ? '2px solid #4ade80' : '2px solid rgba(255, 255, 255, 0.3)'
+                                }} title={`${member.username} (${member.email})${viewer ? (viewer.card_id ? ' - editing a card' : ' - viewing') : ''}`}>
                                     {member.username[0].toUpperCase()}
                                 </div>
-                            ))}
+                                );
+                            })}
                             {members.length > 3 && (
                                 <div style={{
                                     fontSize: '0.75rem',
@@ -58,6 +58,10 @@ export default function Dashboard() {
         const { type, payload } = msg;
 
         switch (type) {
+            case 'PING':
+                // Server heartbeat: echo the timestamp so the socket isn't reaped as idle
+                ws.current?.send(JSON.stringify({ type: 'PONG', ts: msg.ts }));
+                break;
             case 'INVITATION_RECEIVED':
                 // Add the new invitation to the list
                 setInvitations(prev => {
@@ -0,0 +1,33 @@
+"""add board_event_seqs table
+
+Revision ID: 11c2b1bd123b
+Revises: aa91f63f87df
+Create Date: 2026-10-18 10:12:41.118503
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11c2b1bd123b'
+down_revision: Union[str, Sequence[str], None] = 'aa91f63f87df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('board_event_seqs',
+    sa.Column('board_id', sa.UUID(), nullable=False),
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['board_id'], ['boards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('board_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('board_event_seqs')
@@ -0,0 +1,44 @@
+"""add id to the rank indexes
+
+Revision ID: 1d317965fccd
+Revises: 3609bf7c95a0
+Create Date: 2026-10-18 21:12:37.408815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d317965fccd'
+down_revision: Union[str, Sequence[str], None] = '3609bf7c95a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Cards and lists are ordered by (rank, id); with id in the index those scans need no sort
+INDEXES = (
+    ('ix_cards_list_id_rank', 'cards', ['list_id', 'rank']),
+    ('ix_lists_board_id_rank', 'lists', ['board_id', 'rank']),
+)
+
+
+def rebuild(columns_of) -> None:
+    # Build the replacement next to the old index, then swap names: reads always have one to use.
+    # A failed build leaves an INVALID *_new index behind: drop it before running this again
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(f'{name}_new', table, columns_of(columns), postgresql_concurrently=True)
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.execute(f'ALTER INDEX {name}_new RENAME TO {name}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rebuild(lambda columns: columns + ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    rebuild(lambda columns: columns)
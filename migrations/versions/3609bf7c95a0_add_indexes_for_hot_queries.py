@@ -0,0 +1,61 @@
+"""add indexes for hot queries
+
+Revision ID: 3609bf7c95a0
+Revises: 4cab6ef12dce
+Create Date: 2026-10-18 16:20:44.731052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3609bf7c95a0'
+down_revision: Union[str, Sequence[str], None] = '4cab6ef12dce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_cards_list_id_rank', 'cards', ['list_id', 'rank'], False),
+    ('ix_lists_board_id_rank', 'lists', ['board_id', 'rank'], False),
+    ('ix_boards_owner_id', 'boards', ['owner_id'], False),
+    ('uq_board_users_board_id_user_id', 'board_users', ['board_id', 'user_id'], True),
+    ('ix_board_users_user_id_status', 'board_users', ['user_id', 'status'], False),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep one membership per (board, user) before the unique index goes on:
+    # an accepted row wins over a pending one, a pending one over a rejected one
+    op.execute("""
+        DELETE FROM board_users USING (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY board_id, user_id
+                ORDER BY CASE status WHEN 'accepted' THEN 0 WHEN 'pending' THEN 1 ELSE 2 END, id
+            ) AS n
+            FROM board_users
+        ) AS ranked
+        WHERE board_users.id = ranked.id AND ranked.n > 1
+    """)
+    # CONCURRENTLY cannot run inside a transaction; the builds take no lock that blocks writes.
+    # A failed build leaves an INVALID index behind: drop it before running this again
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+    # Attaching an existing unique index as a constraint is a catalog-only change
+    op.execute(
+        "ALTER TABLE board_users ADD CONSTRAINT uq_board_users_board_id_user_id "
+        "UNIQUE USING INDEX uq_board_users_board_id_user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_board_users_board_id_user_id', 'board_users', type_='unique')
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            if name != 'uq_board_users_board_id_user_id':
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
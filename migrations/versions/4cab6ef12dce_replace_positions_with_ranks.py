@@ -0,0 +1,74 @@
+"""replace integer positions with fractional ranks
+
+Revision ID: 4cab6ef12dce
+Revises: c35afaa6552d
+Create Date: 2026-10-18 14:05:12.518204
+
+"""
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4cab6ef12dce'
+down_revision: Union[str, Sequence[str], None] = 'c35afaa6552d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.core.lexorank.spaced_ranks, so later changes there cannot alter this migration
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+
+def spaced_ranks(count: int) -> list:
+    base = len(DIGITS)
+    width = 1
+    while base ** width <= count + 1:
+        width += 1
+    ranks = []
+    for i in range(1, count + 1):
+        value = i * base ** width // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, base)
+            digits.append(DIGITS[digit])
+        ranks.append("".join(reversed(digits)).rstrip(DIGITS[0]))
+    return ranks
+
+
+def rank_rows(table: str, parent: str) -> None:
+    """Give every row a rank following its current (position, created_at) order within its parent"""
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        f"SELECT id, {parent} FROM {table} ORDER BY {parent}, position, created_at, id"
+    )).all()
+    updates = []
+    for _, group in groupby(rows, key=lambda row: row[1]):
+        ids = [row[0] for row in group]
+        updates.extend({"id": row_id, "rank": rank} for row_id, rank in zip(ids, spaced_ranks(len(ids))))
+    if updates:
+        conn.execute(sa.text(f"UPDATE {table} SET rank = :rank WHERE id = :id"), updates)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, parent in (("lists", "board_id"), ("cards", "list_id")):
+        op.add_column(table, sa.Column('rank', sa.String(length=64, collation='C'), nullable=True))
+        rank_rows(table, parent)
+        op.alter_column(table, 'rank', nullable=False)
+        op.drop_column(table, 'position')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, parent in (("lists", "board_id"), ("cards", "list_id")):
+        op.add_column(table, sa.Column('position', sa.Integer(), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET position = ordered.position FROM ("
+            f"SELECT id, ROW_NUMBER() OVER (PARTITION BY {parent} ORDER BY rank, id) - 1 AS position "
+            f"FROM {table}) AS ordered WHERE {table}.id = ordered.id"
+        )
+        op.alter_column(table, 'position', nullable=False)
+        op.drop_column(table, 'rank')
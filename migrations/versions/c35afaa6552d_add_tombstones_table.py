@@ -0,0 +1,38 @@
+"""add tombstones table
+
+Revision ID: c35afaa6552d
+Revises: 11c2b1bd123b
+Create Date: 2026-10-18 11:40:07.402915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c35afaa6552d'
+down_revision: Union[str, Sequence[str], None] = '11c2b1bd123b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tombstones',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('board_id', sa.Uuid(), nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Uuid(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['board_id'], ['boards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstones_board_id_deleted_at', 'tombstones', ['board_id', 'deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tombstones_board_id_deleted_at', table_name='tombstones')
+    op.drop_table('tombstones')
@@ -0,0 +1,90 @@
+import pytest
+
+from app.services.BoardSubscribers import BoardSubscribers, event_lists
+from app.services.WebSocketConnection import WebSocketConnection
+
+
+@pytest.fixture
+def subscribers():
+    return BoardSubscribers()
+
+
+def connect(subscribers, list_ids=None, event_types=None):
+    connection = WebSocketConnection(websocket=None)
+    subscribers.add(connection)
+    if list_ids is not None or event_types is not None:
+        subscribers.subscribe(
+            connection,
+            frozenset(list_ids) if list_ids is not None else None,
+            frozenset(event_types) if event_types is not None else None
+        )
+    return connection
+
+
+def ids(connections):
+    return {connection.id for connection in connections}
+
+
+@pytest.mark.parametrize("message, expected", [
+    ({"type": "CARD_UPDATED", "payload": {"id": "c", "list_id": "l"}}, ["l"]),
+    ({"type": "CARD_MOVED", "payload": {"id": "c", "list_id": "m", "from_list_id": "l"}}, ["m", "l"]),
+    ({"type": "CARDS_MOVED", "payload": {"list_ids": ["l", "m"]}}, ["l", "m"]),
+    ({"type": "CARDS_CREATED", "payload": {"list_id": "l"}}, ["l"]),
+    ({"type": "LIST_UPDATED", "payload": {"id": "l"}}, ["l"]),
+    ({"type": "MEMBER_ADDED", "payload": {"user_id": "u"}}, None),
+    ({"type": "BOARD_DELETED", "payload": None}, None),
+])
+def test_event_lists(message, expected):
+    assert event_lists(message) == expected
+
+
+def test_unfiltered_sockets_get_everything(subscribers):
+    first, second = connect(subscribers), connect(subscribers)
+    message = {"type": "CARD_UPDATED", "payload": {"id": "c", "list_id": "l"}}
+    assert ids(subscribers.recipients(message)) == {first.id, second.id}
+
+
+def test_list_filter(subscribers):
+    everyone = connect(subscribers)
+    follows_l = connect(subscribers, list_ids={"l"})
+    follows_m = connect(subscribers, list_ids={"m"})
+    card_in_l = {"type": "CARD_UPDATED", "payload": {"id": "c", "list_id": "l"}}
+    assert ids(subscribers.recipients(card_in_l)) == {everyone.id, follows_l.id}
+    moved_to_m = {"type": "CARD_MOVED", "payload": {"id": "c", "list_id": "m", "from_list_id": "l"}}
+    assert ids(subscribers.recipients(moved_to_m)) == {everyone.id, follows_l.id, follows_m.id}
+    # Events about no particular list reach every socket
+    member = {"type": "MEMBER_ADDED", "payload": {"user_id": "u"}}
+    assert ids(subscribers.recipients(member)) == {everyone.id, follows_l.id, follows_m.id}
+
+
+def test_event_type_filter(subscribers):
+    everyone = connect(subscribers)
+    lists_only = connect(subscribers, event_types={"LIST_CREATED", "LIST_UPDATED"})
+    card = {"type": "CARD_UPDATED", "payload": {"id": "c", "list_id": "l"}}
+    listed = {"type": "LIST_UPDATED", "payload": {"id": "l"}}
+    assert ids(subscribers.recipients(card)) == {everyone.id}
+    assert ids(subscribers.recipients(listed)) == {everyone.id, lists_only.id}
+
+
+def test_list_and_event_type_filters_combine(subscribers):
+    connection = connect(subscribers, list_ids={"l"}, event_types={"CARD_MOVED"})
+    assert ids(subscribers.recipients({"type": "CARD_MOVED", "payload": {"id": "c", "list_id": "l"}})) == {connection.id}
+    assert not subscribers.recipients({"type": "CARD_UPDATED", "payload": {"id": "c", "list_id": "l"}})
+    assert not subscribers.recipients({"type": "CARD_MOVED", "payload": {"id": "c", "list_id": "m"}})
+
+
+def test_resubscribing_and_removing_update_the_index(subscribers):
+    connection = connect(subscribers, list_ids={"l"})
+    subscribers.subscribe(connection, frozenset({"m"}), None)
+    assert set(subscribers.by_list) == {"m"}
+    subscribers.subscribe(connection, None, None)
+    assert subscribers.by_list == {} and subscribers.filtered == 0
+    assert connection.id in subscribers.everyone
+
+    subscribers.subscribe(connection, frozenset({"l"}), None)
+    subscribers.remove(connection)
+    assert len(subscribers) == 0
+    assert subscribers.by_list == {} and subscribers.everyone == {} and subscribers.filtered == 0
+    # Removing twice is harmless
+    subscribers.remove(connection)
+    assert subscribers.filtered == 0
@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+from app.core.lexorank import MAX_RANK_LENGTH, needs_rebalance, spaced_ranks
+from app.schemas.CardSchema import CardMove
+from app.services.CardService import _plan_moves
+
+
+def board(*sizes):
+    """list id -> [[card id, rank], ...] in rank order, plus the list ids in order"""
+    orders = {}
+    for size in sizes:
+        orders[uuid4()] = [[uuid4(), rank] for rank in spaced_ranks(size)]
+    return orders, list(orders)
+
+
+def card_ids(cards):
+    return [card_id for card_id, _ in cards]
+
+
+def assert_ordered(orders):
+    for cards in orders.values():
+        ranks = [rank for _, rank in cards]
+        assert ranks == sorted(ranks)
+        assert len(set(ranks)) == len(ranks)
+
+
+def test_move_within_a_list():
+    orders, (lst,) = board(5)
+    before = card_ids(orders[lst])
+    changed = _plan_moves(orders, [CardMove(card_id=before[4], list_id=lst, position=1)])
+    assert card_ids(orders[lst]) == [before[0], before[4], before[1], before[2], before[3]]
+    assert changed == {before[4]}
+    assert_ordered(orders)
+
+
+def test_move_between_lists_clamps_the_position():
+    orders, (source, target) = board(3, 2)
+    moved = orders[source][0][0]
+    changed = _plan_moves(orders, [
+        CardMove(card_id=moved, list_id=target, position=99)
+    ])
+    assert card_ids(orders[target])[-1] == moved
+    assert moved not in card_ids(orders[source])
+    assert changed == {moved}
+    assert_ordered(orders)
+
+
+def test_moves_apply_in_order():
+    orders, (source, target) = board(4, 0)
+    a, b, c, d = card_ids(orders[source])
+    _plan_moves(orders, [
+        CardMove(card_id=a, list_id=target, position=0),
+        CardMove(card_id=c, list_id=target, position=0),
+        CardMove(card_id=b, list_id=target, position=1),
+        # Positions refer to the list as left by the earlier moves
+        CardMove(card_id=a, list_id=source, position=0),
+    ])
+    assert card_ids(orders[target]) == [c, b]
+    assert card_ids(orders[source]) == [a, d]
+    assert_ordered(orders)
+
+
+def test_a_card_already_in_place_keeps_its_rank():
+    orders, (lst,) = board(3)
+    second = orders[lst][1][0]
+    rank = orders[lst][1][1]
+    changed = _plan_moves(orders, [CardMove(card_id=second, list_id=lst, position=1)])
+    assert changed == set()
+    assert orders[lst][1] == [second, rank]
+
+
+def test_colliding_neighbours_are_respaced():
+    orders, (lst, source) = board(0, 1)
+    # Two concurrent inserts into the same gap left equal keys
+    tied = [[uuid4(), "V"], [uuid4(), "V"], [uuid4(), "W"]]
+    orders[lst] = [entry[:] for entry in tied]
+    moved = orders[source][0][0]
+    changed = _plan_moves(orders, [CardMove(card_id=moved, list_id=lst, position=1)])
+    assert card_ids(orders[lst]) == [tied[0][0], moved, tied[1][0], tied[2][0]]
+    assert {entry[0] for entry in tied} <= changed and moved in changed
+    assert_ordered(orders)
+
+
+def test_long_ranks_trigger_a_respace():
+    orders, (lst,) = board(0)
+    long_rank = "V" + "0" * MAX_RANK_LENGTH + "1"
+    orders[lst] = [[uuid4(), "V"], [uuid4(), long_rank], [uuid4(), "W"]]
+    last = orders[lst][-1][0]
+    changed = _plan_moves(orders, [CardMove(card_id=last, list_id=lst, position=0)])
+    assert changed == set(card_ids(orders[lst]))
+    assert not any(needs_rebalance(rank) for _, rank in orders[lst])
+    assert_ordered(orders)
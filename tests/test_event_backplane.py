@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.EventBackplane import InMemoryBackplane, PostgresBackplane
+
+
+def test_board_events_are_sequenced_per_board():
+    async def run():
+        backplane = InMemoryBackplane()
+        received = []
+
+        async def handler(envelope):
+            received.append(envelope)
+
+        backplane.subscribe(handler)
+        assert await backplane.current_seq("a") == 0
+        for target in ("a", "a", "b", "a"):
+            await backplane.publish({"scope": "board", "target": target, "message": {}})
+        await backplane.publish({"scope": "user", "target": "u", "message": {}})
+        assert [(envelope["target"], envelope.get("seq")) for envelope in received] == [
+            ("a", 1), ("a", 2), ("b", 1), ("a", 3), ("u", None)
+        ]
+        assert await backplane.current_seq("a") == 3
+        assert await backplane.current_seq("b") == 1
+
+    asyncio.run(run())
+
+
+def test_large_envelopes_are_chunked_and_reassembled():
+    backplane = PostgresBackplane(db_engine=object())
+    envelope = {"scope": "board", "target": "a", "message": {"blob": "x" * 50000}}
+    parts = backplane._split(json.dumps(envelope))
+    assert len(parts) > 1 and all(len(part) <= backplane.MAX_PAYLOAD_BYTES for part in parts)
+    # Chunks of different envelopes may interleave
+    other = backplane._split(json.dumps({**envelope, "target": "b"}))
+    assert all(backplane._assemble(part) is None for part in parts[:-1] + other[:-1])
+    assert backplane._assemble(parts[-1]) == envelope
+    assert backplane._assemble(other[-1])["target"] == "b"
+
+
+def test_envelopes_over_the_chunk_limit_are_refused():
+    backplane = PostgresBackplane(db_engine=object())
+    payload = "x" * (backplane.MAX_PAYLOAD_BYTES * (backplane.MAX_CHUNKS + 1))
+    assert backplane._split(payload) is None
+    with pytest.raises(ValueError):
+        backplane._assemble(f"#id:0:{backplane.MAX_CHUNKS + 1}:x")
+
+
+def test_incomplete_envelopes_are_bounded():
+    backplane = PostgresBackplane(db_engine=object())
+    for i in range(backplane.MAX_PENDING_ENVELOPES + 10):
+        backplane._assemble(f"#m{i}:0:2:x")
+    assert len(backplane._chunks) == backplane.MAX_PENDING_ENVELOPES
+    assert "m0" not in backplane._chunks
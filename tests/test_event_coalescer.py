@@ -0,0 +1,89 @@
+from app.services.EventCoalescer import EventCoalescer, merge_payloads
+
+
+def event(event_type, seq=None, **payload):
+    message = {"type": event_type, "payload": payload}
+    if seq is not None:
+        message["seq"] = seq
+    return message
+
+
+def test_updates_of_one_card_merge_into_the_latest_position():
+    coalescer = EventCoalescer()
+    coalescer.add(event("CARD_UPDATED", 1, id="a", title="one", partial=True), origin="x")
+    coalescer.add(event("CARD_UPDATED", 2, id="b", title="other", partial=True), origin="x")
+    coalescer.add(event("CARD_UPDATED", 3, id="a", description="two", partial=True), origin="x")
+    events = coalescer.drain()
+    assert [message["payload"]["id"] for message, _ in events] == ["b", "a"]
+    merged, origin = events[1]
+    assert merged["payload"] == {"id": "a", "title": "one", "description": "two", "partial": True}
+    assert merged["seq"] == 3
+    assert origin == "x"
+
+
+def test_stronger_event_type_wins():
+    coalescer = EventCoalescer()
+    coalescer.add(event("CARD_CREATED", id="a", title="one", list_id="l"))
+    coalescer.add(event("CARD_UPDATED", id="a", title="two", partial=True))
+    coalescer.add(event("CARD_MOVED", id="a", list_id="m"))
+    [(message, _)] = coalescer.drain()
+    assert message["type"] == "CARD_CREATED"
+    # A full payload merged with a delta is no longer a delta
+    assert message["payload"] == {"id": "a", "title": "two", "list_id": "m"}
+
+
+def test_created_then_deleted_disappears():
+    coalescer = EventCoalescer()
+    coalescer.add(event("LIST_CREATED", 1, id="a"))
+    coalescer.add(event("LIST_DELETED", 2, id="a"))
+    assert coalescer.drain() == []
+    # The window still accounts for the seqs that were merged away
+    assert (coalescer.first_seq, coalescer.last_seq) == (1, 2)
+
+
+def test_delete_supersedes_updates_and_recreate_supersedes_delete():
+    coalescer = EventCoalescer()
+    coalescer.add(event("CARD_UPDATED", id="a", title="one"))
+    coalescer.add(event("CARD_DELETED", id="a"))
+    [(message, _)] = coalescer.drain()
+    assert message["type"] == "CARD_DELETED"
+
+    coalescer.add(event("CARD_DELETED", id="a"))
+    coalescer.add(event("CARD_UPDATED", id="a", title="again"))
+    [(message, _)] = coalescer.drain()
+    assert message["type"] == "CARD_UPDATED"
+
+
+def test_cards_and_lists_with_the_same_id_stay_apart():
+    coalescer = EventCoalescer()
+    coalescer.add(event("CARD_UPDATED", id="a"))
+    coalescer.add(event("LIST_UPDATED", id="a"))
+    assert len(coalescer.drain()) == 2
+
+
+def test_unkeyed_events_are_never_merged():
+    coalescer = EventCoalescer()
+    coalescer.add({"type": "MEMBER_ADDED", "payload": {"user_id": "u"}})
+    coalescer.add({"type": "MEMBER_ADDED", "payload": {"user_id": "u"}})
+    coalescer.add({"type": "CARDS_RERANKED", "payload": {"list_id": "l", "ranks": {}}})
+    assert len(coalescer.drain()) == 3
+
+
+def test_merging_changes_from_different_clients_drops_the_origin():
+    coalescer = EventCoalescer()
+    coalescer.add(event("CARD_UPDATED", id="a", title="one"), origin="x")
+    coalescer.add(event("CARD_UPDATED", id="a", title="two"), origin="y")
+    [(_, origin)] = coalescer.drain()
+    assert origin is None
+
+
+def test_drain_empties_the_window():
+    coalescer = EventCoalescer()
+    coalescer.add(event("CARD_UPDATED", id="a"))
+    coalescer.drain()
+    assert coalescer.drain() == []
+
+
+def test_merge_payloads_keeps_partial_only_when_both_are_deltas():
+    assert merge_payloads({"a": 1, "partial": True}, {"b": 2, "partial": True}) == {"a": 1, "b": 2, "partial": True}
+    assert merge_payloads({"a": 1}, {"a": 2, "partial": True}) == {"a": 2}
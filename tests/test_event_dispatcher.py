@@ -0,0 +1,51 @@
+import asyncio
+
+from app.core.eventDispatcher import EventDispatcher
+
+
+def test_events_run_in_order_and_stop_drains_the_queue():
+    async def run():
+        dispatcher = EventDispatcher()
+        seen = []
+
+        async def handler(n):
+            await asyncio.sleep(0)
+            seen.append(n)
+
+        dispatcher.dispatch([(handler, (1,)), (handler, (2,))])
+        dispatcher.dispatch([(handler, (3,))])
+        await dispatcher.stop()
+        assert seen == [1, 2, 3]
+
+    asyncio.run(run())
+
+
+def test_a_failing_handler_does_not_stop_the_rest():
+    async def run():
+        dispatcher = EventDispatcher()
+        seen = []
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def handler(n):
+            seen.append(n)
+
+        dispatcher.dispatch([(fail, ()), (handler, (1,))])
+        await dispatcher.stop()
+        assert seen == [1]
+
+    asyncio.run(run())
+
+
+def test_stop_gives_up_on_a_stuck_handler():
+    async def run():
+        dispatcher = EventDispatcher()
+
+        async def stuck():
+            await asyncio.sleep(3600)
+
+        dispatcher.dispatch([(stuck, ())])
+        await asyncio.wait_for(dispatcher.stop(timeout=0.05), 1)
+
+    asyncio.run(run())
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from app.core.lexorank import (
+    DIGITS,
+    MAX_RANK_LENGTH,
+    needs_rebalance,
+    rank_between,
+    ranks_between,
+    spaced_ranks
+)
+
+
+@pytest.mark.parametrize("before, after", [
+    (None, None), (None, "V"), ("V", None), ("A", "B"), ("A", "A1"), ("A0z", "A1"), ("1", "2"), (None, "01")
+])
+def test_rank_between_sorts_between_neighbours(before, after):
+    rank = rank_between(before, after)
+    assert before is None or before < rank
+    assert after is None or rank < after
+    assert not rank.endswith(DIGITS[0])
+
+
+@pytest.mark.parametrize("before, after", [("B", "A"), ("A", "A")])
+def test_rank_between_rejects_unordered_neighbours(before, after):
+    with pytest.raises(ValueError):
+        rank_between(before, after)
+
+
+def test_appending_and_prepending_keep_order():
+    ranks = [rank_between(None, None)]
+    for _ in range(200):
+        ranks.append(rank_between(ranks[-1], None))
+        ranks.insert(0, rank_between(None, ranks[0]))
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == len(ranks)
+
+
+def test_random_inserts_keep_order_and_uniqueness():
+    chooser = random.Random(7)
+    ranks = [rank_between(None, None)]
+    for _ in range(1000):
+        index = chooser.randint(0, len(ranks))
+        before = ranks[index - 1] if index > 0 else None
+        after = ranks[index] if index < len(ranks) else None
+        ranks.insert(index, rank_between(before, after))
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == len(ranks)
+
+
+@pytest.mark.parametrize("before, after, count", [(None, None, 500), ("A", "B", 100), ("A", "A1", 37), (None, "1", 10)])
+def test_ranks_between_is_ascending_and_inside_the_gap(before, after, count):
+    ranks = ranks_between(before, after, count)
+    assert len(ranks) == count
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == count
+    assert before is None or before < ranks[0]
+    assert after is None or ranks[-1] < after
+
+
+def test_ranks_between_stays_short():
+    # Bisection keeps a batch logarithmic in length rather than linear
+    assert max(len(rank) for rank in ranks_between("A", "B", 1000)) <= 4
+
+
+def test_ranks_between_handles_empty_batches():
+    assert ranks_between(None, None, 0) == []
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 61, 62, 500, 5000])
+def test_spaced_ranks(count):
+    ranks = spaced_ranks(count)
+    assert len(ranks) == count
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == count
+    assert all(rank and not rank.endswith(DIGITS[0]) for rank in ranks)
+    assert all(len(rank) <= 3 for rank in ranks)
+
+
+def test_spaced_ranks_leave_room_at_both_ends():
+    ranks = spaced_ranks(10)
+    assert rank_between(None, ranks[0]) < ranks[0]
+    assert rank_between(ranks[-1], None) > ranks[-1]
+
+
+def test_needs_rebalance():
+    assert not needs_rebalance("A" * MAX_RANK_LENGTH)
+    assert needs_rebalance("A" * (MAX_RANK_LENGTH + 1))
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.core import userCache
+from app.core.userCache import UserCache
+from app.schemas.UserSchema import UserReadSchema
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(userCache.time, "monotonic", clock)
+    return clock
+
+
+def user():
+    return UserReadSchema(email="user@example.com", is_verified=True, id=uuid4(), created_at=datetime.now(timezone.utc))
+
+
+def test_hit_and_miss(clock):
+    cache = UserCache(ttl=60, max_size=10)
+    cached = user()
+    assert cache.get(cached.id) is None
+    cache.put(cached)
+    assert cache.get(cached.id) == cached
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = UserCache(ttl=60, max_size=10)
+    cached = user()
+    cache.put(cached)
+    clock.now += 59
+    assert cache.get(cached.id) == cached
+    clock.now += 2
+    assert cache.get(cached.id) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = UserCache(ttl=60, max_size=2)
+    first, second, third = user(), user(), user()
+    cache.put(first)
+    cache.put(second)
+    # Reading the first makes the second the oldest
+    cache.get(first.id)
+    cache.put(third)
+    assert cache.get(second.id) is None
+    assert cache.get(first.id) == first and cache.get(third.id) == third
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_and_clear(clock):
+    cache = UserCache(ttl=60, max_size=10)
+    first, second = user(), user()
+    cache.put(first)
+    cache.put(second)
+    cache.invalidate(first.id)
+    assert cache.get(first.id) is None
+    cache.clear()
+    assert cache.get(second.id) is None
+
+
+@pytest.mark.parametrize("ttl, max_size", [(0, 10), (60, 0)])
+def test_disabled_cache_stores_nothing(clock, ttl, max_size):
+    cache = UserCache(ttl=ttl, max_size=max_size)
+    cached = user()
+    cache.put(cached)
+    assert cache.get(cached.id) is None
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.services.WebSocketFrame import decode_message, encode_message, pack_message
+
+
+@pytest.mark.parametrize("request_id", ["3f2c9d4e-8a1b-4c5d-9e6f-7a8b9c0d1e2f", "req-1", 17, None])
+def test_request_id_round_trips_unchanged(request_id):
+    message = {"type": "ACK", "request_id": request_id}
+    assert decode_message(pack_message(message)) == message
+
+
+def test_ids_and_timestamps_round_trip_through_msgpack():
+    card_id, list_id = str(uuid4()), str(uuid4())
+    message = {
+        "type": "CARD_UPDATED",
+        "payload": {"id": card_id, "list_id": list_id, "title": "x", "created_at": "2024-05-01T10:00:00+00:00"}
+    }
+    decoded = decode_message(pack_message(message))
+    assert decoded["payload"]["id"] == card_id
+    assert decoded["payload"]["list_id"] == list_id
+    assert datetime.fromisoformat(decoded["payload"]["created_at"]) == datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+    # Ids shrink to 16 bytes
+    assert len(pack_message(message)) < len(encode_message(message))
+
+
+def test_json_round_trip():
+    message = {"type": "PING", "payload": {"ts": 1}}
+    assert decode_message(encode_message(message)) == message